@@ -0,0 +1,104 @@
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+import threading
+import time
+
+
+class TTLCache:
+    """
+    Small thread-safe LRU cache with per-entry TTL and version tags.
+
+    Entries are stored with the version of the data they were computed from; a lookup
+    with a different version is treated as a miss and drops the entry, so bumping the
+    version invalidates everything without walking the cache.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable, version: int = 0) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            entry_version, expires_at, value = entry
+            if entry_version != version:
+                del self._data[key]
+                self.invalidations += 1
+                self.misses += 1
+                return None
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, version: int = 0):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (version, time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+class ResponseCache:
+    """
+    Read-through cache of encoded responses for one service, dropped wholesale on writes.
+
+    Entries are tagged with the write version current when their load started, so
+    a load that races a write is never served afterwards. The TTL bounds how long
+    another instance's writes can go unseen.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 30.0):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.version = 0
+
+    async def get_or_load(self, key: Hashable, load):
+        version = self.version
+        value = self._cache.get(key, version)
+        if value is None:
+            value = await load()
+            self._cache.set(key, value, version)
+        return value
+
+    def invalidate(self):
+        self.version += 1
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return {**self._cache.stats(), "version": self.version}
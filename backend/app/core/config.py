@@ -1,8 +1,14 @@
 import os
+from pydantic import field_validator
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import atexit
 import logging
 import json
+import queue
 import sys
 
 load_dotenv()
@@ -25,12 +31,66 @@ class JSONFormatter(logging.Formatter):
 
 class Settings(BaseSettings):
     MONGODB_URI: str = os.getenv("MONGODB_URI")
+    # Create the indexes declared in core/indexes.py on connect
+    MONGODB_ENSURE_INDEXES: bool = os.getenv("MONGODB_ENSURE_INDEXES", "true").lower() == "true"
     API_TITLE: str = "SkillSync GraphRAG API"
     API_VERSION: str = "1.0.0"
     CORS_ORIGINS: list = os.getenv("CORS_ORIGINS", "*").split(",")
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    # Hand log records to a background thread so formatting/stdout writes never block the loop
+    LOG_ASYNC: bool = os.getenv("LOG_ASYNC", "true").lower() == "true"
+    # Fraction of requests that get started/finished log lines (5xx are always logged)
+    LOG_REQUEST_SAMPLE_RATE: float = float(os.getenv("LOG_REQUEST_SAMPLE_RATE", "1.0"))
     SECRET_KEY: str = os.getenv("SECRET_KEY", "09d25e094faa6ca2556c818166b7a9563b93f7099f6f0f4caa6cf63b88e8d3e7")
     ALGORITHM: str = "HS256"
+    # Graph engine: "networkx" (DiGraph) or "compact" (NumPy CSR arrays)
+    GRAPH_BACKEND: str = os.getenv("GRAPH_BACKEND", "networkx")
+    # "manual": rebuild only on /graph/sync; "incremental": cold start + tail MongoDB changes
+    GRAPH_SYNC_MODE: str = os.getenv("GRAPH_SYNC_MODE", "manual")
+    GRAPH_SYNC_POLL_INTERVAL: float = float(os.getenv("GRAPH_SYNC_POLL_INTERVAL", "5"))
+    GRAPH_SYNC_WATERMARK_FIELD: str = os.getenv("GRAPH_SYNC_WATERMARK_FIELD", "updatedAt")
+    # Executors for graph work: threads for reads, processes for rebuilds (0 = rebuild on a thread)
+    GRAPH_READ_WORKERS: int = int(os.getenv("GRAPH_READ_WORKERS", "4"))
+    GRAPH_REBUILD_PROCESSES: int = int(os.getenv("GRAPH_REBUILD_PROCESSES", "1"))
+    GRAPH_LOAD_BATCH_SIZE: int = int(os.getenv("GRAPH_LOAD_BATCH_SIZE", "5000"))
+    # Binary graph snapshot for warm starts ("" disables); written after full syncs and on shutdown
+    GRAPH_SNAPSHOT_PATH: str = os.getenv("GRAPH_SNAPSHOT_PATH", "")
+    # Multi-worker mode: directory (tmpfs, e.g. /dev/shm/skillsync) shared by all workers ("" disables)
+    GRAPH_SHARED_DIR: str = os.getenv("GRAPH_SHARED_DIR", "")
+    GRAPH_SHARED_POLL_INTERVAL: float = float(os.getenv("GRAPH_SHARED_POLL_INTERVAL", "0.5"))
+    GRAPH_SHARED_PUBLISH_INTERVAL: float = float(os.getenv("GRAPH_SHARED_PUBLISH_INTERVAL", "2"))
+    # /match/find result cache (0 disables)
+    MATCH_CACHE_SIZE: int = int(os.getenv("MATCH_CACHE_SIZE", "2048"))
+    MATCH_CACHE_TTL: float = float(os.getenv("MATCH_CACHE_TTL", "300"))
+    # /events and /sessions encoded-response cache (0 disables); TTL bounds staleness across instances
+    READ_CACHE_SIZE: int = int(os.getenv("READ_CACHE_SIZE", "256"))
+    READ_CACHE_TTL: float = float(os.getenv("READ_CACHE_TTL", "30"))
+    # /events/recommended: seconds before the event tag index is rebuilt from MongoDB (0 = never)
+    EVENT_INDEX_REFRESH: float = float(os.getenv("EVENT_INDEX_REFRESH", "300"))
+    # /sessions/book and /match/find availability: seconds before the slot index is rebuilt from MongoDB (0 = never)
+    SESSION_INDEX_REFRESH: float = float(os.getenv("SESSION_INDEX_REFRESH", "60"))
+    # IANA zone of the campus; session date/time strings ("Today", "04:00 PM") are read as local times there
+    CAMPUS_TIMEZONE: str = os.getenv("CAMPUS_TIMEZONE", "UTC")
+    # /match/batch: queries per executor job (one skill group is split into chunks of this size)
+    MATCH_BATCH_CHUNK_SIZE: int = int(os.getenv("MATCH_BATCH_CHUNK_SIZE", "500"))
+    # Related skills (co-occurrence): neighbours kept per skill; related skills tried when expanding /match/find
+    SKILL_RELATED_TOP_N: int = int(os.getenv("SKILL_RELATED_TOP_N", "20"))
+    MATCH_RELATED_SKILLS: int = int(os.getenv("MATCH_RELATED_SKILLS", "3"))
+    # /match/assignments: learners per mentor, mentors kept per learner for the optimizer, auction epsilon (score points)
+    ASSIGNMENT_MENTOR_CAPACITY: int = int(os.getenv("ASSIGNMENT_MENTOR_CAPACITY", "3"))
+    ASSIGNMENT_CANDIDATES: int = int(os.getenv("ASSIGNMENT_CANDIDATES", "16"))
+    ASSIGNMENT_EPSILON: float = float(os.getenv("ASSIGNMENT_EPSILON", "1.0"))
+
+    @field_validator("CAMPUS_TIMEZONE")
+    @classmethod
+    def _known_zone(cls, value: str) -> str:
+        # Fail at startup rather than with a 500 on the first booking; UTC needs no zone database
+        if value.upper() != "UTC":
+            try:
+                ZoneInfo(value)
+            except (ZoneInfoNotFoundError, ValueError) as e:
+                raise ValueError(f"CAMPUS_TIMEZONE {value!r} is not a known IANA zone (is tzdata installed?)") from e
+        return value
 
     class Config:
         env_file = ".env"
@@ -38,10 +98,29 @@ class Settings(BaseSettings):
 
 settings = Settings()
 
+_log_listener: Optional[QueueListener] = None
+
+@atexit.register
+def stop_log_listener():
+    """Flush queued records and stop the background log thread"""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
+
 def setup_logging():
+    global _log_listener
     handler = logging.StreamHandler(sys.stdout)
     handler.setFormatter(JSONFormatter())
-    
+
+    stop_log_listener()
+    if settings.LOG_ASYNC:
+        # Callers only enqueue; the listener thread formats and writes
+        log_queue = queue.SimpleQueue()
+        _log_listener = QueueListener(log_queue, handler, respect_handler_level=True)
+        _log_listener.start()
+        handler = QueueHandler(log_queue)
+
     root_logger = logging.getLogger()
     root_logger.handlers = [handler]
     root_logger.setLevel(settings.LOG_LEVEL)
@@ -1,8 +1,13 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 from .config import settings
+from .constants import RelationType
+from .executors import executors
+from .metrics import MongoCommandListener, peak_rss_bytes
+from .indexes import ensure_indexes
 from ..models import User, Skill, UserSkill
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -17,11 +22,15 @@ class Database:
             try:
                 masked_uri = uri[:15] + "..."
                 logger.info(f"Attempting connection to: {masked_uri}")
-                cls.client = AsyncIOMotorClient(uri)
+                # The listener times every query the services issue (see /metrics)
+                listeners = [MongoCommandListener()] if MongoCommandListener else []
+                cls.client = AsyncIOMotorClient(uri, event_listeners=listeners)
                 cls.db = cls.client.get_database("skillsync")
                 # Force a check
                 await cls.db.command('ping')
                 logger.info("Connected to MongoDB Successfully!")
+                if settings.MONGODB_ENSURE_INDEXES:
+                    await ensure_indexes(cls.db)
             except Exception as e:
                 logger.error(f"Failed to connect to MongoDB: {e}")
                 cls.db = None # Ensure it is None if failed
@@ -35,69 +44,134 @@ class Database:
 
 db = Database()
 
-async def fetch_graph_data() -> Tuple[List[User], List[Skill]]:
-    """Fetch all necessary data from MongoDB to build the graph"""
-    if not db.db:
-        # Return empty lists or handle demo mode gracefully elsewhere
-        # Ideally we might raise an error if strict, but let's return empty for now or check in caller
-        return [], []
-    
-    logger.info("Fetching data from MongoDB...")
-    users_cursor = db.db.users.find({})
-    skills_cursor = db.db.skills.find({})
-    user_skills_cursor = db.db.userskills.find({})
-    
-    # Fetch Data
-    users_data = await users_cursor.to_list(length=None)
-    skills_data = await skills_cursor.to_list(length=None)
-    user_skills_data = await user_skills_cursor.to_list(length=None)
-    
-    logger.info(f"Fetched {len(users_data)} users, {len(skills_data)} skills, {len(user_skills_data)} user_skills")
-
-    # Process Skills
-    skills_list = []
-    skill_map = {} # ID -> Name
-    for s in skills_data:
-        skill = Skill(
-            id=str(s["_id"]),
-            name=s["name"],
-            category=s.get("category", "General")
-        )
-        skills_list.append(skill)
-        skill_map[str(s["_id"])] = s["name"]
-        
-    # Process Users & UserSkills
-    users_list = []
-    
-    # Group skills by user
-    user_skills_map = {}
-    for us in user_skills_data:
-        uid = str(us["userId"])
-        sid = str(us["skillId"])
-        
-        if uid not in user_skills_map:
-            user_skills_map[uid] = []
-            
-        if sid in skill_map:
-            user_skills_map[uid].append(UserSkill(
-                user_id=uid,
-                skill_id=sid,
-                skill_name=skill_map[sid],
-                proficiency=us["proficiency"],
-                is_teaching=us.get("isTeaching", False),
-                is_learning=us.get("isLearning", False)
-            ))
-            
-    for u in users_data:
-        uid = str(u["_id"])
-        user = User(
-            id=uid,
-            name=u.get("name", "Unknown"),
-            email=u.get("email", ""),
-            year=u.get("year", 1),
-            branch=u.get("branch", "Unknown"),
-            skills=user_skills_map.get(uid, [])
-        )
-        users_list.append(user)
-        
-    return users_list, skills_list
+
+def stamped(update: dict) -> dict:
+    """
+    `update` plus the server's clock in GRAPH_SYNC_WATERMARK_FIELD, which graph sync
+    polls on deployments without change streams; every service write goes through it.
+    """
+    return {**update, "$currentDate": {settings.GRAPH_SYNC_WATERMARK_FIELD: True}}
+
+
+async def insert_stamped(collection, doc: dict):
+    """insert_one for a document keyed by "id", stamped like stamped() in the same write"""
+    await collection.update_one({"id": doc["id"]}, stamped({"$setOnInsert": doc}), upsert=True)
+
+def skill_from_doc(doc: dict) -> Skill:
+    return Skill(
+        id=str(doc["_id"]),
+        name=doc["name"],
+        category=doc.get("category", "General")
+    )
+
+def user_from_doc(doc: dict, skills: List[UserSkill] = None) -> User:
+    return User(
+        id=str(doc["_id"]),
+        name=doc.get("name", "Unknown"),
+        email=doc.get("email", ""),
+        year=doc.get("year", 1),
+        branch=doc.get("branch", "Unknown"),
+        skills=skills or []
+    )
+
+# Only the fields build_graph keeps
+SKILL_PROJECTION = {"name": 1, "category": 1}
+USER_PROJECTION = {"name": 1, "email": 1, "year": 1, "branch": 1}
+USERSKILL_PROJECTION = {"userId": 1, "skillId": 1, "proficiency": 1, "isTeaching": 1, "isLearning": 1}
+
+async def _batches(cursor, batch_size: int):
+    while True:
+        docs = await cursor.to_list(length=batch_size)
+        if not docs:
+            return
+        yield docs
+
+async def stream_graph_data(store, batch_size: int = 5000) -> Tuple[dict, Dict[str, str], Dict[str, Tuple[str, str]]]:
+    """
+    Stream skills, users and userskills into an empty graph store.
+
+    Cursors are read in projected batches and each batch goes straight into the
+    store as plain tuples, so no collection is ever fully materialized and no
+    Pydantic models are built. Ingesting a batch runs on the "load" executor
+    so the event loop keeps serving requests during a rebuild.
+    Returns (stats, email -> user id, userskill _id -> (user id, skill id)).
+    """
+    start = time.perf_counter()
+    skill_ids = set()
+    user_emails: Dict[str, str] = {}
+    userskill_keys: Dict[str, Tuple[str, str]] = {}
+    rows = {"skills": 0, "users": 0, "userskills": 0}
+
+    def ingest_skills(docs):
+        for s in docs:
+            sid = str(s["_id"])
+            store.add_skill(sid, s["name"], s.get("category", "General"))
+            skill_ids.add(sid)
+
+    def ingest_users(docs):
+        for u in docs:
+            uid = str(u["_id"])
+            store.add_user(uid, u.get("name", "Unknown"), u.get("year", 1), u.get("branch", "Unknown"))
+            if u.get("email"):
+                user_emails[u["email"]] = uid
+
+    def ingest_userskills(docs):
+        edges = []
+        for us in docs:
+            uid = str(us["userId"])
+            sid = str(us["skillId"])
+            userskill_keys[str(us["_id"])] = (uid, sid)
+            # Both endpoints must exist
+            if sid not in skill_ids or not store.has_user(uid):
+                continue
+            if us.get("isTeaching", False):
+                edges.append((uid, sid, RelationType.CAN_TEACH, us.get("proficiency", 1)))
+            if us.get("isLearning", False):
+                edges.append((uid, sid, RelationType.WANTS_TO_LEARN, None))
+        store.load_edges(edges)
+
+    for collection, projection, ingest in (
+        ("skills", SKILL_PROJECTION, ingest_skills),
+        ("users", USER_PROJECTION, ingest_users),
+        ("userskills", USERSKILL_PROJECTION, ingest_userskills),
+    ):
+        cursor = db.db[collection].find({}, projection, batch_size=batch_size)
+        async for docs in _batches(cursor, batch_size):
+            await executors.load(ingest, docs)
+            rows[collection] += len(docs)
+
+    await executors.load(store.finish_load)
+
+    duration = time.perf_counter() - start
+    total = sum(rows.values())
+    peak = peak_rss_bytes()
+    stats = {
+        **rows,
+        "duration_s": round(duration, 3),
+        "rows_per_sec": round(total / duration) if duration > 0 else total,
+        "peak_rss_mb": round(peak / 2**20, 1) if peak is not None else None,
+    }
+    logger.info(f"Streamed graph data: {stats}")
+    return stats, user_emails, userskill_keys
+
+async def stream_relations(batch_size: int = 5000) -> Tuple[List[Tuple[str, str, str]], Dict[str, str]]:
+    """
+    User <-> user relations from sessions and accepted connection requests.
+
+    Returns ((relation id, user a, user b) records, document _id -> relation id).
+    """
+    from ..services.social_graph import RELATION_SOURCES, RELATION_PROJECTIONS
+
+    relations = []
+    relation_keys: Dict[str, str] = {}
+    for collection, link in RELATION_SOURCES.items():
+        cursor = db.db[collection].find({}, RELATION_PROJECTIONS[collection], batch_size=batch_size)
+        async for docs in _batches(cursor, batch_size):
+            for doc in docs:
+                if "id" not in doc:
+                    continue
+                relation_id, pair = link(doc)
+                relation_keys[str(doc["_id"])] = relation_id
+                if pair:
+                    relations.append((relation_id, *pair))
+    return relations, relation_keys
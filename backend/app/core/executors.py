@@ -0,0 +1,251 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Callable, Dict
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _timed(fn: Callable, args: tuple):
+    """Run fn in a worker and report when it started and finished (wall clock, valid across processes)"""
+    started = time.time()
+    result = fn(*args)
+    return started, time.time(), result
+
+
+class PoolMetrics:
+    """Queue depth and wait/run times for one pool"""
+    SAMPLES = 1024
+
+    def __init__(self, name: str, kind: str, workers: int):
+        self.name = name
+        self.kind = kind
+        self.workers = workers
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.run_total = 0.0
+        self._waits = deque(maxlen=self.SAMPLES)
+
+    @property
+    def pending(self) -> int:
+        return self.submitted - self.completed - self.failed
+
+    def record(self, wait: float, run: float):
+        self.completed += 1
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+        self.run_total += run
+        self._waits.append(wait)
+
+    def stats(self) -> dict:
+        done = self.completed
+        waits = sorted(self._waits)
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "pending": self.pending,
+            # Jobs beyond the worker count are waiting for a free worker
+            "queue_depth": max(self.pending - self.workers, 0),
+            "submitted": self.submitted,
+            "completed": done,
+            "failed": self.failed,
+            "wait_avg_ms": round(self.wait_total / done * 1000, 3) if done else 0.0,
+            "wait_p95_ms": round(waits[min(int(len(waits) * 0.95), len(waits) - 1)] * 1000, 3) if waits else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 3),
+            "run_avg_ms": round(self.run_total / done * 1000, 3) if done else 0.0,
+        }
+
+
+class ReadWriteLock:
+    """
+    Many readers or one writer, for state the read pool shares with the loop.
+
+    Writers take priority: once one is waiting, new readers queue behind it, so
+    a steady stream of pool reads cannot hold off a mutation for long. The
+    writing thread may re-enter either side and a reader may re-enter reading,
+    but a reader cannot upgrade to writing. The event loop writes through
+    writing(), which never blocks it.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._waiting_writers = 0
+        self._writer = None          # thread ident of the writer
+        self._writer_depth = 0
+        self._local = threading.local()
+
+    @contextmanager
+    def read(self):
+        if self._writer == threading.get_ident():
+            yield
+            return
+
+        held = getattr(self._local, "reads", 0)
+        if not held:
+            with self._cond:
+                while self._writer is not None or self._waiting_writers:
+                    self._cond.wait()
+                self._readers += 1
+        self._local.reads = held + 1
+        try:
+            yield
+        finally:
+            self._local.reads = held
+            if not held:
+                with self._cond:
+                    self._readers -= 1
+                    if not self._readers:
+                        self._cond.notify_all()
+
+    def _acquire_write(self, owner: int, blocking: bool = True) -> bool:
+        """Take the write side for thread `owner`, which may already hold it"""
+        with self._cond:
+            if self._writer != owner:
+                if not blocking and (self._writer is not None or self._readers):
+                    return False
+                self._waiting_writers += 1
+                try:
+                    # Another waiter for the same owner may get there first
+                    while self._writer not in (None, owner) or (self._writer is None and self._readers):
+                        self._cond.wait()
+                finally:
+                    self._waiting_writers -= 1
+                self._writer = owner
+            self._writer_depth += 1
+            return True
+
+    def _release_write(self):
+        with self._cond:
+            self._writer_depth -= 1
+            if not self._writer_depth:
+                self._writer = None
+                self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        me = threading.get_ident()
+        if self._writer != me and getattr(self._local, "reads", 0):
+            raise RuntimeError("Cannot take the write lock while holding the read lock")
+        self._acquire_write(me)
+        try:
+            yield
+        finally:
+            self._release_write()
+
+    @asynccontextmanager
+    async def writing(self):
+        """
+        write() for the event loop. While readers hold the lock, a helper thread
+        waits for them and the loop keeps serving; the lock is then held for
+        the loop thread. The body should not await, or pool reads stay queued
+        until it resumes.
+        """
+        me = threading.get_ident()
+        if not self._acquire_write(me, blocking=False):
+            waiter = asyncio.ensure_future(asyncio.to_thread(self._acquire_write, me))
+            try:
+                await asyncio.shield(waiter)
+            except asyncio.CancelledError:
+                # The helper thread still takes the lock; hand it straight back
+                waiter.add_done_callback(lambda _: self._release_write())
+                raise
+        try:
+            yield
+        finally:
+            self._release_write()
+
+
+class GraphExecutors:
+    """
+    Where CPU-bound graph work runs, so the event loop only does I/O.
+
+    - read: thread pool for quick graph reads (matching, analytics). Mutations
+      stay on the loop, so callers guard the state they share with a
+      ReadWriteLock (see GraphService.read).
+    - rebuild: process pool for whole-graph builds that can happen away from the
+      live store (GRAPH_REBUILD_PROCESSES=0 turns it into a single thread).
+    - load: one thread for bulk work that must touch a store in this process,
+      such as streaming a full sync from MongoDB into the next store.
+
+    Pools start on first use and are shut down with the app.
+    """
+
+    def __init__(self):
+        self._pools: Dict[str, Executor] = {}
+        self.metrics: Dict[str, PoolMetrics] = {}
+
+    def _pool(self, name: str) -> Executor:
+        pool = self._pools.get(name)
+        if pool is not None:
+            return pool
+
+        if name == "read":
+            workers = max(settings.GRAPH_READ_WORKERS, 1)
+            pool, kind = ThreadPoolExecutor(workers, thread_name_prefix="graph-read"), "thread"
+        elif name == "rebuild" and settings.GRAPH_REBUILD_PROCESSES > 0:
+            workers = settings.GRAPH_REBUILD_PROCESSES
+            # spawn: forking a process that holds an event loop and driver threads is unsafe
+            pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+            kind = "process"
+        else:
+            workers = 1
+            pool, kind = ThreadPoolExecutor(1, thread_name_prefix=f"graph-{name}"), "thread"
+
+        self._pools[name] = pool
+        self.metrics[name] = PoolMetrics(name, kind, workers)
+        return pool
+
+    def kind(self, name: str) -> str:
+        self._pool(name)
+        return self.metrics[name].kind
+
+    def executor(self, name: str) -> Executor:
+        """The raw executor, for APIs that take one; not metered"""
+        return self._pool(name)
+
+    async def run(self, name: str, fn: Callable, *args) -> Any:
+        """Run fn(*args) on the named pool; fn must be picklable for a process pool"""
+        pool = self._pool(name)
+        metrics = self.metrics[name]
+        metrics.submitted += 1
+        submitted = time.time()
+        try:
+            started, finished, result = await asyncio.get_running_loop().run_in_executor(
+                pool, _timed, fn, args
+            )
+        except BaseException:
+            metrics.failed += 1
+            raise
+        metrics.record(max(started - submitted, 0.0), finished - started)
+        return result
+
+    async def read(self, fn: Callable, *args) -> Any:
+        return await self.run("read", fn, *args)
+
+    async def rebuild(self, fn: Callable, *args) -> Any:
+        return await self.run("rebuild", fn, *args)
+
+    async def load(self, fn: Callable, *args) -> Any:
+        return await self.run("load", fn, *args)
+
+    def stats(self) -> Dict[str, dict]:
+        return {name: metrics.stats() for name, metrics in self.metrics.items()}
+
+    def shutdown(self, wait: bool = True):
+        for pool in self._pools.values():
+            pool.shutdown(wait=wait, cancel_futures=True)
+        self._pools.clear()
+        self.metrics.clear()
+
+
+executors = GraphExecutors()
@@ -0,0 +1,176 @@
+"""
+MongoDB indexes the services rely on, and a query-plan check for them.
+
+    cd backend && python -m app.core.indexes            # explain every service query
+    cd backend && python -m app.core.indexes --ensure   # create missing indexes first
+"""
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from .config import settings
+import argparse
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def declared_indexes() -> Dict[str, List[IndexModel]]:
+    """Collection -> indexes, keyed to the filters and sorts the services issue"""
+    watermark = settings.GRAPH_SYNC_WATERMARK_FIELD
+    synced = lambda: IndexModel([(watermark, ASCENDING)], name=f"{watermark}_1")
+    return {
+        "events": [IndexModel([("id", ASCENDING)], unique=True, name="id_unique")],
+        "sessions": [
+            IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+            # Equality on the mentor, then the slot range of the /sessions/book overlap check
+            IndexModel([("mentor_id", ASCENDING), ("starts_at", ASCENDING)], name="mentor_id_starts_at"),
+            IndexModel([("learner_id", ASCENDING)], name="learner_id_1"),
+            synced(),
+        ],
+        "connection_requests": [
+            IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+            # Equality on the user, then the newest-first keyset sort of /match/requests
+            IndexModel([("to_user_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+                       name="to_user_created"),
+            IndexModel([("from_user_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+                       name="from_user_created"),
+            synced(),
+        ],
+        "userskills": [
+            IndexModel([("userId", ASCENDING), ("skillId", ASCENDING)], name="userId_skillId"),
+            IndexModel([("skillId", ASCENDING)], name="skillId_1"),
+            synced(),
+        ],
+        "assignments": [
+            # Equality on the run, then the learner or mentor a /match/assignments read asks for
+            IndexModel([("run_id", ASCENDING), ("learner_id", ASCENDING)], name="run_learner"),
+            IndexModel([("run_id", ASCENDING), ("mentor_id", ASCENDING)], name="run_mentor"),
+        ],
+        "assignment_runs": [
+            IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+            IndexModel([("status", ASCENDING), ("started_at", DESCENDING)], name="status_started"),
+            IndexModel([("started_at", ASCENDING)], name="started_at_1"),
+        ],
+        "users": [synced()],
+        "skills": [synced()],
+    }
+
+
+async def ensure_indexes(database) -> Dict[str, List[str]]:
+    """
+    Create any declared index that is missing (create_indexes is a no-op for existing ones).
+
+    A collection whose indexes cannot be built (e.g. duplicate ids blocking a
+    unique index) is logged and skipped so startup still succeeds.
+    """
+    created = {}
+    for collection, indexes in declared_indexes().items():
+        try:
+            created[collection] = await database[collection].create_indexes(indexes)
+        except OperationFailure as e:
+            logger.warning(f"Could not ensure indexes on {collection}: {e}")
+    logger.info(f"Indexes ensured: {created}")
+    return created
+
+
+def service_queries() -> List[Tuple[str, str, dict, Optional[dict]]]:
+    """(name, collection, filter, sort) for every query the services send to MongoDB"""
+    from ..services.event_service import EVENT_PAGES
+    from ..services.session_service import SESSION_PAGES, SessionService
+    from ..services.connection_service import REQUEST_PAGES
+    from ..services.assignment_service import AssignmentService
+
+    watermark = settings.GRAPH_SYNC_WATERMARK_FIELD
+    queries = [
+        ("EventService.get_by_id", "events", {"id": "x"}, None),
+        ("EventService.get_page", "events", {"id": {"$gt": "x"}}, dict(EVENT_PAGES.sort())),
+        ("SessionService.get_by_id", "sessions", {"id": "x"}, None),
+        ("SessionService.get_page", "sessions", {"id": {"$gt": "x"}}, dict(SESSION_PAGES.sort())),
+        ("SessionService.book", "sessions", SessionService.overlap_filter("x", datetime(2026, 1, 1), datetime(2026, 1, 2)), None),
+        ("ConnectionService.get_by_id", "connection_requests", {"id": "x"}, None),
+        # The $match that opens the get_by_user/count_by_user aggregations
+        ("ConnectionService.get_by_user", "connection_requests",
+         {"$or": [{"to_user_id": "x"}, {"from_user_id": "x"}], "status": "pending"}, dict(REQUEST_PAGES.sort())),
+        ("AssignmentService.latest", "assignment_runs", {"status": "completed"}, {"started_at": -1}),
+        ("AssignmentService._drop_older", "assignment_runs",
+         AssignmentService.older_runs_filter({"started_at": "x"}), None),
+        ("AssignmentService.get_assignments (learner)", "assignments",
+         AssignmentService.assignment_filter("x", learner_id="x"), None),
+        ("AssignmentService.get_assignments (mentor)", "assignments",
+         AssignmentService.assignment_filter("x", mentor_id="x"), None),
+        ("userskills by user", "userskills", {"userId": "x"}, None),
+        ("userskills by skill", "userskills", {"skillId": "x"}, None),
+    ]
+    for collection in ("skills", "users", "userskills", "sessions", "connection_requests"):
+        queries.append((f"GraphSyncService._poll ({collection})", collection,
+                        {watermark: {"$gte": 0}}, {watermark: 1}))
+    return queries
+
+
+def plan_stages(plan) -> List[str]:
+    """Every stage name in an explain plan tree (handles classic and SBE layouts)"""
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(plan_stages(value))
+    elif isinstance(plan, list):
+        for value in plan:
+            stages.extend(plan_stages(value))
+    return stages
+
+
+async def explain_queries(database) -> List[dict]:
+    """Winning plan for each service query; collscan=True marks a full collection scan"""
+    report = []
+    for name, collection, filter_, sort in service_queries():
+        command = {"find": collection, "filter": filter_, "limit": 1}
+        if sort:
+            command["sort"] = sort
+        explain = await database.command("explain", command, verbosity="queryPlanner")
+        stages = plan_stages(explain.get("queryPlanner", {}).get("winningPlan", {}))
+        report.append({
+            "query": name,
+            "collection": collection,
+            "stages": stages,
+            "collscan": "COLLSCAN" in stages,
+            "in_memory_sort": "SORT" in stages,
+        })
+    return report
+
+
+async def _main(ensure: bool) -> int:
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    if not settings.MONGODB_URI:
+        raise SystemExit("MONGODB_URI is not set")
+    client = AsyncIOMotorClient(settings.MONGODB_URI)
+    database = client.get_database("skillsync")
+    try:
+        if ensure:
+            await ensure_indexes(database)
+        report = await explain_queries(database)
+    finally:
+        client.close()
+
+    print(json.dumps(report, indent=2))
+    flagged = [entry["query"] for entry in report if entry["collscan"]]
+    for query in flagged:
+        print(f"COLLSCAN: {query}")
+    return 1 if flagged else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ensure", action="store_true", help="Create missing indexes before explaining")
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(_main(args.ensure)))
+
+
+if __name__ == "__main__":
+    main()
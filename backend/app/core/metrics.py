@@ -0,0 +1,268 @@
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import os
+import sys
+import threading
+import time
+
+try:
+    from pymongo import monitoring
+except ImportError:  # pragma: no cover - motor always brings pymongo
+    monitoring = None
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Seconds; tuned for API latencies (sub-ms cache hits up to multi-second rebuilds)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+REBUILD_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        super().__init__(name, help)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_labels(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_format_labels(k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    """Settable value; inc/dec for in-flight style gauges"""
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[_labels(labels)] = value
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram with a sum and count per label set"""
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, help)
+        self.buckets = tuple(sorted(buckets))
+        # label set -> (per-bucket counts incl. +Inf, sum)
+        self._series: Dict[Labels, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = _labels(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, **labels) -> int:
+        series = self._series.get(_labels(labels))
+        return sum(series[0]) if series else 0
+
+    def quantile(self, q: float, **labels) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th observation (what histogram_quantile would see)"""
+        series = self._series.get(_labels(labels))
+        if not series:
+            return None
+        counts = series[0]
+        rank = q * sum(counts)
+        seen = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1])) for k, v in self._series.items())
+        lines = self.header()
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(key, ('le', _format_value(bound)))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    In-process metrics in the Prometheus text exposition format.
+
+    Instruments are updated where the work happens (request middleware, graph
+    rebuilds, the MongoDB command listener); point-in-time values such as graph
+    size or RSS are read by collectors registered with `collect` when /metrics
+    is scraped. Each uvicorn worker keeps its own registry.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, Dict[str, str], float]]]] = []
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str) -> Counter:
+        return self._register(Counter(name, help))
+
+    def gauge(self, name: str, help: str) -> Gauge:
+        return self._register(Gauge(name, help))
+
+    def histogram(self, name: str, help: str, buckets: Iterable[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, buckets))
+
+    def collect(self, collector: Callable[[], Iterable[Tuple[str, str, Dict[str, str], float]]]):
+        """Register a scrape-time collector yielding (name, help, labels, value) gauge samples"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+
+        gauges: Dict[str, Gauge] = {}
+        for collector in self._collectors:
+            for name, help, labels, value in collector():
+                gauge = gauges.get(name)
+                if gauge is None:
+                    gauge = gauges[name] = Gauge(name, help)
+                gauge.set(value, **labels)
+        for gauge in gauges.values():
+            lines.extend(gauge.render())
+        return "\n".join(lines) + "\n"
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process, or None where getrusage is unavailable"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def process_rss_bytes() -> Optional[int]:
+    """Current resident set size (falls back to peak RSS where /proc is unavailable, else None)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return peak_rss_bytes()
+
+
+metrics = MetricsRegistry()
+
+http_requests = metrics.counter("http_requests_total", "HTTP requests by route template and status")
+http_latency = metrics.histogram("http_request_duration_seconds", "HTTP request latency by route template")
+http_in_flight = metrics.gauge("http_requests_in_flight", "HTTP requests currently being served")
+graph_rebuilds = metrics.histogram(
+    "graph_rebuild_duration_seconds", "Full graph rebuild duration", buckets=REBUILD_BUCKETS
+)
+mongo_commands = metrics.histogram(
+    "mongo_command_duration_seconds", "MongoDB command latency by command and collection"
+)
+mongo_failures = metrics.counter("mongo_command_failures_total", "Failed MongoDB commands")
+
+start_time = time.time()
+
+
+def _process():
+    rss = process_rss_bytes()
+    if rss is not None:
+        yield "process_resident_memory_bytes", "Resident set size", {}, rss
+    yield "process_start_time_seconds", "Process start time (unix epoch)", {}, start_time
+
+
+metrics.collect(_process)
+
+
+if monitoring is not None:
+    class MongoCommandListener(monitoring.CommandListener):
+        """Times every command issued through the client, i.e. all service queries"""
+
+        def __init__(self):
+            self._collections: Dict[Tuple[int, int], str] = {}
+            self._lock = threading.Lock()
+
+        def started(self, event):
+            target = event.command.get(event.command_name)
+            with self._lock:
+                self._collections[(event.request_id, event.operation_id)] = (
+                    target if isinstance(target, str) else ""
+                )
+
+        def _collection(self, event) -> str:
+            with self._lock:
+                return self._collections.pop((event.request_id, event.operation_id), "")
+
+        def succeeded(self, event):
+            mongo_commands.observe(event.duration_micros / 1e6, command=event.command_name,
+                                   collection=self._collection(event))
+
+        def failed(self, event):
+            collection = self._collection(event)
+            mongo_commands.observe(event.duration_micros / 1e6, command=event.command_name,
+                                   collection=collection)
+            mongo_failures.inc(command=event.command_name, collection=collection)
+else:  # pragma: no cover
+    MongoCommandListener = None
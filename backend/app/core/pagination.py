@@ -0,0 +1,122 @@
+from typing import Any, AsyncIterator, Callable, List, Optional, Sequence, Tuple, Type
+from pydantic import BaseModel
+import base64
+import json
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque cursor for the sort key of the last item on a page"""
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, width: int) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+    if not isinstance(values, list) or len(values) != width:
+        raise InvalidCursor("Invalid cursor")
+    return values
+
+
+def encode_models(items: Sequence[BaseModel]) -> bytes:
+    """JSON array bytes for a list of models, as the endpoint would have serialized it"""
+    return b"[" + b",".join(item.model_dump_json().encode() for item in items) + b"]"
+
+
+def projection(model: Type[BaseModel]) -> dict:
+    """Mongo projection returning exactly the model's fields (and not _id)"""
+    return {"_id": 0, **{name: 1 for name in model.model_fields}}
+
+
+class Keyset:
+    """
+    Keyset pagination over a fixed sort key, e.g. Keyset(("created_at", "id"), descending=True).
+
+    A page is the first `limit` documents strictly after the cursor in sort
+    order; the next cursor encodes the last document's key. Ties on the leading
+    fields are broken by the later ones, so the last field must be unique.
+    """
+
+    def __init__(self, fields: Tuple[str, ...], descending: bool = False):
+        self.fields = fields
+        self.descending = descending
+
+    def sort(self) -> List[Tuple[str, int]]:
+        direction = -1 if self.descending else 1
+        return [(field, direction) for field in self.fields]
+
+    def key(self, item) -> tuple:
+        get = item.get if isinstance(item, dict) else lambda field: getattr(item, field)
+        return tuple(get(field) for field in self.fields)
+
+    def after(self, cursor: Optional[str]) -> dict:
+        """Mongo filter for documents after `cursor` ({} for the first page)"""
+        if not cursor:
+            return {}
+        values = decode_cursor(cursor, len(self.fields))
+        op = "$lt" if self.descending else "$gt"
+        clauses = []
+        for i, field in enumerate(self.fields):
+            clause = {f: values[j] for j, f in enumerate(self.fields[:i])}
+            clause[field] = {op: values[i]}
+            clauses.append(clause)
+        return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+    def _page(self, rows: Sequence, limit: int) -> Tuple[list, Optional[str]]:
+        """Trim a limit+1 fetch to a page; the extra row only says whether there is a next one"""
+        page = list(rows[:limit])
+        return page, encode_cursor(self.key(page[-1])) if len(rows) > limit else None
+
+    def _filter(self, query: dict, cursor: Optional[str]) -> dict:
+        after = self.after(cursor)
+        return {"$and": [query, after]} if query and after else (query or after)
+
+    def stages(self, query: dict, model: Type[BaseModel], limit: int, cursor: Optional[str] = None) -> List[dict]:
+        """The page as aggregation stages (e.g. one branch of a $facet); read it back with to_page"""
+        return [
+            {"$match": self._filter(query, cursor)},
+            {"$sort": dict(self.sort())},
+            {"$limit": limit + 1},
+            {"$project": projection(model)},
+        ]
+
+    def to_page(self, docs: Sequence[dict], model: Type[BaseModel], limit: int) -> Tuple[List[BaseModel], Optional[str]]:
+        page, next_cursor = self._page(docs, limit)
+        return [model(**doc) for doc in page], next_cursor
+
+    async def find(self, collection, query: dict, model: Type[BaseModel], limit: int,
+                   cursor: Optional[str] = None) -> Tuple[List[BaseModel], Optional[str]]:
+        """One projected, index-friendly page from a Mongo collection"""
+        docs = await collection.find(self._filter(query, cursor), projection(model)) \
+            .sort(self.sort()).limit(limit + 1).to_list(length=limit + 1)
+        return self.to_page(docs, model, limit)
+
+    def slice(self, items: Sequence, limit: int, cursor: Optional[str] = None,
+              where: Callable[[Any], bool] = None) -> Tuple[list, Optional[str]]:
+        """The same page over an in-memory list (demo-mode fallback)"""
+        rows = sorted((item for item in items if where is None or where(item)),
+                      key=self.key, reverse=self.descending)
+        if cursor:
+            start = tuple(decode_cursor(cursor, len(self.fields)))
+            rows = [r for r in rows if (self.key(r) < start if self.descending else self.key(r) > start)]
+        return self._page(rows, limit)
+
+    async def stream(self, collection, query: dict, model: Type[BaseModel],
+                     batch_size: int = MAX_PAGE_SIZE) -> AsyncIterator[List[BaseModel]]:
+        """Every matching document in sort order, in batches from one server cursor (for exports)"""
+        cursor = collection.find(query, projection(model), batch_size=batch_size).sort(self.sort())
+        while True:
+            docs = await cursor.to_list(length=batch_size)
+            if not docs:
+                return
+            yield [model(**doc) for doc in docs]
@@ -3,28 +3,40 @@ SkillSync GraphRAG Microservice
 AI-powered peer matching using knowledge graphs
 """
 
-from fastapi import FastAPI, HTTPException, Response, status, Depends
+from fastapi import FastAPI, HTTPException, Response, status, Depends, Query
 from fastapi.security import OAuth2PasswordBearer
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, PlainTextResponse
 from typing import Optional
 from contextlib import asynccontextmanager
+import json
 import logging
 
 # Local modules
 from .core.config import settings, setup_logging
 from .middleware.request_id import RequestIDMiddleware
-from .core.database import db, fetch_graph_data
+from .core.database import db
+from .core.executors import executors
+from .core.metrics import metrics, process_rss_bytes
+from .core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursor
 from .services.graph_service import graph_service
+from .services.graph_sync import graph_sync
+from .services.graph_shared import graph_shared
+from .services.social_graph import connection_link, session_link, session_relation
 from .services.event_service import EventService
+from .services.event_index import profile_terms
 from .services.session_service import SessionService
+from .services.availability import SlotConflict, booking_slot, match_slot
 from .services.connection_service import ConnectionService
+from .services.assignment_service import AssignmentService
 from .core.auth import create_access_token, decode_access_token
-from .models import User, Skill, UserSkill, MatchRequest, MatchResult, GraphStats, Event, Session, UserRegisterRequest, UserUpdateRequest, SkillUpdateRequest, SessionBookRequest, ConnectionRequest, ConnectionRequestStatus, LoginRequest
+from .models import User, Skill, UserSkill, MatchRequest, MatchBatchRequest, MatchResult, GraphStats, Event, Session, UserRegisterRequest, UserUpdateRequest, SkillUpdateRequest, SessionBookRequest, ConnectionRequest, ConnectionRequestStatus, LoginRequest
 
 # Initialize Services
 event_service = EventService()
 session_service = SessionService()
 connection_service = ConnectionService()
+assignment_service = AssignmentService()
 from .models import (
     User, Skill, UserSkill, MatchRequest, MatchResult, GraphStats, Event, Session,
     UserRegisterRequest, UserUpdateRequest, SkillUpdateRequest, SessionBookRequest,
@@ -35,15 +47,59 @@ from .models import (
 setup_logging()
 logger = logging.getLogger(__name__)
 
+def _graph_metrics():
+    """Scrape-time gauges for graph size, match cache and executor queues"""
+    yield "graph_nodes", "Nodes in the live graph", {}, graph_service.number_of_nodes()
+    yield "graph_edges", "Edges in the live graph", {}, graph_service.number_of_edges()
+    yield "graph_users", "Users in the live graph", {}, graph_service.user_count()
+    yield "graph_version", "Graph version (bumped on every mutation)", {}, graph_service.version
+    cache = graph_service.match_cache.stats()
+    yield "match_cache_entries", "Cached /match/find results", {}, cache["size"]
+    for event in ("hits", "misses", "evictions"):
+        yield "match_cache_events", "Match cache lookups by outcome", {"event": event}, cache[event]
+    for pool, pool_stats in executors.stats().items():
+        yield "executor_pending", "Jobs submitted and not yet finished", {"pool": pool}, pool_stats["pending"]
+        yield "executor_queue_depth", "Jobs waiting for a free worker", {"pool": pool}, pool_stats["queue_depth"]
+        yield "executor_wait_p95_seconds", "p95 time jobs waited for a worker", {"pool": pool}, pool_stats["wait_p95_ms"] / 1000
+
+metrics.collect(_graph_metrics)
+
+def _read_cache_metrics():
+    """Scrape-time gauges for the /events and /sessions response caches"""
+    for name, service in (("events", event_service), ("sessions", session_service)):
+        cache = service.cache.stats()
+        yield "read_cache_entries", "Cached /events and /sessions pages", {"cache": name}, cache["size"]
+        yield "read_cache_hit_rate", "Read cache hit rate since start", {"cache": name}, cache["hit_rate"]
+        for event in ("hits", "misses"):
+            yield "read_cache_events", "Read cache lookups by outcome", {"cache": name, "event": event}, cache[event]
+        yield "read_cache_invalidations", "Writes that dropped the read cache", {"cache": name}, cache["version"]
+
+metrics.collect(_read_cache_metrics)
+
 # Lifespan context for DB connection
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting up GraphRAG Service...")
     await db.connect()
+    if settings.GRAPH_SHARED_DIR:
+        # Multi-worker: the elected leader loads/syncs the graph, everyone maps its snapshots
+        await graph_shared.start(settings.GRAPH_SHARED_DIR)
+    else:
+        if settings.GRAPH_SNAPSHOT_PATH:
+            graph_sync.load_snapshot(settings.GRAPH_SNAPSHOT_PATH)
+        if db.db is not None and settings.GRAPH_SYNC_MODE == "incremental":
+            await graph_sync.start()
     yield
     # Shutdown
     logger.info("Shutting down GraphRAG Service...")
+    if settings.GRAPH_SHARED_DIR:
+        await graph_shared.stop()
+    else:
+        await graph_sync.stop()
+        if settings.GRAPH_SNAPSHOT_PATH:
+            await graph_sync.save_snapshot(settings.GRAPH_SNAPSHOT_PATH)
+    executors.shutdown()
     await db.close()
 
 app = FastAPI(
@@ -65,6 +121,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID", "X-Next-Cursor"],
 )
 
 
@@ -93,75 +150,170 @@ async def health(response: Response):
             db_status = "error"
             response.status_code = 503
     
+    rss = process_rss_bytes()
     return {
         "status": status,
         "database": db_status,
-        "graph_nodes": graph_service.G.number_of_nodes(),
-        "memory_usage": "optimal"  # Placeholder for psutil check if needed
+        "graph_nodes": graph_service.number_of_nodes(),
+        "graph_backend": graph_service.backend,
+        "memory_usage_mb": round(rss / 2**20, 1) if rss is not None else None
     }
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus text exposition: per-route latency histograms, graph, executor, MongoDB and process metrics"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/stats", response_model=GraphStats)
 async def get_stats():
     """Get graph statistics"""
-    users = sum(1 for n in graph_service.G.nodes() if str(n).startswith("user:"))
-    skills = sum(1 for n in graph_service.G.nodes() if str(n).startswith("skill:"))
     return GraphStats(
-        total_users=users,
-        total_skills=skills,
-        total_edges=graph_service.G.number_of_edges()
+        total_users=graph_service.user_count(),
+        total_skills=graph_service.skill_count(),
+        total_edges=graph_service.number_of_edges(),
+        graph_version=graph_service.version,
+        match_cache=graph_service.match_cache.stats(),
+        last_rebuild=graph_service.last_rebuild,
+        executors=executors.stats()
     )
 
 @app.post("/graph/sync")
 async def sync_graph():
-    """Sync graph with MongoDB data"""
+    """Full rebuild of the graph from MongoDB data"""
     try:
-        if not db.db:
+        if db.db is None:
             return {"status": "demo_mode", "message": "No DB connection, utilizing in-memory/demo data only"}
+        if graph_shared.role == "follower":
+            graph_shared.route_full_sync()
+            return {"status": "routed", "message": "Full sync queued on the leader worker"}
             
-        users, skills = await fetch_graph_data()
-        graph_service.build_graph(users, skills)
+        result = await graph_sync.full_sync()
         
         return {
             "status": "synced",
-            "users": len(users),
-            "skills": len(skills),
-            "nodes": graph_service.G.number_of_nodes(),
-            "edges": graph_service.G.number_of_edges()
+            "users": result["users"],
+            "skills": result["skills"],
+            "nodes": graph_service.number_of_nodes(),
+            "edges": graph_service.number_of_edges(),
+            "load": result
         }
     except Exception as e:
         logger.error(f"Sync error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/graph/sync/status")
+async def sync_status():
+    """Incremental sync mode, applied change count and watermark"""
+    status = graph_sync.status()
+    if settings.GRAPH_SHARED_DIR:
+        status["shared"] = graph_shared.status()
+    return status
+
+@app.post("/graph/snapshot")
+async def save_graph_snapshot():
+    """Write the graph snapshot used for warm starts"""
+    if not settings.GRAPH_SNAPSHOT_PATH:
+        raise HTTPException(status_code=400, detail="GRAPH_SNAPSHOT_PATH is not configured")
+    return await graph_sync.save_snapshot(settings.GRAPH_SNAPSHOT_PATH)
+
 @app.post("/graph/build")
 async def build_graph_endpoint(users: list[User], skills: list[Skill]):
     """Build/rebuild the knowledge graph from data provided in body"""
-    graph_service.build_graph(users, skills)
+    await graph_service.rebuild_graph(users, skills)
     return {
         "message": "Graph built from payload",
-        "nodes": graph_service.G.number_of_nodes(),
-        "edges": graph_service.G.number_of_edges()
+        "nodes": graph_service.number_of_nodes(),
+        "edges": graph_service.number_of_edges()
     }
 
 @app.post("/match/find", response_model=list[MatchResult])
 async def find_matches(request: MatchRequest):
     """Find mentors for a skill the user wants to learn"""
-    matches = graph_service.find_matches(
-        seeker_id=request.user_id,
-        skill_name=request.skill_name,
-        limit=request.limit
+    if request.include_related:
+        await graph_service.skill_similarity()
+    busy = None
+    if request.available_at is not None:
+        busy = frozenset((await session_service.availability()).busy(*match_slot(request)))
+    matches = await graph_service.read(
+        graph_service.find_matches, request.user_id, request.skill_name, request.limit,
+        request.include_related, busy
     )
     return matches
 
+@app.post("/match/batch")
+async def find_matches_batch(request: MatchBatchRequest):
+    """Bulk /match/find: one NDJSON line per query, streamed in skill groups"""
+    async def lines():
+        schedule = None
+        if any(query.available_at is not None for query in request.queries):
+            schedule = await session_service.availability()
+        async for rows in graph_service.find_matches_batch(request.queries, schedule):
+            yield "".join(json.dumps(row) + "\n" for row in rows)
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@app.post("/match/assignments", status_code=202)
+async def start_assignments(response: Response, capacity: Optional[int] = Query(None, ge=1, le=100),
+                            wait: bool = False):
+    """
+    Start a global mentor assignment run in the background (one per process at a time).
+    wait=true answers once the run has finished instead.
+    """
+    run = await assignment_service.start(graph_service, capacity)
+    if wait:
+        run = await assignment_service.wait()
+        response.status_code = 200
+    return {"run": run}
+
+@app.get("/match/assignments")
+async def get_assignments(learner_id: Optional[str] = None, mentor_id: Optional[str] = None,
+                          limit: int = Query(100, ge=1, le=1000)):
+    """Mentor per learning goal from the latest completed assignment run, optionally for one learner or mentor"""
+    run = await assignment_service.latest()
+    assignments = []
+    if run is not None:
+        assignments = await assignment_service.get_assignments(run["id"], learner_id, mentor_id, limit)
+    return {"run": run, "running": assignment_service.running, "assignments": assignments}
+
+
+def ndjson_export(batches):
+    """Stream model batches as NDJSON, one document per line"""
+    async def lines():
+        async for batch in batches:
+            yield "".join(item.model_dump_json() + "\n" for item in batch)
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+async def paged(service, limit: int, cursor: Optional[str]) -> Response:
+    """A pre-encoded (usually cached) page from the service; the next page's cursor goes in X-Next-Cursor"""
+    try:
+        body, next_cursor = await service.get_page_json(limit, cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @app.get("/events", response_model=list[Event])
-async def get_events():
-    """Get all upcoming campus events"""
-    return await event_service.get_all()
+async def get_events(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+):
+    """Get upcoming campus events, paged by id (format=ndjson streams all of them)"""
+    if format == "ndjson":
+        return ndjson_export(event_service.stream())
+    return await paged(event_service, limit, cursor)
 
 @app.get("/sessions", response_model=list[Session])
-async def get_sessions():
-    """Get user's scheduled mentoring sessions"""
-    return await session_service.get_all()
+async def get_sessions(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+):
+    """Get user's scheduled mentoring sessions, paged by id (format=ndjson streams all of them)"""
+    if format == "ndjson":
+        return ndjson_export(session_service.stream())
+    return await paged(session_service, limit, cursor)
 
 
 @app.get("/user/{user_id}/connections")
@@ -197,12 +349,10 @@ async def login_for_access_token(form_data: LoginRequest):
     user_id = "demo_kushaan"
     username = "Kushaan Parekh"
     
-    for user in graph_service.users:
-        if user.email == form_data.username:
-            user_found = user
-            user_id = user.id
-            username = user.name
-            break
+    known_id = graph_service.find_user_by_email(form_data.username)
+    if known_id is not None:
+        user_id = known_id
+        username = (graph_service.get_user(known_id) or {}).get("name", username)
 
     access_token = create_access_token(
         data={"sub": form_data.username, "id": user_id, "name": username}
@@ -236,9 +386,8 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     user_id = payload.get("id")
     email = payload.get("sub")
     
-    user_node = f"user:{user_id}"
-    if user_node in graph_service.G.nodes():
-        node_data = graph_service.G.nodes[user_node]
+    node_data = graph_service.get_user(user_id)
+    if node_data is not None:
         return {
             "user_id": user_id,
             "name": node_data.get("name"),
@@ -274,17 +423,7 @@ async def register_user(request: UserRegisterRequest):
     )
     
     # Add to graph (in-memory for MVP)
-    graph_service.G.add_node(
-        f"user:{user_id}",
-        type="user",
-        name=new_user.name,
-        year=new_user.year,
-        branch=new_user.branch
-    )
-    
-    # Store in users list for graph rebuilding
-    graph_service.users = getattr(graph_service, 'users', [])
-    graph_service.users.append(new_user)
+    await graph_service.write(graph_service.register_user, new_user)
     
     return {
         "message": "User registered successfully",
@@ -295,12 +434,11 @@ async def register_user(request: UserRegisterRequest):
 @app.get("/user/{user_id}")
 async def get_user_profile(user_id: str):
     """Get user profile by ID"""
-    user_node = f"user:{user_id}"
+    node_data = graph_service.get_user(user_id)
     
-    if user_node not in graph_service.G.nodes():
+    if node_data is None:
         raise HTTPException(status_code=404, detail="User not found")
     
-    node_data = graph_service.G.nodes[user_node]
     connections = graph_service.get_user_connections(user_id)
     
     return {
@@ -314,42 +452,30 @@ async def get_user_profile(user_id: str):
 @app.put("/user/{user_id}")
 async def update_user_profile(user_id: str, updates: UserUpdateRequest):
     """Update user profile"""
-    user_node = f"user:{user_id}"
-    
-    if user_node not in graph_service.G.nodes():
-        raise HTTPException(status_code=404, detail="User not found")
-    
     # Update graph node attributes
-    if updates.name:
-        graph_service.G.nodes[user_node]["name"] = updates.name
-    if updates.year:
-        graph_service.G.nodes[user_node]["year"] = updates.year
-    if updates.branch:
-        graph_service.G.nodes[user_node]["branch"] = updates.branch
+    updated = await graph_service.write(
+        graph_service.update_user_profile, user_id, name=updates.name, year=updates.year, branch=updates.branch
+    )
+    if not updated:
+        raise HTTPException(status_code=404, detail="User not found")
     
     return {"message": "Profile updated", "user_id": user_id}
 
 @app.post("/user/{user_id}/skills")
 async def update_user_skills(user_id: str, skill: SkillUpdateRequest):
     """Add or update a user's skill"""
-    from .core.constants import RelationType
-    
-    user_node = f"user:{user_id}"
-    skill_node = f"skill:{skill.skill_id}"
-    
-    if user_node not in graph_service.G.nodes():
+    updated = await graph_service.write(
+        graph_service.update_user_skills,
+        user_id,
+        skill_id=skill.skill_id,
+        skill_name=skill.skill_name,
+        proficiency=skill.proficiency,
+        is_teaching=skill.is_teaching,
+        is_learning=skill.is_learning
+    )
+    if not updated:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Add skill node if doesn't exist
-    if skill_node not in graph_service.G.nodes():
-        graph_service.G.add_node(skill_node, type="skill", name=skill.skill_name, category="Custom")
-    
-    # Add edges based on teaching/learning
-    if skill.is_teaching:
-        graph_service.G.add_edge(user_node, skill_node, relation=RelationType.CAN_TEACH, proficiency=skill.proficiency)
-    if skill.is_learning:
-        graph_service.G.add_edge(user_node, skill_node, relation=RelationType.WANTS_TO_LEARN)
-    
     return {"message": "Skill updated", "user_id": user_id, "skill": skill.skill_name}
 
 
@@ -363,6 +489,18 @@ async def get_event(event_id: str):
         raise HTTPException(status_code=404, detail="Event not found")
     return event
 
+@app.get("/events/recommended/{user_id}")
+async def get_recommended_events(user_id: str, limit: int = Query(10, ge=1, le=50)):
+    """Events ranked by how well their tags and titles match the user's skills and skill categories"""
+    profile = graph_service.skill_profile(user_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    ranked = await event_service.recommend(profile_terms(**profile), limit)
+    return {
+        "user_id": user_id,
+        "events": [{**event.model_dump(), "score": score, "matched": matched} for event, score, matched in ranked],
+    }
+
 @app.post("/events")
 async def create_event(event: Event):
     """Create a new event"""
@@ -390,16 +528,17 @@ async def register_for_event(event_id: str, user_id: str):
 
 @app.post("/sessions/book")
 async def book_session(request: SessionBookRequest):
-    """Book a mentoring session"""
+    """Book a mentoring session (409 if the mentor already has a session overlapping the slot)"""
     import uuid
     session_id = f"s{uuid.uuid4().hex[:8]}"
     
     # Get mentor name from graph
-    mentor_node = f"user:{request.mentor_id}"
-    if mentor_node not in graph_service.G.nodes():
+    mentor = graph_service.get_user(request.mentor_id)
+    if mentor is None:
         raise HTTPException(status_code=404, detail="Mentor not found")
     
-    mentor_name = graph_service.G.nodes[mentor_node].get("name", "Unknown Mentor")
+    mentor_name = mentor.get("name", "Unknown Mentor")
+    slot = booking_slot(request)
     
     new_session = Session(
         id=session_id,
@@ -408,18 +547,37 @@ async def book_session(request: SessionBookRequest):
         date=request.date,
         time=request.time,
         status="Scheduled",
-        duration=request.duration
+        duration=request.duration,
+        mentor_id=request.mentor_id,
+        learner_id=request.learner_id,
+        starts_at=slot[0] if slot else None,
+        ends_at=slot[1] if slot else None,
     )
     
-    await session_service.create(new_session)
+    try:
+        await session_service.book(new_session)
+    except SlotConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    await sync_session_relation(new_session)
     return {"message": "Session booked", "session_id": session_id, "session": new_session}
 
+async def sync_session_relation(session: Session):
+    """Mirror a session into the user <-> user layer used for connection degrees"""
+    relation_id, pair = session_link(session.model_dump())
+    if pair:
+        await graph_service.write(graph_service.set_relation, relation_id, *pair)
+    else:
+        await graph_service.write(graph_service.remove_relation, relation_id)
+
 @app.put("/sessions/{session_id}")
 async def update_session(session_id: str, status: str):
     """Update session status"""
     updated = await session_service.update_status(session_id, status)
     if not updated:
         raise HTTPException(status_code=404, detail="Session not found")
+    session = await session_service.get_by_id(session_id)
+    if session:
+        await sync_session_relation(session)
     return {"message": "Session updated", "session_id": session_id, "new_status": status}
 
 @app.delete("/sessions/{session_id}")
@@ -428,6 +586,7 @@ async def cancel_session(session_id: str):
     success = await session_service.delete(session_id)
     if not success:
         raise HTTPException(status_code=404, detail="Session not found")
+    await graph_service.write(graph_service.remove_relation, session_relation(session_id))
     return {"message": "Session cancelled", "session_id": session_id}
 
 
@@ -442,15 +601,14 @@ async def send_connection_request(request: ConnectionRequest):
     from datetime import datetime
     
     # Validate users exist (Graph check is fine for existence)
-    from_node = f"user:{request.from_user_id}"
-    to_node = f"user:{request.to_user_id}"
+    sender = graph_service.get_user(request.from_user_id)
     
-    if from_node not in graph_service.G.nodes():
+    if sender is None:
         raise HTTPException(status_code=404, detail="Sender user not found")
-    if to_node not in graph_service.G.nodes():
+    if not graph_service.has_user(request.to_user_id):
         raise HTTPException(status_code=404, detail="Recipient user not found")
     
-    from_name = graph_service.G.nodes[from_node].get("name", "Unknown")
+    from_name = sender.get("name", "Unknown")
     
     new_request = ConnectionRequestStatus(
         id=f"cr{uuid.uuid4().hex[:8]}",
@@ -466,91 +624,75 @@ async def send_connection_request(request: ConnectionRequest):
     await connection_service.create(new_request)
     return {"message": "Connection request sent", "request_id": new_request.id}
 
+@app.put("/match/requests/{request_id}")
+async def update_connection_request(request_id: str, status: str):
+    """Accept or reject a connection request"""
+    updated = await connection_service.update_status(request_id, status)
+    if not updated:
+        raise HTTPException(status_code=404, detail="Connection request not found")
+
+    request = await connection_service.get_by_id(request_id)
+    if request:
+        relation_id, pair = connection_link(request.model_dump())
+        if pair:
+            await graph_service.write(graph_service.set_relation, relation_id, *pair)
+        else:
+            await graph_service.write(graph_service.remove_relation, relation_id)
+    return {"message": "Connection request updated", "request_id": request_id, "new_status": status}
+
 @app.get("/match/requests/{user_id}")
-async def get_connection_requests(user_id: str):
-    """Get pending connection requests for a user"""
-    requests = await connection_service.get_by_user(user_id)
+async def get_connection_requests(
+    user_id: str,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    incoming_cursor: Optional[str] = None,
+    outgoing_cursor: Optional[str] = None,
+    status: Optional[str] = Query(None, description="e.g. pending"),
+):
+    """Get connection requests for a user, newest first; each direction pages with its own cursor"""
+    try:
+        requests = await connection_service.get_by_user(user_id, limit, incoming_cursor, outgoing_cursor, status)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return {
         "user_id": user_id,
         **requests
     }
 
 
+@app.get("/match/requests/{user_id}/counts")
+async def get_connection_request_counts(user_id: str, status: Optional[str] = Query(None, description="e.g. pending")):
+    """Incoming/outgoing request counts (e.g. for notification badges)"""
+    return {"user_id": user_id, **await connection_service.count_by_user(user_id, status)}
+
+
 # ============== UTILITY / ANALYTICS ==============
 
 @app.get("/skills/trending")
 async def get_trending_skills():
     """Get trending skills (most learners)"""
-    skill_demand = {}
-    
-    for node in graph_service.G.nodes():
-        if str(node).startswith("skill:"):
-            skill_name = graph_service.G.nodes[node].get("name", "Unknown")
-            # Count incoming WANTS_TO_LEARN edges
-            learners = sum(1 for pred in graph_service.G.predecessors(node)
-                          if graph_service.G.edges.get((pred, node), {}).get("relation") == "WANTS_TO_LEARN")
-            skill_demand[skill_name] = learners
-    
-    # Sort by demand
-    trending = sorted(skill_demand.items(), key=lambda x: x[1], reverse=True)[:10]
-    
-    return {
-        "trending_skills": [{"skill": name, "learners": count} for name, count in trending]
-    }
+    return {"trending_skills": await graph_service.read(graph_service.trending_skills, 10)}
+
+@app.get("/skills/search")
+async def search_skills(q: str = Query(..., min_length=1, max_length=100), limit: int = Query(10, ge=1, le=50)):
+    """Skill autocomplete with prefix and typo-tolerant matching"""
+    return {"query": q, "skills": graph_service.search_skills(q, limit)}
+
+@app.get("/skills/{skill_id}/related")
+async def get_related_skills(skill_id: str, limit: int = Query(10, ge=1, le=50)):
+    """Skills most often held by the same users (co-occurrence), for "related skills" suggestions"""
+    if not graph_service.has_skill(skill_id):
+        raise HTTPException(status_code=404, detail="Skill not found")
+    return {"skill_id": skill_id, "related": await graph_service.related_skills(skill_id, limit)}
 
 @app.get("/skills/categories")
 async def get_skill_categories():
     """Get all skill categories"""
-    categories = {}
-    
-    for node in graph_service.G.nodes():
-        if str(node).startswith("skill:"):
-            category = graph_service.G.nodes[node].get("category", "General")
-            skill_name = graph_service.G.nodes[node].get("name", "Unknown")
-            
-            if category not in categories:
-                categories[category] = []
-            categories[category].append(skill_name)
-    
-    return {"categories": categories}
+    return {"categories": graph_service.skill_categories()}
 
 @app.get("/leaderboard")
 async def get_leaderboard():
     """Get top mentors by teaching proficiency"""
-    mentor_scores = {}
-    
-    for node in graph_service.G.nodes():
-        if str(node).startswith("user:"):
-            user_id = str(node).split(":")[1]
-            user_name = graph_service.G.nodes[node].get("name", "Unknown")
-            
-            # Sum proficiency of all skills they teach
-            total_proficiency = 0
-            skills_teaching = 0
-            
-            for neighbor in graph_service.G.neighbors(node):
-                edge = graph_service.G.edges.get((node, neighbor), {})
-                if edge.get("relation") == "CAN_TEACH":
-                    total_proficiency += edge.get("proficiency", 0)
-                    skills_teaching += 1
-            
-            if skills_teaching > 0:
-                mentor_scores[user_id] = {
-                    "name": user_name,
-                    "total_proficiency": total_proficiency,
-                    "skills_teaching": skills_teaching,
-                    "score": total_proficiency * skills_teaching
-                }
-    
-    # Sort by score
-    sorted_mentors = sorted(mentor_scores.items(), key=lambda x: x[1]["score"], reverse=True)[:10]
-    
-    return {
-        "leaderboard": [
-            {"rank": i+1, "user_id": uid, **data}
-            for i, (uid, data) in enumerate(sorted_mentors)
-        ]
-    }
+    return {"leaderboard": await graph_service.read(graph_service.leaderboard, 10)}
 
 
 @app.post("/demo/seed")
@@ -671,14 +813,14 @@ async def seed_demo_data():
         except ValueError:
             pass # Already exists
 
-    graph_service.build_graph(demo_users, demo_skills)
+    await graph_service.rebuild_graph(demo_users, demo_skills)
     
     return {
         "message": "Demo data seeded",
         "users": len(demo_users),
         "skills": len(demo_skills),
-        "graph_nodes": graph_service.G.number_of_nodes(),
-        "graph_edges": graph_service.G.number_of_edges()
+        "graph_nodes": graph_service.number_of_nodes(),
+        "graph_edges": graph_service.number_of_edges()
     }
 
 
@@ -1,31 +1,71 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from ..core.config import settings
+from ..core.metrics import http_requests, http_latency, http_in_flight
+import random
 import uuid
 import logging
 import time
 
 logger = logging.getLogger("middleware")
 
-class RequestIDMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
+def route_label(scope: Scope) -> str:
+    """Route template (e.g. /user/{user_id}) so metric label cardinality stays bounded"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+class RequestIDMiddleware:
+    """
+    Pure ASGI request-id, timing and metrics middleware.
+
+    Unlike BaseHTTPMiddleware it passes the request straight through to the app
+    (no extra task or memory stream per request) and only touches the
+    http.response.start message to add X-Request-ID. Request log lines are
+    emitted for a LOG_REQUEST_SAMPLE_RATE fraction of requests, plus every 5xx.
+    """
+
+    def __init__(self, app: ASGIApp, sample_rate: float = None):
+        self.app = app
+        self.sample_rate = settings.LOG_REQUEST_SAMPLE_RATE if sample_rate is None else sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         request_id = str(uuid.uuid4())
-        request.state.request_id = request_id
-        
-        # Add to logging context if we were using a structlog/contextual logger
-        # For now, we'll just log manually
-        
-        start_time = time.time()
-        logger.info(f"Request started", extra={"request_id": request_id, "path": request.url.path, "method": request.method})
-        
-        response = await call_next(request)
-        
-        process_time = time.time() - start_time
-        response.headers["X-Request-ID"] = request_id
-        
-        logger.info(f"Request finished", extra={
-            "request_id": request_id, 
-            "status_code": response.status_code, 
-            "duration": f"{process_time:.4f}s"
-        })
-        
-        return response
+        # Same place request.state.request_id reads from
+        scope.setdefault("state", {})["request_id"] = request_id
+        method = scope["method"]
+        sampled = self.sample_rate >= 1 or random.random() < self.sample_rate
+
+        start_time = time.perf_counter()
+        if sampled:
+            logger.info("Request started", extra={"request_id": request_id, "path": scope["path"], "method": method})
+
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message)["X-Request-ID"] = request_id
+            await send(message)
+
+        http_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_in_flight.dec()
+            process_time = time.perf_counter() - start_time
+            route = route_label(scope)
+            http_requests.inc(method=method, route=route, status=status_code)
+            http_latency.observe(process_time, method=method, route=route)
+
+            if sampled or status_code >= 500:
+                logger.info("Request finished", extra={
+                    "request_id": request_id,
+                    "path": scope["path"],
+                    "status_code": status_code,
+                    "duration": f"{process_time:.4f}s"
+                })
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional
+from typing import Dict, List, Optional
+from datetime import datetime
 
 class Skill(BaseModel):
     id: str
@@ -26,6 +27,14 @@ class MatchRequest(BaseModel):
     user_id: str
     skill_name: str
     limit: int = 5
+    # Fill remaining slots with mentors of related skills (co-occurrence)
+    include_related: bool = False
+    # Only mentors with no session overlapping this slot
+    available_at: Optional[datetime] = None
+    duration_minutes: int = Field(60, ge=1, le=24 * 60)
+
+class MatchBatchRequest(BaseModel):
+    queries: List[MatchRequest]
 
 class MatchResult(BaseModel):
     user_id: str
@@ -34,14 +43,20 @@ class MatchResult(BaseModel):
     branch: str
     proficiency: int
     match_score: float
-    connection_degree: int
+    connection_degree: int  # hops through sessions/connections; 4 = out of network (no path within 3)
     connection_path: List[str] = []
     mutual_exchange: Optional[str] = None
+    # Set when the mentor was suggested for another skill than the one asked for (related, or a fuzzy name match)
+    via_skill: Optional[str] = None
 
 class GraphStats(BaseModel):
     total_users: int
     total_skills: int
     total_edges: int
+    graph_version: int = 0
+    match_cache: Dict[str, float] = {}
+    last_rebuild: Optional[dict] = None
+    executors: Dict[str, dict] = {}
 
 class Event(BaseModel):
     id: str
@@ -63,6 +78,11 @@ class Session(BaseModel):
     time: str
     status: str # 'Scheduled', 'Completed', 'Cancelled'
     duration: str
+    mentor_id: Optional[str] = None
+    learner_id: Optional[str] = None
+    # Structured slot (naive UTC) behind the display strings; None for sessions booked before slots existed
+    starts_at: Optional[datetime] = None
+    ends_at: Optional[datetime] = None
 
 
 # Request Models for New Endpoints
@@ -91,6 +111,8 @@ class SessionBookRequest(BaseModel):
     date: str
     time: str
     duration: str = "1 hr"
+    learner_id: Optional[str] = None  # links mentor and learner for connection degrees
+    starts_at: Optional[datetime] = None  # exact start; otherwise read from date/time
 
 class ConnectionRequest(BaseModel):
     from_user_id: str
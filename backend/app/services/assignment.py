@@ -0,0 +1,274 @@
+import time
+import numpy as np
+from typing import List, NamedTuple, Tuple
+from .match_scoring import EdgeColumns
+
+# Learner x mentor scores formed at once while pruning candidates; bounds peak memory
+ARC_CHUNK = 1_000_000
+# Tie-break range below the score in candidate ranking keys (a power of two)
+JITTER = 1024
+
+
+class CandidateArcs(NamedTuple):
+    """Each learning edge's best mentors as CSR rows, best first"""
+    indptr: np.ndarray     # learning edge i owns arcs indptr[i]:indptr[i + 1]
+    mentors: np.ndarray    # mentor user index
+    scores: np.ndarray     # calculate_match_score of the pair
+
+
+class AuctionResult(NamedTuple):
+    mentor: np.ndarray     # per learning edge: assigned mentor user index, or -1
+    score: np.ndarray      # per learning edge: score of the assignment (0 when unassigned)
+    rounds: int
+    upper_bound: float     # no assignment of these candidates can score more than this
+
+
+def _segments(indptr: np.ndarray, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """The arcs of the given rows as one flat index array, each row's offset into it, and its length"""
+    starts, sizes = indptr[rows], indptr[rows + 1] - indptr[rows]
+    seg = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int64)
+    return np.repeat(starts - seg, sizes) + np.arange(int(sizes.sum())), seg, sizes
+
+
+def _groups(keys: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Positions sorted by key, and where each key's run starts (CSR offsets)"""
+    order = np.argsort(keys, kind="stable")
+    return order, np.concatenate([[0], np.cumsum(np.bincount(keys, minlength=n))]).astype(np.int64)
+
+
+def candidate_arcs(columns: EdgeColumns, per_learner: int, seed: int = 0) -> CandidateArcs:
+    """
+    The `per_learner` best mentors for every learning edge, scored exactly like
+    calculate_match_score (the learner is never their own mentor).
+
+    Scores are formed one skill at a time as a (learners x mentors) block in
+    chunks of ARC_CHUNK pairs. The proficiency, year and branch factors only
+    depend on the learner's (year, branch), so each distinct pair's row is
+    computed once and gathered; the exchange bonus ORs together the rows of a
+    (skill x mentor) "mentor wants to learn it" table for the skills the
+    learner teaches. Ranking uses an integer key with the score in the high
+    bits and a jitter below it: a random rotation (learner offset + mentor
+    offset), so equally good mentors are spread across learners instead of
+    everyone pruning to the same few.
+    """
+    n_users, n_skills = len(columns.year), len(columns.skill_ids)
+    n_learn = len(columns.learn_user)
+    k_max = max(per_learner, 1)
+    out_mentor = np.full((n_learn, k_max), -1, dtype=np.int32)
+    out_score = np.zeros((n_learn, k_max), dtype=np.int16)
+
+    rng = np.random.default_rng(seed)
+    user_offset = rng.integers(0, JITTER, n_users, dtype=np.int32)
+    learner_offset = rng.integers(0, JITTER, n_learn, dtype=np.int32)
+    year, branch = columns.year.astype(np.int16), columns.branch.astype(np.int64)
+    # (year, branch) profile of each user, as one key
+    profile = year.astype(np.int64) * (int(branch.max(initial=0)) + 1) + branch
+
+    teaches_order, teaches_ptr = _groups(columns.teach_user, n_users)
+    teaches_skill = columns.teach_skill[teaches_order]
+    learns_order, learns_ptr = _groups(columns.learn_user, n_users)
+    learns_skill = columns.learn_skill[learns_order]
+
+    learn_order, learn_ptr = _groups(columns.learn_skill, n_skills)
+    teach_order, teach_ptr = _groups(columns.teach_skill, n_skills)
+    for s in range(n_skills):
+        learners = learn_order[learn_ptr[s]:learn_ptr[s + 1]]
+        teachers = teach_order[teach_ptr[s]:teach_ptr[s + 1]]
+        if not len(learners) or not len(teachers):
+            continue
+        mentor = columns.teach_user[teachers]
+        n_mentors = len(mentor)
+        # Factor 1: Mentor's proficiency
+        points = np.maximum(columns.teach_prof[teachers], 1).astype(np.int16) * 5
+        m_year, m_branch, m_offset = year[mentor], branch[mentor], user_offset[mentor]
+        # wants[i, j]: mentor j wants to learn skill wanted[i]; the extra last row is all False.
+        # Rows are padded to whole uint64 words so they can be OR-ed a word at a time.
+        flat, _, sizes = _segments(learns_ptr, mentor)
+        wanted, row = np.unique(learns_skill[flat], return_inverse=True)
+        wants = np.zeros((len(wanted) + 1, -(-n_mentors // 8) * 8), dtype=bool)
+        wants[row, np.repeat(np.arange(n_mentors), sizes)] = True
+        wants_words = wants.view(np.uint64)
+        k = min(k_max, n_mentors)
+
+        rows = max(ARC_CHUNK // n_mentors, 1)
+        for lo in range(0, len(learners), rows):
+            edges = learners[lo:lo + rows]
+            learner = columns.learn_user[edges]
+            # Factor 2: year difference; Factor 3: same branch (one row per distinct learner profile)
+            profiles, pick = np.unique(profile[learner], return_inverse=True)
+            first = learner[np.unique(pick, return_index=True)[1]]
+            table = points + np.maximum(m_year - year[first][:, None], 0) * 10
+            table += (m_branch == branch[first][:, None]) * np.int16(15)
+            score = table[pick]
+
+            # Factor 4: Mutual exchange opportunity
+            flat, seg, sizes = _segments(teaches_ptr, learner)
+            if len(flat) and len(wanted):
+                taught = teaches_skill[flat]
+                row = np.minimum(np.searchsorted(wanted, taught), len(wanted))
+                row[wanted[np.minimum(row, len(wanted) - 1)] != taught] = len(wanted)
+                # rows[r, t]: wants row of the t-th skill learner r teaches
+                rows_taught = np.full((len(edges), int(sizes.max())), len(wanted))
+                rows_taught[np.repeat(np.arange(len(edges)), sizes), np.arange(len(flat)) - np.repeat(seg, sizes)] = row
+                mutual = wants_words[rows_taught[:, 0]]
+                for t in range(1, rows_taught.shape[1]):
+                    mutual |= wants_words[rows_taught[:, t]]
+                score += mutual.view(bool)[:, :n_mentors] * np.int16(25)
+            np.minimum(score, 100, out=score)
+
+            key = score.astype(np.int32) * JITTER
+            key += (learner_offset[edges][:, None] + m_offset) & (JITTER - 1)
+            for r in np.flatnonzero(np.isin(learner, mentor)).tolist():
+                key[r, mentor == learner[r]] = -1
+            top = np.argpartition(key, n_mentors - k, axis=1)[:, n_mentors - k:] if k < n_mentors \
+                else np.broadcast_to(np.arange(k), (len(edges), k))
+            top_key = np.take_along_axis(key, top, axis=1)
+            order = np.argsort(-top_key, axis=1)
+            top, top_key = np.take_along_axis(top, order, axis=1), np.take_along_axis(top_key, order, axis=1)
+            picked = top_key >= 0
+            out_mentor[edges, :k] = np.where(picked, mentor[top], -1)
+            out_score[edges, :k] = np.where(picked, top_key // JITTER, 0)
+
+    keep = out_mentor >= 0
+    indptr = np.concatenate([[0], np.cumsum(keep.sum(axis=1))]).astype(np.int64)
+    return CandidateArcs(indptr, out_mentor[keep], out_score[keep].astype(np.float64))
+
+
+def auction(arcs: CandidateArcs, n_mentors: int, capacity: int, epsilon: float,
+            max_rounds: int = 100_000) -> AuctionResult:
+    """
+    Max-score assignment of learning edges to mentors, at most `capacity` learners per mentor.
+
+    Forward auction (Bertsekas) over capacity slots: every mentor is `capacity`
+    identical objects, each with its own price, and a learner may stay
+    unassigned at value 0. All unassigned learners bid at once each round, on
+    their best mentor's cheapest slot, raising it by their margin over the
+    second-best option plus epsilon. Each mentor takes its highest bidders,
+    one per slot tied for cheapest, evicting the slots' previous holders. A
+    learner whose best net value drops to 0 leaves for good (prices never fall,
+    and a slot nobody holds still costs 0).
+
+    The total is within epsilon per learner of the best assignment over the
+    candidate arcs; rounds grow with (score range / epsilon). upper_bound is
+    the dual objective at the final prices.
+    """
+    indptr, arc_mentor, arc_score = arcs
+    n_learn = len(indptr) - 1
+    # Slot prices and holders; each mentor's row is kept sorted by price so [:, 0] is its cheapest slot
+    price = np.zeros((n_mentors, capacity))
+    holder = np.full((n_mentors, capacity), -1, dtype=np.int64)
+    no_runner_up = np.full(n_mentors, np.inf)
+    assigned = np.full(n_learn, -1, dtype=np.int64)
+    has_arcs = np.diff(indptr) > 0
+    active = has_arcs.copy()
+
+    rounds = 0
+    while rounds < max_rounds:
+        bidders = np.flatnonzero(active)
+        if not len(bidders):
+            break
+        rounds += 1
+        cheapest = price[:, 0]
+        runner_up = price[:, 1] if capacity > 1 else no_runner_up
+
+        flat, seg, sizes = _segments(indptr, bidders)
+        mentor = arc_mentor[flat]
+        value = arc_score[flat] - cheapest[mentor]
+        best = np.maximum.reduceat(value, seg)
+        row = np.repeat(np.arange(len(bidders)), sizes)
+        first = np.minimum.reduceat(np.where(value == best[row], np.arange(len(flat)), len(flat)), seg)
+        value[first] = -np.inf
+        second = np.maximum.reduceat(value, seg)
+        target = mentor[first]
+        # The same mentor's next-cheapest slot is also an alternative; so is staying unassigned
+        second = np.maximum(np.maximum(second, arc_score[flat[first]] - runner_up[target]), 0.0)
+
+        leaving = best <= 0
+        active[bidders[leaving]] = False
+        bidding = ~leaving
+        bidders, target = bidders[bidding], target[bidding]
+        bids = cheapest[target] + best[bidding] - second[bidding] + epsilon
+
+        # Highest bids first within each mentor; the r-th takes the r-th slot tied for cheapest
+        order = np.lexsort((-bids, target))
+        bidders, target, bids = bidders[order], target[order], bids[order]
+        group_start = np.flatnonzero(np.concatenate([[True], target[1:] != target[:-1]]))
+        rank = np.arange(len(target)) - np.repeat(group_start, np.diff(np.append(group_start, len(target))))
+        wins = rank < (price[target] == cheapest[target, None]).sum(axis=1)
+        bidders, target, bids, rank = bidders[wins], target[wins], bids[wins], rank[wins]
+
+        evicted = holder[target, rank]
+        evicted = evicted[evicted >= 0]
+        assigned[evicted] = -1
+        active[evicted] = True
+        holder[target, rank] = bidders
+        price[target, rank] = bids
+        assigned[bidders] = target
+        active[bidders] = False
+
+        touched = np.unique(target)
+        resort = np.argsort(price[touched], axis=1, kind="stable")
+        price[touched] = np.take_along_axis(price[touched], resort, axis=1)
+        holder[touched] = np.take_along_axis(holder[touched], resort, axis=1)
+
+    score = np.zeros(n_learn)
+    rows = np.flatnonzero(assigned >= 0)
+    if len(rows):
+        # The assigned mentor's arc in each row (rows hold each mentor at most once)
+        flat, _, sizes = _segments(indptr, rows)
+        score[rows] = arc_score[flat[arc_mentor[flat] == np.repeat(assigned[rows], sizes)]]
+
+    # Dual: every slot's price, plus each learner's best net value at those prices (0 if none)
+    net = np.zeros(n_learn)
+    nonempty = np.flatnonzero(has_arcs)
+    if len(nonempty):
+        net[nonempty] = np.maximum(np.maximum.reduceat(arc_score - price[arc_mentor, 0], indptr[nonempty]), 0)
+    return AuctionResult(assigned, score, rounds, float(price.sum() + net.sum()))
+
+
+def assign(columns: EdgeColumns, capacity: int, per_learner: int, epsilon: float, seed: int = 0) -> Tuple[List[dict], dict]:
+    """
+    Global mentor assignment for every WANTS_TO_LEARN edge; runs in a rebuild worker.
+
+    Returns one row per learning edge (mentor fields None when it could not be
+    placed) and the run's stats.
+    """
+    start = time.perf_counter()
+    arcs = candidate_arcs(columns, per_learner, seed)
+    pruned = time.perf_counter()
+    result = auction(arcs, len(columns.user_ids), max(capacity, 1), epsilon)
+    solved = time.perf_counter()
+
+    user_ids, user_names = columns.user_ids, columns.user_names
+    skill_ids, skill_names = columns.skill_ids, columns.skill_names
+    rows = []
+    for learner, skill, mentor, score in zip(columns.learn_user.tolist(), columns.learn_skill.tolist(),
+                                             result.mentor.tolist(), result.score.tolist()):
+        rows.append({
+            "learner_id": user_ids[learner],
+            "learner_name": user_names[learner],
+            "skill_id": skill_ids[skill],
+            "skill_name": skill_names[skill],
+            "mentor_id": user_ids[mentor] if mentor >= 0 else None,
+            "mentor_name": user_names[mentor] if mentor >= 0 else None,
+            "match_score": score if mentor >= 0 else None,
+        })
+
+    placed = result.mentor >= 0
+    total = float(result.score.sum())
+    load = np.bincount(result.mentor[placed], minlength=len(user_ids))
+    stats = {
+        "learning_edges": len(rows),
+        "assigned": int(placed.sum()),
+        "unassigned": int((~placed).sum()),
+        "without_candidates": int((np.diff(arcs.indptr) == 0).sum()),
+        "mentors_used": int((load > 0).sum()),
+        "mentor_capacity": max(capacity, 1),
+        "total_score": round(total, 3),
+        "upper_bound": round(result.upper_bound, 3),
+        "candidate_arcs": int(len(arcs.mentors)),
+        "rounds": result.rounds,
+        "prune_s": round(pruned - start, 3),
+        "auction_s": round(solved - pruned, 3),
+    }
+    return rows, stats
@@ -0,0 +1,166 @@
+from typing import Dict, List, Optional
+from datetime import datetime
+from ..core.database import db
+import asyncio
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Assignment rows written per insert_many
+INSERT_BATCH = 5000
+
+
+class AssignmentService:
+    """
+    Runs the global mentor assignment as a background job and keeps its results.
+
+    With MongoDB every run is recorded in assignment_runs and its rows live in
+    assignments, tagged with its run_id. A run is marked completed only once
+    all its rows are written, and only then are the rows of finished runs
+    started before it deleted, so readers of the latest completed run never
+    see a half-written or half-deleted run. A failed run deletes its own rows;
+    otherwise everything stays in memory.
+    """
+
+    def __init__(self):
+        # Fallback in-memory storage: the latest completed run and its rows, indexed by learner and mentor
+        self.completed: Optional[dict] = None
+        self.rows: List[dict] = []
+        self._by_learner: Dict[str, List[dict]] = {}
+        self._by_mentor: Dict[str, List[dict]] = {}
+        # The run in flight in this process, if any
+        self.running: Optional[dict] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def collection(self):
+        if db.db is not None:
+            return db.db["assignments"]
+        return None
+
+    @property
+    def runs(self):
+        if db.db is not None:
+            return db.db["assignment_runs"]
+        return None
+
+    async def start(self, graph, capacity: Optional[int] = None) -> dict:
+        """Start a run unless one is already in flight; returns the run record either way"""
+        if self._task is not None and not self._task.done():
+            return self.running
+        run = {
+            "id": f"ar{uuid.uuid4().hex[:8]}",
+            "status": "running",
+            "started_at": datetime.utcnow().isoformat(),
+            "finished_at": None,
+            "stats": None,
+            "error": None,
+        }
+        if self.runs is not None:
+            await self.runs.insert_one(dict(run))
+        self.running = run
+        self._task = asyncio.ensure_future(self._run(graph, run, capacity))
+        return run
+
+    async def wait(self) -> Optional[dict]:
+        """The in-flight run once it has finished (None if there is none)"""
+        if self._task is None:
+            return None
+        await asyncio.shield(self._task)
+        return self._task.result()
+
+    async def _run(self, graph, run: dict, capacity: Optional[int]) -> dict:
+        try:
+            rows, stats = await graph.assign_mentors(capacity)
+            await self._store(run["id"], rows)
+            run.update(status="completed", stats=stats)
+        except Exception as e:
+            logger.error(f"Mentor assignment run {run['id']} failed: {e}")
+            run.update(status="failed", error=str(e))
+        run["finished_at"] = datetime.utcnow().isoformat()
+        if self.runs is not None:
+            await self.runs.update_one({"id": run["id"]}, {"$set": {
+                key: run[key] for key in ("status", "finished_at", "stats", "error")
+            }})
+            if run["status"] == "completed":
+                await self._drop_older(run)
+            else:
+                await self._drop_own(run)
+        if run["status"] == "completed":
+            self.completed = run
+        self.running = None
+        return run
+
+    async def _store(self, run_id: str, rows: List[dict]):
+        if self.collection is not None:
+            for start in range(0, len(rows), INSERT_BATCH):
+                await self.collection.insert_many([{**row, "run_id": run_id} for row in rows[start:start + INSERT_BATCH]])
+            return
+
+        by_learner: Dict[str, List[dict]] = {}
+        by_mentor: Dict[str, List[dict]] = {}
+        for row in rows:
+            by_learner.setdefault(row["learner_id"], []).append(row)
+            if row["mentor_id"] is not None:
+                by_mentor.setdefault(row["mentor_id"], []).append(row)
+        self.rows, self._by_learner, self._by_mentor = rows, by_learner, by_mentor
+
+    async def _drop_older(self, run: dict):
+        """
+        Delete the rows of finished runs started before this one, once it is completed.
+
+        Runs started later (e.g. by another worker) keep their rows whichever
+        finishes first, runs still writing (e.g. started earlier on a slower
+        worker) are left to finish, and latest() never points at a run whose
+        rows are gone.
+        """
+        try:
+            older = await self.runs.find(self.older_runs_filter(run), {"_id": 0, "id": 1}).to_list(None)
+            if older:
+                await self.collection.delete_many({"run_id": {"$in": [doc["id"] for doc in older]}})
+        except Exception as e:
+            logger.warning(f"Could not delete assignments older than run {run['id']}: {e}")
+
+    async def _drop_own(self, run: dict):
+        """Delete whatever rows a failed run managed to write"""
+        try:
+            await self.collection.delete_many({"run_id": run["id"]})
+        except Exception as e:
+            logger.warning(f"Could not delete assignments of failed run {run['id']}: {e}")
+
+    async def latest(self) -> Optional[dict]:
+        """The most recent completed run"""
+        if self.runs is not None:
+            return await self.runs.find_one({"status": "completed"}, {"_id": 0}, sort=[("started_at", -1)])
+        return self.completed
+
+    async def get_assignments(self, run_id: str, learner_id: Optional[str] = None,
+                              mentor_id: Optional[str] = None, limit: int = 100) -> List[dict]:
+        """A run's rows, optionally for one learner or one mentor"""
+        if self.collection is not None:
+            query = self.assignment_filter(run_id, learner_id, mentor_id)
+            return await self.collection.find(query, {"_id": 0, "run_id": 0}).to_list(limit)
+
+        if learner_id is not None:
+            rows = self._by_learner.get(learner_id, [])
+            if mentor_id is not None:
+                rows = [row for row in rows if row["mentor_id"] == mentor_id]
+        elif mentor_id is not None:
+            rows = self._by_mentor.get(mentor_id, [])
+        else:
+            rows = self.rows
+        return rows[:limit]
+
+    @staticmethod
+    def older_runs_filter(run: dict) -> dict:
+        return {"status": {"$in": ["completed", "failed"]}, "started_at": {"$lt": run["started_at"]}}
+
+    @staticmethod
+    def assignment_filter(run_id: str, learner_id: Optional[str] = None, mentor_id: Optional[str] = None) -> dict:
+        query = {"run_id": run_id}
+        if learner_id is not None:
+            query["learner_id"] = learner_id
+        if mentor_id is not None:
+            query["mentor_id"] = mentor_id
+        return query
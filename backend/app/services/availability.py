@@ -0,0 +1,262 @@
+import re
+from functools import lru_cache
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Dict, List, Optional, Set, Tuple
+from zoneinfo import ZoneInfo
+from ..core.config import settings
+from ..models import MatchRequest, Session, SessionBookRequest
+
+DEFAULT_DURATION = timedelta(hours=1)
+
+# Statuses that free the mentor's slot
+FREE_STATUSES = frozenset(("Cancelled",))
+
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)\s*(h|hr|hrs|hour|hours|m|min|mins|minute|minutes)\b", re.IGNORECASE)
+_CLOCK_FORMATS = ("%I:%M %p", "%I %p", "%I:%M%p", "%I%p", "%H:%M")
+_DATE_FORMATS = ("%Y-%m-%d", "%b %d, %Y", "%B %d, %Y", "%b %d", "%B %d", "%d %b %Y", "%d %b")
+
+
+class SlotConflict(ValueError):
+    """The mentor already has a session overlapping the requested slot"""
+
+    def __init__(self, session_id: str):
+        super().__init__(f"Mentor is already booked at that time (session {session_id})")
+        self.session_id = session_id
+
+
+def campus_zone() -> tzinfo:
+    """The zone session date/time strings are written in (settings.CAMPUS_TIMEZONE)"""
+    return _zone(settings.CAMPUS_TIMEZONE)
+
+
+@lru_cache(maxsize=8)
+def _zone(name: str) -> tzinfo:
+    # UTC resolves without a zone database (Windows has none unless tzdata is installed)
+    return timezone.utc if name.upper() == "UTC" else ZoneInfo(name)
+
+
+def utc(moment: datetime) -> datetime:
+    """Aware UTC; naive datetimes (e.g. read back from MongoDB) are taken to be UTC already"""
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+def timestamp(moment: datetime) -> float:
+    return utc(moment).timestamp()
+
+
+def parse_duration(text: str) -> Optional[timedelta]:
+    """Session length from "1 hr", "45 min", "1.5 hr" or "1 hr 30 min"; None if no unit is recognised"""
+    total = timedelta()
+    found = False
+    for amount, unit in _DURATION.findall(text or ""):
+        found = True
+        hours = unit.lower().startswith("h")
+        total += timedelta(hours=float(amount)) if hours else timedelta(minutes=float(amount))
+    return total if found and total > timedelta() else None
+
+
+def parse_slot(date: str, time: str, duration: str, now: datetime) -> Optional[Tuple[datetime, datetime]]:
+    """
+    (start, end) in UTC for the free-form strings sessions are booked with ("Today" /
+    "Feb 12" / "2026-02-12", "04:00 PM" / "16:00", "1 hr").
+
+    The strings are wall-clock times in now's zone (UTC if now is naive), and
+    "Today"/"Tomorrow" are that zone's dates. None when the date or time
+    cannot be read (e.g. "Every Sat").
+    """
+    zone = now.tzinfo or timezone.utc
+    text = (date or "").strip()
+    lowered = text.lower()
+    if lowered == "today":
+        day = now.date()
+    elif lowered == "tomorrow":
+        day = now.date() + timedelta(days=1)
+    else:
+        day = None
+        for fmt in _DATE_FORMATS:
+            try:
+                parsed = datetime.strptime(text, fmt)
+            except ValueError:
+                continue
+            # Formats without a year parse as 1900
+            day = (parsed.replace(year=now.year) if "%Y" not in fmt else parsed).date()
+            break
+    if day is None:
+        return None
+
+    clock = None
+    for fmt in _CLOCK_FORMATS:
+        try:
+            clock = datetime.strptime((time or "").strip().upper(), fmt).time()
+            break
+        except ValueError:
+            continue
+    if clock is None:
+        return None
+
+    start = utc(datetime.combine(day, clock, tzinfo=zone))
+    return start, start + (parse_duration(duration) or DEFAULT_DURATION)
+
+
+def booking_slot(request: SessionBookRequest, now: Optional[datetime] = None) -> Optional[Tuple[datetime, datetime]]:
+    """
+    UTC slot for a booking: its exact starts_at if given (naive = UTC), else
+    read from its date/time strings as campus-local times.
+    """
+    if request.starts_at is None:
+        return parse_slot(request.date, request.time, request.duration, now or datetime.now(campus_zone()))
+    start = utc(request.starts_at)
+    return start, start + (parse_duration(request.duration) or DEFAULT_DURATION)
+
+
+def match_slot(request: MatchRequest) -> Tuple[datetime, datetime]:
+    """The [start, end) a /match/find query needs its mentors free for"""
+    start = utc(request.available_at)
+    return start, start + timedelta(minutes=request.duration_minutes)
+
+
+class _MentorSlots:
+    """One mentor's bookings as parallel arrays sorted by start, plus a running max of ends"""
+    __slots__ = ("starts", "ends", "ids", "reach")
+
+    def __init__(self):
+        self.starts: List[float] = []
+        self.ends: List[float] = []
+        self.ids: List[str] = []
+        self.reach: List[float] = []     # reach[i] = max(ends[:i + 1])
+
+    def __len__(self):
+        return len(self.ids)
+
+    def insert(self, session_id: str, start: float, end: float):
+        i = bisect_right(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+        self.ids.insert(i, session_id)
+        self.reach.insert(i, end)
+        self._refresh_reach(i)
+
+    def delete(self, session_id: str, start: float):
+        i = bisect_left(self.starts, start)
+        while self.ids[i] != session_id:
+            i += 1
+        for column in (self.starts, self.ends, self.ids, self.reach):
+            del column[i]
+        self._refresh_reach(i)
+
+    def _refresh_reach(self, i: int):
+        furthest = self.reach[i - 1] if i else float("-inf")
+        for k in range(i, len(self.ends)):
+            furthest = max(furthest, self.ends[k])
+            self.reach[k] = furthest
+
+    def conflict(self, start: float, end: float) -> Optional[str]:
+        """
+        A session overlapping [start, end), or None. Sessions starting before
+        `end` are a prefix; one of them overlaps iff the prefix reaches past
+        `start`, so the answer is one bisect (the walk back only runs on a hit).
+        """
+        j = bisect_left(self.starts, end)
+        if j == 0 or self.reach[j - 1] <= start:
+            return None
+        for k in range(j - 1, -1, -1):
+            if self.ends[k] > start:
+                return self.ids[k]
+        return None
+
+
+class AvailabilityIndex:
+    """
+    Booked time slots per mentor.
+
+    conflict() answers "is this mentor free for [start, end)" in O(log n) of
+    their bookings. busy() lists every mentor booked during a slot from one
+    start-sorted list of all bookings: only sessions starting within the
+    longest booking's length before the slot can reach into it, so the scan
+    is bounded by the sessions in that window. Booking lengths are counted so
+    the window shrinks back when the longest booking is removed.
+    """
+
+    def __init__(self):
+        self.mentors: Dict[str, _MentorSlots] = {}
+        self.sessions: Dict[str, Tuple[str, float, float]] = {}    # session_id -> (mentor_id, start, end)
+        self._starts: List[float] = []
+        self._ids: List[str] = []
+        self._lengths: Dict[float, int] = {}    # booking length -> bookings of that length
+        self._longest = 0.0
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self.sessions
+
+    def add(self, session: Session):
+        """Index (or re-index) a session; cancelled or unscheduled ones are dropped"""
+        self.remove(session.id)
+        if not session.mentor_id or session.starts_at is None or session.ends_at is None:
+            return
+        if session.status in FREE_STATUSES:
+            return
+        start, end = timestamp(session.starts_at), timestamp(session.ends_at)
+        if end <= start:
+            return
+
+        self.sessions[session.id] = (session.mentor_id, start, end)
+        self.mentors.setdefault(session.mentor_id, _MentorSlots()).insert(session.id, start, end)
+        i = bisect_right(self._starts, start)
+        self._starts.insert(i, start)
+        self._ids.insert(i, session.id)
+        self._lengths[end - start] = self._lengths.get(end - start, 0) + 1
+        self._longest = max(self._longest, end - start)
+        self.version += 1
+
+    def remove(self, session_id: str) -> bool:
+        entry = self.sessions.pop(session_id, None)
+        if entry is None:
+            return False
+        mentor_id, start, end = entry
+        self._forget_length(end - start)
+        slots = self.mentors[mentor_id]
+        slots.delete(session_id, start)
+        if not slots:
+            del self.mentors[mentor_id]
+        i = bisect_left(self._starts, start)
+        while self._ids[i] != session_id:
+            i += 1
+        del self._starts[i]
+        del self._ids[i]
+        self.version += 1
+        return True
+
+    def _forget_length(self, length: float):
+        remaining = self._lengths.pop(length) - 1
+        if remaining:
+            self._lengths[length] = remaining
+        elif length == self._longest:
+            # Sessions come in a handful of lengths, so this max is over very few keys
+            self._longest = max(self._lengths, default=0.0)
+
+    def conflict(self, mentor_id: str, start: datetime, end: datetime) -> Optional[str]:
+        """Id of a booking of the mentor overlapping [start, end), or None"""
+        slots = self.mentors.get(mentor_id)
+        if slots is None:
+            return None
+        return slots.conflict(timestamp(start), timestamp(end))
+
+    def busy(self, start: datetime, end: datetime) -> Set[str]:
+        """Mentors with a booking overlapping [start, end)"""
+        lo_time, hi_time = timestamp(start), timestamp(end)
+        lo = bisect_right(self._starts, lo_time - self._longest)
+        hi = bisect_left(self._starts, hi_time)
+        sessions = self.sessions
+        busy = set()
+        for session_id in self._ids[lo:hi]:
+            mentor_id, _, session_end = sessions[session_id]
+            if session_end > lo_time:
+                busy.add(mentor_id)
+        return busy
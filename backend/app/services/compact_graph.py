@@ -0,0 +1,678 @@
+from array import array
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from ..core.constants import RelationType, NodeType
+from .graph_store import SkillRecord, UserRecord, EdgeRecord
+from .match_scoring import CandidateBatch, EdgeColumns, MentorColumns
+from .graph_views import GraphViews
+
+# Relation codes stored in the uint8 edge column (0 = no edge)
+TEACH = 1
+LEARN = 2
+REL_CODES = {RelationType.CAN_TEACH: TEACH, RelationType.WANTS_TO_LEARN: LEARN}
+
+_EMPTY_I32 = np.zeros(0, dtype=np.int32)
+_EMPTY_U8 = np.zeros(0, dtype=np.uint8)
+
+
+class Interner:
+    """Dense string <-> int mapping; ids are never reused"""
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.index: Dict[str, int] = {}
+
+    def intern(self, key: str) -> int:
+        idx = self.index.get(key)
+        if idx is None:
+            idx = len(self.ids)
+            self.index[key] = idx
+            self.ids.append(key)
+        return idx
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def _fit(column: np.ndarray, size: int) -> np.ndarray:
+    """Grow a column geometrically so appends stay amortized O(1)"""
+    if size <= len(column):
+        return column
+    grown = np.zeros(max(size, 2 * len(column), 16), dtype=column.dtype)
+    grown[:len(column)] = column
+    return grown
+
+
+def _csr(keys: np.ndarray, n_rows: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Row pointers and a stable row-ordered permutation of the positions in keys"""
+    order = np.argsort(keys, kind="stable").astype(np.int32)
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=n_rows), out=indptr[1:])
+    return indptr, order
+
+
+class CompactGraphStore:
+    """
+    Array-backed graph store.
+
+    Node ids are interned to dense ints and node attributes live in NumPy columns
+    (year as uint8, branch/category as codes). Edges are one COO table in write order
+    (user int32, skill int32, relation uint8, proficiency uint8) with CSR-style
+    permutations by user, by skill for CAN_TEACH and by skill for WANTS_TO_LEARN.
+
+    Writes after a build go to a small per-user overlay that shadows the CSR rows of
+    the users it touches; the overlay is folded back into the arrays once it grows past
+    COMPACT_THRESHOLD users or an aggregate needs a clean view.
+    """
+    backend = "compact"
+    COMPACT_THRESHOLD = 256
+
+    def __init__(self):
+        self._users = Interner()
+        self._skills = Interner()
+        self._branches = Interner()
+        self._categories = Interner()
+
+        self.user_names: List[Optional[str]] = []
+        self.user_year = _EMPTY_U8
+        self.user_branch = _EMPTY_I32
+        # Users only seen through an edge (never add_user'd): the attributes update_user gave them,
+        # which networkx keeps as a partial node dict
+        self._implicit: Dict[int, dict] = {}
+        self.skill_names: List[Optional[str]] = []
+        self.skill_category = _EMPTY_I32
+        self.skill_by_name: Dict[str, int] = {}
+
+        # Canonical edge table (one live edge per user/skill pair)
+        self.edge_user = _EMPTY_I32
+        self.edge_skill = _EMPTY_I32
+        self.edge_rel = _EMPTY_U8
+        self.edge_prof = _EMPTY_U8
+        self._index_edges()
+
+        # user -> {skill: (relation code, proficiency)}; shadows that user's CSR rows
+        self._dirty: Dict[int, Dict[int, Tuple[int, int]]] = {}
+        self._dirty_mask = np.zeros(0, dtype=bool)
+        self._n_edges = 0
+        self._load_cols = None
+        self.views = GraphViews()
+
+    def load(self, skills: Iterable[SkillRecord], users: Iterable[UserRecord], edges: Iterable[EdgeRecord]):
+        """Bulk-populate an empty store straight into the edge arrays"""
+        for skill_id, name, category in skills:
+            self.add_skill(skill_id, name, category)
+        for user_id, name, year, branch in users:
+            self.add_user(user_id, name, year, branch)
+        self.load_edges(edges)
+        self.finish_load()
+
+    def load_edges(self, edges: Iterable[EdgeRecord]):
+        """Append a batch of edges to the pending load columns (indexed by finish_load)"""
+        if self._load_cols is None:
+            self._load_cols = (array("i"), array("i"), array("B"), array("B"))
+        cols_user, cols_skill, cols_rel, cols_prof = self._load_cols
+        for user_id, skill_id, relation, proficiency in edges:
+            cols_user.append(self._intern_user(user_id))
+            cols_skill.append(self._intern_skill(skill_id))
+            cols_rel.append(REL_CODES[relation])
+            cols_prof.append(proficiency or 0)
+
+    def finish_load(self):
+        """Dedupe the loaded edges and build the CSR permutations"""
+        if self._load_cols is None:
+            self._set_edge_table(_EMPTY_I32, _EMPTY_I32, _EMPTY_U8, _EMPTY_U8)
+            return
+        cols_user, cols_skill, cols_rel, cols_prof = self._load_cols
+        self._load_cols = None
+        self._set_edge_table(
+            np.frombuffer(cols_user, dtype=np.int32),
+            np.frombuffer(cols_skill, dtype=np.int32),
+            np.frombuffer(cols_rel, dtype=np.uint8),
+            np.frombuffer(cols_prof, dtype=np.uint8),
+        )
+        self._load_views()
+
+    def _load_views(self):
+        """Edge aggregates for the analytics views, straight from the edge table"""
+        n_users, n_skills = len(self._users), len(self._skills)
+        teach = self.edge_rel == TEACH
+        learners = np.bincount(self.edge_skill[self.edge_rel == LEARN], minlength=n_skills)
+        totals = np.bincount(self.edge_user[teach], weights=self.edge_prof[teach], minlength=n_users)
+        counts = np.bincount(self.edge_user[teach], minlength=n_users)
+        skill_ids, user_ids = self._skills.ids, self._users.ids
+        self.views.load_edges(
+            {skill_ids[s]: int(learners[s]) for s in np.flatnonzero(learners).tolist()},
+            {user_ids[u]: (int(totals[u]), int(counts[u])) for u in np.flatnonzero(counts).tolist()},
+            self._n_edges,
+        )
+
+    # ============== SNAPSHOTS ==============
+
+    SNAPSHOT_ARRAYS = ("user_year", "user_branch", "skill_category",
+                       "edge_user", "edge_skill", "edge_rel", "edge_prof",
+                       "user_ptr", "user_perm", "teach_ptr", "teach_perm", "learn_ptr", "learn_perm")
+
+    def snapshot(self) -> Tuple[Dict[str, np.ndarray], dict]:
+        """
+        Arrays and string tables that fully describe the store.
+
+        Edge and CSR arrays are only ever replaced, never written in place, so
+        they are shared as-is; the per-node columns are copied.
+        """
+        self.compact()
+        n_users, n_skills = len(self._users), len(self._skills)
+        arrays = {name: getattr(self, name) for name in self.SNAPSHOT_ARRAYS}
+        arrays["user_year"] = self.user_year[:n_users].copy()
+        arrays["user_branch"] = self.user_branch[:n_users].copy()
+        arrays["skill_category"] = self.skill_category[:n_skills].copy()
+        strings = {
+            "user_ids": list(self._users.ids),
+            "user_live": list(self._users.index.values()),
+            "user_names": list(self.user_names),
+            "user_implicit": [[u, attrs] for u, attrs in self._implicit.items()],
+            "skill_ids": list(self._skills.ids),
+            "skill_live": list(self._skills.index.values()),
+            "skill_names": list(self.skill_names),
+            "skill_by_name": dict(self.skill_by_name),
+            "branches": list(self._branches.ids),
+            "categories": list(self._categories.ids),
+        }
+        return arrays, strings
+
+    @classmethod
+    def from_snapshot(cls, arrays: Dict[str, np.ndarray], strings: dict) -> "CompactGraphStore":
+        """Rebuild a store around snapshot arrays (which may be memory-mapped)"""
+        store = cls()
+        for interner, ids, live in ((store._users, strings["user_ids"], strings["user_live"]),
+                                    (store._skills, strings["skill_ids"], strings["skill_live"]),
+                                    (store._branches, strings["branches"], None),
+                                    (store._categories, strings["categories"], None)):
+            interner.ids = list(ids)
+            slots = range(len(ids)) if live is None else live
+            interner.index = {ids[i]: i for i in slots}
+
+        store.user_names = list(strings["user_names"])
+        store._implicit = {u: dict(attrs) for u, attrs in strings.get("user_implicit", [])}
+        store.skill_names = list(strings["skill_names"])
+        store.skill_by_name = dict(strings["skill_by_name"])
+        for name in cls.SNAPSHOT_ARRAYS:
+            setattr(store, name, arrays[name])
+        store._dirty_mask = np.zeros(len(store._users), dtype=bool)
+        store._n_edges = len(store.edge_user)
+
+        for skill_id, s in store._skills.index.items():
+            if store.skill_names[s] is not None:
+                store.views.skill_set(skill_id, store.skill_names[s], store._categories.ids[store.skill_category[s]])
+        store._load_views()
+        return store
+
+    def records(self):
+        """(skills, users, edges) records, as accepted by load()"""
+        self.compact()
+        skills = [(skill_id, attrs["name"], attrs["category"])
+                  for skill_id, attrs in ((k, self._skill_attrs(s)) for k, s in self._skills.index.items()) if attrs]
+        # Implicit users are written out with networkx's defaults for the attributes they lack
+        users = [(user_id, attrs.get("name", "Unknown"), attrs.get("year", 1), attrs.get("branch", "Unknown"))
+                 for user_id, attrs in ((k, self._user_attrs(u)) for k, u in self._users.index.items())]
+        user_ids, skill_ids = self._users.ids, self._skills.ids
+        edges = []
+        for u, s, rel, level in zip(self.edge_user.tolist(), self.edge_skill.tolist(),
+                                    self.edge_rel.tolist(), self.edge_prof.tolist()):
+            if rel == TEACH:
+                edges.append((user_ids[u], skill_ids[s], RelationType.CAN_TEACH, level))
+            else:
+                edges.append((user_ids[u], skill_ids[s], RelationType.WANTS_TO_LEARN, None))
+        return skills, users, edges
+
+    # ============== EDGE TABLE ==============
+
+    def _set_edge_table(self, users: np.ndarray, skills: np.ndarray, rels: np.ndarray, profs: np.ndarray):
+        """Install a COO batch, keeping the last write per (user, skill) pair in write order"""
+        n = len(users)
+        if n:
+            keys = users.astype(np.int64) * max(len(self._skills), 1) + skills
+            _, last_rev = np.unique(keys[::-1], return_index=True)
+            keep = np.sort(n - 1 - last_rev)
+            keep = keep[rels[keep] != 0]
+            users, skills, rels, profs = users[keep], skills[keep], rels[keep], profs[keep]
+
+        # A learn edge keeps its proficiency only as a DiGraph attribute; CAN_TEACH reads default to 1
+        profs = np.where((rels == TEACH) & (profs == 0), 1, profs).astype(np.uint8)
+
+        self.edge_user = np.ascontiguousarray(users, dtype=np.int32)
+        self.edge_skill = np.ascontiguousarray(skills, dtype=np.int32)
+        self.edge_rel = np.ascontiguousarray(rels, dtype=np.uint8)
+        self.edge_prof = np.ascontiguousarray(profs, dtype=np.uint8)
+        self._n_edges = len(self.edge_user)
+        self._index_edges()
+
+    def _index_edges(self):
+        n_users, n_skills = len(self._users), len(self._skills)
+        self.user_ptr, self.user_perm = _csr(self.edge_user, n_users)
+
+        teach = np.flatnonzero(self.edge_rel == TEACH).astype(np.int32)
+        ptr, order = _csr(self.edge_skill[teach], n_skills)
+        self.teach_ptr, self.teach_perm = ptr, teach[order]
+
+        learn = np.flatnonzero(self.edge_rel == LEARN).astype(np.int32)
+        ptr, order = _csr(self.edge_skill[learn], n_skills)
+        self.learn_ptr, self.learn_perm = ptr, learn[order]
+
+    def compact(self):
+        """Fold the per-user overlay back into the edge arrays"""
+        if not self._dirty:
+            return
+        keep = ~self._dirty_mask[self.edge_user]
+        extra = [(u, s, rel, prof) for u, adj in self._dirty.items() for s, (rel, prof) in adj.items()]
+        extra_user = np.array([e[0] for e in extra], dtype=np.int32)
+        extra_skill = np.array([e[1] for e in extra], dtype=np.int32)
+        extra_rel = np.array([e[2] for e in extra], dtype=np.uint8)
+        extra_prof = np.array([e[3] for e in extra], dtype=np.uint8)
+
+        self._dirty = {}
+        self._dirty_mask[:] = False
+        self._set_edge_table(
+            np.concatenate([self.edge_user[keep], extra_user]),
+            np.concatenate([self.edge_skill[keep], extra_skill]),
+            np.concatenate([self.edge_rel[keep], extra_rel]),
+            np.concatenate([self.edge_prof[keep], extra_prof]),
+        )
+
+    def _user_row(self, u: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(skills, relation codes, proficiencies) for one user"""
+        adj = self._dirty.get(u)
+        if adj is not None:
+            return (
+                np.fromiter(adj.keys(), dtype=np.int32, count=len(adj)),
+                np.fromiter((rel for rel, _ in adj.values()), dtype=np.uint8, count=len(adj)),
+                np.fromiter((prof for _, prof in adj.values()), dtype=np.uint8, count=len(adj)),
+            )
+        if u + 1 >= len(self.user_ptr):
+            return _EMPTY_I32, _EMPTY_U8, _EMPTY_U8
+        pos = self.user_perm[self.user_ptr[u]:self.user_ptr[u + 1]]
+        return self.edge_skill[pos], self.edge_rel[pos], self.edge_prof[pos]
+
+    def _skill_row(self, s: int, rel: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(users, proficiencies) holding the given relation to one skill"""
+        ptr, perm = (self.teach_ptr, self.teach_perm) if rel == TEACH else (self.learn_ptr, self.learn_perm)
+        if s + 1 < len(ptr):
+            pos = perm[ptr[s]:ptr[s + 1]]
+            users, profs = self.edge_user[pos], self.edge_prof[pos]
+        else:
+            users, profs = _EMPTY_I32, _EMPTY_U8
+
+        if self._dirty:
+            keep = ~self._dirty_mask[users]
+            extra = [(u, adj[s][1]) for u, adj in self._dirty.items() if s in adj and adj[s][0] == rel]
+            users = np.concatenate([users[keep], np.array([u for u, _ in extra], dtype=np.int32)])
+            profs = np.concatenate([profs[keep], np.array([p for _, p in extra], dtype=np.uint8)])
+        return users, profs
+
+    def _overlay(self, u: int) -> Dict[int, Tuple[int, int]]:
+        """Move a user's adjacency into the writable overlay"""
+        adj = self._dirty.get(u)
+        if adj is None:
+            skills, rels, profs = self._user_row(u)
+            adj = {int(s): (int(r), int(p)) for s, r, p in zip(skills, rels, profs)}
+            self._dirty[u] = adj
+            self._dirty_mask[u] = True
+        return adj
+
+    # ============== MUTATIONS ==============
+
+    def _intern_user(self, user_id: str) -> int:
+        u = self._users.intern(user_id)
+        if u == len(self.user_names):
+            self.user_names.append(None)
+            self.user_year = _fit(self.user_year, u + 1)
+            self.user_branch = _fit(self.user_branch, u + 1)
+            self._dirty_mask = _fit(self._dirty_mask, u + 1)
+            # Attribute-less node until add_user: year 1, no branch (matches networkx .get defaults)
+            self.user_year[u] = 1
+            self.user_branch[u] = -1
+            self._implicit[u] = {}
+        return u
+
+    def _intern_skill(self, skill_id: str) -> int:
+        s = self._skills.intern(skill_id)
+        if s == len(self.skill_names):
+            self.skill_names.append(None)
+            self.skill_category = _fit(self.skill_category, s + 1)
+        return s
+
+    def add_skill(self, skill_id: str, name: str, category: str = "General"):
+        s = self._intern_skill(skill_id)
+        previous = self.skill_names[s]
+        if previous is not None and self.skill_by_name.get(previous.lower()) == s:
+            del self.skill_by_name[previous.lower()]
+
+        self.skill_names[s] = name
+        self.skill_category[s] = self._categories.intern(category)
+        # First skill registered under a name wins, as with the old linear scan
+        self.skill_by_name.setdefault(name.lower(), s)
+        self.views.skill_set(skill_id, name, category)
+
+    def add_user(self, user_id: str, name: str, year: int, branch: str):
+        u = self._intern_user(user_id)
+        self._implicit.pop(u, None)
+        self.user_names[u] = name
+        self.user_year[u] = year
+        self.user_branch[u] = self._branches.intern(branch)
+
+    def update_user(self, user_id: str, name: Optional[str] = None,
+                    year: Optional[int] = None, branch: Optional[str] = None) -> bool:
+        u = self._users.index.get(user_id)
+        if u is None:
+            return False
+
+        implicit = self._implicit.get(u)
+        if name:
+            self.user_names[u] = name
+        if year:
+            self.user_year[u] = year
+        if branch:
+            self.user_branch[u] = self._branches.intern(branch)
+        if implicit is not None:
+            implicit.update((key, value) for key, value in (("name", name), ("year", year), ("branch", branch))
+                            if value)
+        return True
+
+    def set_edge(self, user_id: str, skill_id: str, relation: RelationType, proficiency: Optional[int] = None):
+        u = self._intern_user(user_id)
+        s = self._intern_skill(skill_id)
+        adj = self._overlay(u)
+
+        previous = adj.get(s)
+        if previous is None:
+            self._n_edges += 1
+        else:
+            self._view_edge_removed(u, s, previous)
+        level = proficiency if proficiency is not None else (previous[1] if previous else 0)
+        rel = REL_CODES[relation]
+        if rel == TEACH and not level:
+            level = 1
+        adj[s] = (rel, level)
+        self.views.edge_added(user_id, skill_id, level if rel == TEACH else None)
+
+        if len(self._dirty) > self.COMPACT_THRESHOLD:
+            self.compact()
+
+    def remove_edge(self, user_id: str, skill_id: str) -> bool:
+        u = self._users.index.get(user_id)
+        s = self._skills.index.get(skill_id)
+        if u is None or s is None:
+            return False
+
+        adj = self._overlay(u)
+        previous = adj.pop(s, None)
+        if previous is None:
+            return False
+        self._n_edges -= 1
+        self._view_edge_removed(u, s, previous)
+        if len(self._dirty) > self.COMPACT_THRESHOLD:
+            self.compact()
+        return True
+
+    def remove_user(self, user_id: str) -> bool:
+        u = self._users.index.pop(user_id, None)
+        if u is None:
+            return False
+
+        # The slot stays allocated (ids are never reused) but holds no attributes or edges
+        adj = self._overlay(u)
+        self._n_edges -= len(adj)
+        for s, previous in adj.items():
+            self._view_edge_removed(u, s, previous)
+        adj.clear()
+        self.user_names[u] = None
+        self._implicit.pop(u, None)
+        if len(self._dirty) > self.COMPACT_THRESHOLD:
+            self.compact()
+        return True
+
+    def remove_skill(self, skill_id: str) -> bool:
+        s = self._skills.index.pop(skill_id, None)
+        if s is None:
+            return False
+
+        holders = np.concatenate([self._skill_row(s, TEACH)[0], self._skill_row(s, LEARN)[0]])
+        for u in holders.tolist():
+            self._view_edge_removed(u, s, self._overlay(u).pop(s))
+            self._n_edges -= 1
+        self.views.skill_removed(skill_id)
+        name = self.skill_names[s]
+        if name is not None and self.skill_by_name.get(name.lower()) == s:
+            del self.skill_by_name[name.lower()]
+        self.skill_names[s] = None
+        if len(self._dirty) > self.COMPACT_THRESHOLD:
+            self.compact()
+        return True
+
+    def _view_edge_removed(self, u: int, s: int, entry: Tuple[int, int]):
+        rel, level = entry
+        self.views.edge_removed(self._users.ids[u], self._skills.ids[s], level if rel == TEACH else None)
+
+    # ============== LOOKUPS ==============
+
+    def has_user(self, user_id: str) -> bool:
+        return user_id in self._users.index
+
+    def has_skill(self, skill_id: str) -> bool:
+        return skill_id in self._skills.index
+
+    def _user_attrs(self, u: int) -> dict:
+        if u in self._implicit:
+            return dict(self._implicit[u])
+        if self.user_names[u] is None:
+            return {}
+        return {
+            "type": NodeType.USER,
+            "name": self.user_names[u],
+            "year": int(self.user_year[u]),
+            "branch": self._branches.ids[self.user_branch[u]],
+        }
+
+    def _skill_attrs(self, s: int) -> dict:
+        if self.skill_names[s] is None:
+            return {}
+        return {
+            "type": NodeType.SKILL,
+            "name": self.skill_names[s],
+            "category": self._categories.ids[self.skill_category[s]],
+        }
+
+    def get_user(self, user_id: str) -> Optional[dict]:
+        u = self._users.index.get(user_id)
+        return None if u is None else self._user_attrs(u)
+
+    def get_skill(self, skill_id: str) -> Optional[dict]:
+        s = self._skills.index.get(skill_id)
+        return None if s is None else self._skill_attrs(s)
+
+    def resolve_skill(self, name: str) -> Optional[str]:
+        """Lower-cased skill name -> skill id"""
+        s = self.skill_by_name.get(name)
+        return None if s is None else self._skills.ids[s]
+
+    def teachers(self, skill_id: str) -> List[Tuple[str, int]]:
+        """(user_id, proficiency) for every CAN_TEACH edge into the skill"""
+        s = self._skills.index.get(skill_id)
+        if s is None:
+            return []
+        users, profs = self._skill_row(s, TEACH)
+        ids = self._users.ids
+        return [(ids[u], int(p)) for u, p in zip(users.tolist(), profs.tolist())]
+
+    def teaches(self, user_id: str) -> List[Tuple[str, int]]:
+        u = self._users.index.get(user_id)
+        if u is None:
+            return []
+        skills, rels, profs = self._user_row(u)
+        mask = rels == TEACH
+        ids = self._skills.ids
+        return [(ids[s], int(p)) for s, p in zip(skills[mask].tolist(), profs[mask].tolist())]
+
+    def learns(self, user_id: str) -> List[str]:
+        u = self._users.index.get(user_id)
+        if u is None:
+            return []
+        skills, rels, _ = self._user_row(u)
+        ids = self._skills.ids
+        return [ids[s] for s in skills[rels == LEARN].tolist()]
+
+    def edge_proficiency(self, user_id: str, skill_id: str) -> Optional[int]:
+        u = self._users.index.get(user_id)
+        s = self._skills.index.get(skill_id)
+        if u is None or s is None:
+            return None
+        skills, _, profs = self._user_row(u)
+        hit = np.flatnonzero(skills == s)
+        return int(profs[hit[0]]) if len(hit) and profs[hit[0]] else None
+
+    def mutual_skills(self, seeker_id: str, mentor_id: str) -> Set[str]:
+        """Skills the seeker can teach that the mentor wants to learn"""
+        seeker = self._users.index.get(seeker_id)
+        mentor = self._users.index.get(mentor_id)
+        if seeker is None or mentor is None:
+            return set()
+        seeker_skills, seeker_rels, _ = self._user_row(seeker)
+        mentor_skills, mentor_rels, _ = self._user_row(mentor)
+        common = np.intersect1d(seeker_skills[seeker_rels == TEACH], mentor_skills[mentor_rels == LEARN])
+        return {self._skills.ids[s] for s in common.tolist()}
+
+    def shared_skills(self, user1_id: str, user2_id: str) -> List[str]:
+        """Skills both users have an edge to, in any relation"""
+        u1 = self._users.index.get(user1_id)
+        u2 = self._users.index.get(user2_id)
+        if u1 is None or u2 is None:
+            return []
+        common = np.intersect1d(self._user_row(u1)[0], self._user_row(u2)[0])
+        return [self._skills.ids[s] for s in common.tolist()]
+
+    def match_candidates(self, skill_id: str, seeker_id: str) -> CandidateBatch:
+        """Every mentor of the skill other than the seeker, as scoring columns"""
+        return self.seeker_candidates(self.mentor_columns(skill_id), seeker_id)
+
+    def mentor_columns(self, skill_id: str) -> MentorColumns:
+        """The seeker-independent half of match_candidates, computed once per skill"""
+        s = self._skills.index.get(skill_id)
+        if s is None:
+            users, profs = _EMPTY_I32, _EMPTY_I32
+        else:
+            users, profs = self._skill_row(s, TEACH)
+        return MentorColumns(
+            users=users,
+            proficiency=profs.astype(np.int16),
+            year=self.user_year[users].astype(np.int16),
+            branch=self.user_branch[users],
+        )
+
+    def seeker_candidates(self, columns: MentorColumns, seeker_id: str) -> CandidateBatch:
+        """Narrow a skill's mentor columns to one seeker's candidate batch"""
+        seeker = self._users.index.get(seeker_id)
+        if seeker is None:
+            return CandidateBatch(
+                users=columns.users,
+                proficiency=columns.proficiency,
+                year=columns.year,
+                same_branch=columns.branch == -1,
+                mutual=np.zeros(len(columns.users), dtype=bool),
+                seeker_year=1,
+            )
+
+        keep = columns.users != seeker
+        users = columns.users[keep]
+        mutual = np.zeros(len(users), dtype=bool)
+
+        # Mark everyone who wants to learn something the seeker teaches, then gather
+        skills, rels, _ = self._user_row(seeker)
+        teach_skills = skills[rels == TEACH]
+        if len(teach_skills) and len(users):
+            exchange = np.zeros(len(self._users), dtype=bool)
+            for t in teach_skills.tolist():
+                exchange[self._skill_row(t, LEARN)[0]] = True
+            mutual = exchange[users]
+
+        return CandidateBatch(
+            users=users,
+            proficiency=columns.proficiency[keep],
+            year=columns.year[keep],
+            same_branch=columns.branch[keep] == self.user_branch[seeker],
+            mutual=mutual,
+            seeker_year=int(self.user_year[seeker]),
+        )
+
+    def user_ids(self, handles: np.ndarray) -> List[str]:
+        ids = self._users.ids
+        return [ids[u] for u in handles.tolist()]
+
+    def user_handles(self, user_ids: Iterable[str]) -> np.ndarray:
+        """Inverse of user_ids; unknown ids are skipped"""
+        index = self._users.index
+        return np.array([index[user_id] for user_id in user_ids if user_id in index], dtype=np.int32)
+
+    # ============== AGGREGATES ==============
+
+    def number_of_nodes(self) -> int:
+        return len(self._users.index) + len(self._skills.index)
+
+    def number_of_edges(self) -> int:
+        return self._n_edges
+
+    def user_count(self) -> int:
+        return len(self._users.index)
+
+    def skill_count(self) -> int:
+        return len(self._skills.index)
+
+    def iter_skills(self) -> Iterable[Tuple[str, dict]]:
+        for skill_id, s in self._skills.index.items():
+            yield skill_id, self._skill_attrs(s)
+
+    def skill_learner_counts(self) -> Iterable[Tuple[str, dict, int]]:
+        self.compact()
+        counts = np.diff(self.learn_ptr)
+        for skill_id, s in self._skills.index.items():
+            yield skill_id, self._skill_attrs(s), int(counts[s]) if s < len(counts) else 0
+
+    def user_teaching_totals(self) -> Iterable[Tuple[str, dict, int, int]]:
+        """(user_id, attrs, total proficiency, skills taught) for every user who teaches"""
+        self.compact()
+        n_users = len(self._users)
+        teach = self.edge_rel == TEACH
+        totals = np.bincount(self.edge_user[teach], weights=self.edge_prof[teach], minlength=n_users)
+        counts = np.bincount(self.edge_user[teach], minlength=n_users)
+        for u in np.flatnonzero(counts).tolist():
+            yield self._users.ids[u], self._user_attrs(u), int(totals[u]), int(counts[u])
+
+    def skill_incidence(self) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+        """(user, skill) index arrays for every edge, and the skill id behind each skill index"""
+        self.compact()
+        return self.edge_user, self.edge_skill, list(self._skills.ids)
+
+    def edge_columns(self) -> EdgeColumns:
+        """Every user, skill and edge as index columns (see EdgeColumns)"""
+        self.compact()
+        n_users = len(self._users)
+        teach = self.edge_rel == TEACH
+        learn = self.edge_rel == LEARN
+        return EdgeColumns(
+            user_ids=list(self._users.ids),
+            user_names=list(self.user_names),
+            year=self.user_year[:n_users].astype(np.int16),
+            branch=self.user_branch[:n_users].copy(),
+            skill_ids=list(self._skills.ids),
+            skill_names=list(self.skill_names),
+            teach_user=self.edge_user[teach],
+            teach_skill=self.edge_skill[teach],
+            teach_prof=self.edge_prof[teach].astype(np.int16),
+            learn_user=self.edge_user[learn],
+            learn_skill=self.edge_skill[learn],
+        )
+
+
+def build_snapshot(skills: List[SkillRecord], users: List[UserRecord], edges: List[EdgeRecord]):
+    """Load records into a fresh store and return its snapshot; runs in a rebuild worker process"""
+    store = CompactGraphStore()
+    store.load(skills, users, edges)
+    return store.snapshot()
@@ -1,8 +1,12 @@
 from typing import List, Optional
 from ..models import ConnectionRequestStatus
-from ..core.database import db
+from ..core.database import db, insert_stamped, stamped
+from ..core.pagination import DEFAULT_PAGE_SIZE, Keyset
 import logging
 
+# Newest first
+REQUEST_PAGES = Keyset(("created_at", "id"), descending=True)
+
 class ConnectionService:
     def __init__(self):
         # Fallback in-memory storage
@@ -17,38 +21,106 @@ class ConnectionService:
     async def create(self, request: ConnectionRequestStatus) -> ConnectionRequestStatus:
         """Create a connection request"""
         if self.collection:
-            await self.collection.insert_one(request.model_dump())
+            await insert_stamped(self.collection, request.model_dump())
             return request
 
         self.requests.append(request)
         return request
 
-    async def get_by_user(self, user_id: str) -> dict:
-        """Get incoming and outgoing requests for a user"""
-        if self.collection:
-            # Query incoming and outgoing separately or together
-            incoming_cursor = self.collection.find({"to_user_id": user_id})
-            outgoing_cursor = self.collection.find({"from_user_id": user_id})
-            
-            incoming_docs = await incoming_cursor.to_list(length=1000)
-            outgoing_docs = await outgoing_cursor.to_list(length=1000)
-            
-            incoming = [ConnectionRequestStatus(**{k: v for k, v in d.items() if k != "_id"}) for d in incoming_docs]
-            outgoing = [ConnectionRequestStatus(**{k: v for k, v in d.items() if k != "_id"}) for d in outgoing_docs]
-            
-            return {"incoming": incoming, "outgoing": outgoing}
+    @staticmethod
+    def _user_match(user_id: str, status: Optional[str]) -> dict:
+        match = {"$or": [{"to_user_id": user_id}, {"from_user_id": user_id}]}
+        if status:
+            match["status"] = status
+        return match
 
-        # Fallback
-        incoming = [r for r in self.requests if r.to_user_id == user_id]
-        outgoing = [r for r in self.requests if r.from_user_id == user_id]
-        return {"incoming": incoming, "outgoing": outgoing}
+    @staticmethod
+    def _count_stages(user_id: str) -> List[dict]:
+        # A self-addressed request counts in both directions, like it is listed in both
+        def matching(field):
+            return {"$sum": {"$cond": [{"$eq": [f"${field}", user_id]}, 1, 0]}}
+        return [{"$group": {"_id": None, "incoming": matching("to_user_id"), "outgoing": matching("from_user_id")}}]
+
+    @staticmethod
+    def _counts(groups: List[dict]) -> dict:
+        counts = {"incoming": 0, "outgoing": 0}
+        for group in groups:
+            counts.update(incoming=group["incoming"], outgoing=group["outgoing"])
+        return counts
+
+    async def get_by_user(self, user_id: str, limit: int = DEFAULT_PAGE_SIZE,
+                          incoming_cursor: Optional[str] = None, outgoing_cursor: Optional[str] = None,
+                          status: Optional[str] = None) -> dict:
+        """
+        Get incoming and outgoing requests for a user, newest first, in one round trip.
+
+        A single $facet aggregation pages both directions and counts them; the
+        $or/status match runs first so it can use the per-user indexes. Each
+        direction pages separately: next_cursor holds the cursor to pass back as
+        incoming_cursor/outgoing_cursor (None once a direction is exhausted).
+        """
+        if self.collection is not None:
+            pipeline = [
+                {"$match": self._user_match(user_id, status)},
+                {"$facet": {
+                    "incoming": REQUEST_PAGES.stages({"to_user_id": user_id}, ConnectionRequestStatus, limit, incoming_cursor),
+                    "outgoing": REQUEST_PAGES.stages({"from_user_id": user_id}, ConnectionRequestStatus, limit, outgoing_cursor),
+                    "counts": self._count_stages(user_id),
+                }},
+            ]
+            result = (await self.collection.aggregate(pipeline).to_list(length=1))[0]
+            incoming, next_incoming = REQUEST_PAGES.to_page(result["incoming"], ConnectionRequestStatus, limit)
+            outgoing, next_outgoing = REQUEST_PAGES.to_page(result["outgoing"], ConnectionRequestStatus, limit)
+            counts = self._counts(result["counts"])
+        else:
+            # Fallback
+            mine = [r for r in self.requests if not status or r.status == status]
+            incoming, next_incoming = REQUEST_PAGES.slice(
+                mine, limit, incoming_cursor, where=lambda r: r.to_user_id == user_id
+            )
+            outgoing, next_outgoing = REQUEST_PAGES.slice(
+                mine, limit, outgoing_cursor, where=lambda r: r.from_user_id == user_id
+            )
+            counts = await self.count_by_user(user_id, status)
+        return {
+            "incoming": incoming,
+            "outgoing": outgoing,
+            "counts": counts,
+            "next_cursor": {"incoming": next_incoming, "outgoing": next_outgoing},
+        }
+
+    async def count_by_user(self, user_id: str, status: Optional[str] = None) -> dict:
+        """Incoming/outgoing request counts without fetching any documents"""
+        if self.collection is not None:
+            pipeline = [{"$match": self._user_match(user_id, status)}, *self._count_stages(user_id)]
+            return self._counts(await self.collection.aggregate(pipeline).to_list(length=1))
+
+        mine = [r for r in self.requests if not status or r.status == status]
+        return {
+            "incoming": sum(r.to_user_id == user_id for r in mine),
+            "outgoing": sum(r.from_user_id == user_id for r in mine),
+        }
+
+    async def get_by_id(self, request_id: str) -> Optional[ConnectionRequestStatus]:
+        """Get a connection request by ID"""
+        if self.collection is not None:
+            doc = await self.collection.find_one({"id": request_id})
+            if doc:
+                doc.pop("_id", None)
+                return ConnectionRequestStatus(**doc)
+            return None
+
+        for req in self.requests:
+            if req.id == request_id:
+                return req
+        return None
 
     async def update_status(self, request_id: str, status: str) -> bool:
         """Update request status (accepted/rejected)"""
         if self.collection:
             result = await self.collection.update_one(
                 {"id": request_id},
-                {"$set": {"status": status}}
+                stamped({"$set": {"status": status}})
             )
             return result.modified_count > 0
             
@@ -0,0 +1,118 @@
+import heapq
+from typing import Dict, Iterable, List, Set, Tuple
+from ..models import Event
+from .skill_search import normalize
+
+# How much a profile term counts, by where it came from (the strongest source wins)
+LEARN_WEIGHT = 3.0
+TEACH_WEIGHT = 1.5
+CATEGORY_WEIGHT = 1.0
+
+# How much an event term counts: tags describe the event, titles only hint at it
+TAG_WEIGHT = 1.0
+TITLE_WEIGHT = 0.5
+
+# term -> (weight, label shown as the reason for a match)
+ProfileTerms = Dict[str, Tuple[float, str]]
+
+
+def name_keys(text: str) -> Set[str]:
+    """A normalized skill or tag name and its acronym ("machine learning", "ml")"""
+    words = text.split()
+    keys = {text}
+    if len(words) > 1:
+        keys.add("".join(word[0] for word in words))
+    keys.discard("")
+    return keys
+
+
+def event_terms(event: Event) -> Dict[str, float]:
+    """term -> weight: the event's tags (and their acronyms), then title words and word pairs"""
+    words = normalize(event.title).split()
+    terms = {term: TITLE_WEIGHT for term in (*words, *(" ".join(pair) for pair in zip(words, words[1:])))}
+    for tag in event.tags:
+        for term in name_keys(normalize(tag)):
+            terms[term] = TAG_WEIGHT
+    return terms
+
+
+def profile_terms(teaching: Iterable[Tuple[str, str]], learning: Iterable[Tuple[str, str]]) -> ProfileTerms:
+    """
+    Weighted terms for a user from the (name, category) of the skills they
+    teach and want to learn. Skills match by full name or acronym; categories
+    ("AI/ML") also by each word.
+    """
+    terms: ProfileTerms = {}
+
+    def add(keys: Set[str], weight: float, label: str):
+        for key in keys:
+            if weight > terms.get(key, (0.0, ""))[0]:
+                terms[key] = (weight, label)
+
+    for skills, weight in ((learning, LEARN_WEIGHT), (teaching, TEACH_WEIGHT)):
+        for name, category in skills:
+            add(name_keys(normalize(name)), weight, name)
+            text = normalize(category)
+            add({text, *text.split()} - {""}, CATEGORY_WEIGHT, category)
+    return terms
+
+
+class EventIndex:
+    """
+    Inverted index from tag/title terms to events, for ranking events against a user's interests.
+
+    Scoring a profile touches only the posting lists of its terms, so the cost
+    is the number of events sharing a term with the user rather than the
+    number of events; the top k are then picked with a heap.
+    """
+
+    def __init__(self):
+        self.events: Dict[str, Event] = {}
+        self.postings: Dict[str, Dict[str, float]] = {}     # term -> {event_id: weight}
+        self.terms: Dict[str, Dict[str, float]] = {}        # event_id -> its terms
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def add(self, event: Event):
+        """Index an event, replacing any earlier version of it"""
+        self.remove(event.id)
+        terms = event_terms(event)
+        self.events[event.id] = event
+        self.terms[event.id] = terms
+        for term, weight in terms.items():
+            self.postings.setdefault(term, {})[event.id] = weight
+
+    def remove(self, event_id: str):
+        self.events.pop(event_id, None)
+        for term in self.terms.pop(event_id, {}):
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.pop(event_id, None)
+                if not posting:
+                    del self.postings[term]
+
+    def recommend(self, profile: ProfileTerms, limit: int) -> List[Tuple[Event, float, List[str]]]:
+        """
+        (event, score, matched labels) for the best `limit` events with room left.
+
+        An event scores the sum, over each skill/category label it matches, of
+        the label's weight times the best event term it matched through. Ties go
+        to the busier event, then the lower id.
+        """
+        matched: Dict[str, Dict[str, float]] = {}    # event_id -> {label: best contribution}
+        for term, (weight, label) in profile.items():
+            for event_id, event_weight in self.postings.get(term, {}).items():
+                labels = matched.setdefault(event_id, {})
+                labels[label] = max(labels.get(label, 0.0), weight * event_weight)
+
+        candidates = (
+            (self.events[event_id], sum(labels.values()), labels)
+            for event_id, labels in matched.items()
+            if self.events[event_id].participants < self.events[event_id].max_participants
+        )
+        best = heapq.nsmallest(limit, candidates, key=lambda item: (-item[1], -item[0].participants, item[0].id))
+        return [
+            (event, round(score, 3), sorted(labels, key=lambda label: (-labels[label], label)))
+            for event, score, labels in best
+        ]
@@ -1,14 +1,27 @@
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional, Tuple
 from ..models import Event
-from ..core.database import db
+from ..core.database import db, insert_stamped, stamped
+from ..core.cache import ResponseCache
+from ..core.config import settings
+from ..core.pagination import DEFAULT_PAGE_SIZE, Keyset, encode_models
+from .event_index import EventIndex, ProfileTerms
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+EVENT_PAGES = Keyset(("id",))
+
 class EventService:
     def __init__(self):
         # Fallback in-memory storage
         self.events: List[Event] = []
+        # Encoded /events pages, read through from MongoDB and dropped on every write
+        self.cache = ResponseCache(maxsize=settings.READ_CACHE_SIZE, ttl=settings.READ_CACHE_TTL)
+        # Tag -> events index for /events/recommended; kept current by create/register_user
+        self.index = EventIndex()
+        self._index_source: Optional[object] = None
+        self._index_built: Optional[float] = None
 
     @property
     def collection(self):
@@ -16,14 +29,33 @@ class EventService:
             return db.db["events"]
         return None
 
+    async def get_page(self, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None) -> Tuple[List[Event], Optional[str]]:
+        """One page of events ordered by id, plus the cursor for the next page (None on the last)"""
+        if self.collection is not None:
+            return await EVENT_PAGES.find(self.collection, {}, Event, limit, cursor)
+        return EVENT_PAGES.slice(self.events, limit, cursor)
+
+    async def get_page_json(self, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None) -> Tuple[bytes, Optional[str]]:
+        """get_page already encoded as a JSON array; served from the cache when MongoDB backs the service"""
+        async def load():
+            items, next_cursor = await self.get_page(limit, cursor)
+            return encode_models(items), next_cursor
+
+        if self.collection is None:
+            return await load()
+        return await self.cache.get_or_load(("page", limit, cursor), load)
+
+    async def stream(self) -> AsyncIterator[List[Event]]:
+        """All events in id order, in batches (exports)"""
+        if self.collection is not None:
+            async for batch in EVENT_PAGES.stream(self.collection, {}, Event):
+                yield batch
+        elif self.events:
+            yield EVENT_PAGES.slice(self.events, len(self.events))[0]
+
     async def get_all(self) -> List[Event]:
         """Get all events"""
-        if self.collection:
-            cursor = self.collection.find({})
-            docs = await cursor.to_list(length=1000)
-            # Remove _id and convert to Event
-            return [Event(**{k: v for k, v in d.items() if k != "_id"}) for d in docs]
-        return self.events
+        return [event async for batch in self.stream() for event in batch]
 
     async def get_by_id(self, event_id: str) -> Optional[Event]:
         """Get single event by ID"""
@@ -46,7 +78,9 @@ class EventService:
             if existing:
                 raise ValueError("Event ID already exists")
             
-            await self.collection.insert_one(event.model_dump())
+            await insert_stamped(self.collection, event.model_dump())
+            self.cache.invalidate()
+            self.index.add(event)
             return event
 
         # Failover logic
@@ -54,6 +88,7 @@ class EventService:
             if existing.id == event.id:
                 raise ValueError("Event ID already exists")
         self.events.append(event)
+        self.index.add(event)
         return event
 
     async def register_user(self, event_id: str, user_id: str) -> bool:
@@ -72,12 +107,15 @@ class EventService:
             # Atomic update
             result = await self.collection.update_one(
                 {"id": event_id, "participants": {"$lt": max_participants}},
-                {"$inc": {"participants": 1}}
+                stamped({"$inc": {"participants": 1}})
             )
             
             if result.modified_count == 0:
                 # Race condition or full
                 raise ValueError("Event is full or update failed")
+            self.cache.invalidate()
+            event_doc.pop("_id", None)
+            self.index.add(Event(**{**event_doc, "participants": current_participants + 1}))
             return True
 
         # Failover
@@ -88,3 +126,29 @@ class EventService:
             raise ValueError("Event is full")
         event.participants += 1
         return True
+
+    async def _event_index(self) -> EventIndex:
+        """
+        The tag index, built from the store on first use. With MongoDB it is
+        also rebuilt every EVENT_INDEX_REFRESH seconds to pick up events written
+        by other instances; in memory, whenever the event list is replaced.
+        """
+        if self.collection is not None:
+            source = "mongodb"
+            stale = self._index_built is not None and settings.EVENT_INDEX_REFRESH > 0 and \
+                time.monotonic() - self._index_built >= settings.EVENT_INDEX_REFRESH
+        else:
+            source, stale = self.events, False
+
+        if stale or self._index_source is not source:
+            index = EventIndex()
+            async for batch in self.stream():
+                for event in batch:
+                    index.add(event)
+            self.index, self._index_source, self._index_built = index, source, time.monotonic()
+            logger.info(f"Event index built: {len(index)} events, {len(index.postings)} terms")
+        return self.index
+
+    async def recommend(self, profile: ProfileTerms, limit: int = 10) -> List[Tuple[Event, float, List[str]]]:
+        """Top events for a user's profile terms (see event_index.profile_terms), skipping full ones"""
+        return (await self._event_index()).recommend(profile, limit)
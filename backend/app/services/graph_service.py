@@ -1,217 +1,854 @@
-import networkx as nx
-from typing import List, Tuple, Optional, Set
-from ..models import MatchResult, User, Skill, UserSkill
-from ..core.constants import RelationType, NodeType
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Tuple, Optional, Set
+from datetime import datetime
+from ..models import MatchRequest, MatchResult, User, Skill
+from ..core.config import settings
+from ..core.cache import TTLCache
+from ..core.executors import ReadWriteLock, executors
+from ..core.metrics import graph_rebuilds
+from ..core.constants import RelationType
+from .graph_store import NetworkXGraphStore
+from .match_scoring import CandidateBatch, score_candidates, top_k
+from .graph_snapshot import read_snapshot, write_snapshot
+from .skill_similarity import SkillSimilarity, related_table
+from .assignment import assign
+from .availability import match_slot
+from .social_graph import SocialGraph
+import asyncio
+import functools
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+GRAPH_BACKENDS = ("networkx", "compact")
+SNAPSHOT_FORMAT = 1
+
+
+def create_store(backend: str):
+    """Instantiate an empty graph store for the configured backend"""
+    if backend == "networkx":
+        return NetworkXGraphStore()
+    if backend == "compact":
+        from .compact_graph import CompactGraphStore
+        return CompactGraphStore()
+    raise ValueError(f"Unknown graph backend '{backend}', expected one of {GRAPH_BACKENDS}")
+
+
+def graph_records(users: List[User], skills: List[Skill]):
+    """Flatten API models into the (skills, users, edges) records a store loads"""
+    skill_records = [(skill.id, skill.name, skill.category) for skill in skills]
+    user_records = [(user.id, user.name, user.year, user.branch) for user in users]
+    edge_records = []
+    for user in users:
+        for user_skill in user.skills:
+            if user_skill.is_teaching:
+                edge_records.append((user.id, user_skill.skill_id, RelationType.CAN_TEACH, user_skill.proficiency))
+            if user_skill.is_learning:
+                edge_records.append((user.id, user_skill.skill_id, RelationType.WANTS_TO_LEARN, None))
+    return skill_records, user_records, edge_records
+
+
+# Store methods that change it; journaled while a rebuild is in flight
+STORE_MUTATIONS = frozenset(("add_skill", "add_user", "update_user", "set_edge", "remove_edge", "remove_user", "remove_skill"))
+
+
+class _JournaledStore:
+    """
+    Stands in for the live store during a rebuild.
+
+    Reads and writes go to the old store as usual; writes are also recorded so
+    they can be replayed onto the new store before it is swapped in.
+    """
+
+    def __init__(self, store, journal: list):
+        self._store = store
+        self._journal = journal
+
+    def __getattr__(self, name):
+        attr = getattr(self._store, name)
+        if name not in STORE_MUTATIONS:
+            return attr
+
+        def journaled(*args, **kwargs):
+            self._journal.append((name, args, kwargs))
+            return attr(*args, **kwargs)
+        return journaled
+
+
+def _writes(method):
+    """Run a GraphService mutation under the write side of its lock (see GraphService.write)"""
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self.lock.write():
+            return method(self, *args, **kwargs)
+    return locked
+
+
 class GraphService:
-    def __init__(self):
-        self.G = nx.DiGraph()
-        self.users: List[User] = []
+    def __init__(self, backend: str = "networkx"):
+        self.backend = backend
+        self.store = create_store(backend)
+        # Pool reads (see read) hold the read side; mutations and store swaps the write side (see write)
+        self.lock = ReadWriteLock()
+        # email -> user id, for login lookups (the graph itself does not hold emails)
+        self.user_emails: Dict[str, str] = {}
         # Events and Sessions moved to dedicated services
 
+        # Bumped by every mutation; cached results from an older version are never served
+        self.version = 0
+        self.match_cache = TTLCache(maxsize=settings.MATCH_CACHE_SIZE, ttl=settings.MATCH_CACHE_TTL)
+
+        # user <-> user sessions and accepted connections, for connection degrees
+        self.social = SocialGraph()
+
+        # Called as listener(op, payload) after API-driven mutations (see graph_shared)
+        self.mutation_listeners: List[Callable[[str, dict], None]] = []
+
+        # Skill co-occurrence, recomputed in a rebuild worker at most once per graph version
+        self.similarity: Optional[SkillSimilarity] = None
+        self._similarity_task: Optional[asyncio.Future] = None
+
+        self._rebuild_lock = asyncio.Lock()
+        self._journal: Optional[list] = None
+        self.last_rebuild: Optional[dict] = None
+
+    async def read(self, fn: Callable, *args):
+        """
+        Run a graph read on the read pool.
+
+        The read holds the read side of `lock`, so a mutation made on the loop
+        meanwhile waits for it instead of being seen half-applied.
+        """
+        return await executors.read(self._locked_read, fn, args)
+
+    def _locked_read(self, fn: Callable, args: tuple):
+        with self.lock.read():
+            return fn(*args)
+
+    async def write(self, fn: Callable, *args, **kwargs):
+        """
+        Apply a mutation (or a function making several) from the event loop.
+
+        If pool reads hold the lock, the loop keeps serving while they finish;
+        fn then runs on the loop with the write side held. Calling a mutation
+        directly takes the lock blocking, which is only for code off the loop.
+        """
+        async with self.lock.writing():
+            return fn(*args, **kwargs)
+
+    async def _compacted(self, capture: Callable):
+        """A store capture that may compact the store first, which rewrites its edge arrays, so it counts as a write"""
+        return await self.write(capture)
+
+    @property
+    def G(self):
+        """Underlying networkx DiGraph (networkx backend only)"""
+        return self.store.G
+
     def build_graph(self, users: List[User], skills: List[Skill]):
         """Build the knowledge graph from user and skill data"""
-        self.G.clear()
-        self.users = users
-        
-        # Add skill nodes
-        for skill in skills:
-            self.G.add_node(
-                f"skill:{skill.id}",
-                type=NodeType.SKILL,
-                name=skill.name,
-                category=skill.category
-            )
-        
-        # Add user nodes and edges
-        for user in users:
-            self.G.add_node(
-                f"user:{user.id}",
-                type=NodeType.USER,
-                name=user.name,
-                year=user.year,
-                branch=user.branch
-            )
-            
-            for user_skill in user.skills:
-                skill_node = f"skill:{user_skill.skill_id}"
-                user_node = f"user:{user.id}"
-                
-                if user_skill.is_teaching:
-                    self.G.add_edge(
-                        user_node, skill_node,
-                        relation=RelationType.CAN_TEACH,
-                        proficiency=user_skill.proficiency
-                    )
-                
-                if user_skill.is_learning:
-                    self.G.add_edge(
-                        user_node, skill_node,
-                        relation=RelationType.WANTS_TO_LEARN
-                    )
-        
-        logger.info(f"Graph built: {self.G.number_of_nodes()} nodes, {self.G.number_of_edges()} edges")
-
-    def calculate_match_score(self, seeker_id: str, mentor_id: str, skill_node: str) -> float:
+        start = time.perf_counter()
+        store = create_store(self.backend)
+        store.load(*graph_records(users, skills))
+        self.replace_store(store, {user.email: user.id for user in users}, time.perf_counter() - start)
+
+    async def rebuild_graph(self, users: List[User], skills: List[Skill], notify: bool = True):
+        """build_graph without blocking the event loop"""
+        if notify:
+            self._notify("rebuild_graph", {"users": [u.model_dump() for u in users],
+                                           "skills": [k.model_dump() for k in skills]})
+        records = graph_records(users, skills)
+        user_emails = {user.email: user.id for user in users}
+
+        async def produce():
+            if self.backend == "compact" and executors.kind("rebuild") == "process":
+                # Built in a worker process; only the finished arrays come back
+                from .compact_graph import CompactGraphStore, build_snapshot
+                arrays, strings = await executors.rebuild(build_snapshot, *records)
+                store = await executors.load(CompactGraphStore.from_snapshot, arrays, strings)
+            else:
+                store = create_store(self.backend)
+                pool = "rebuild" if executors.kind("rebuild") == "thread" else "load"
+                await executors.run(pool, store.load, *records)
+            return store, user_emails
+
+        return await self._swap_in(produce)
+
+    async def rebuild(self, load: Callable[[object], Awaitable[Dict[str, str]]]) -> dict:
+        """
+        Double-buffered rebuild.
+
+        `load` fills a fresh store (off the event loop) and returns its email map.
+        The current store keeps serving reads and taking writes meanwhile; writes
+        are journaled and replayed onto the new store, which is then swapped in
+        without an intervening await, so no request ever sees a partial graph.
+        """
+        async def produce():
+            store = create_store(self.backend)
+            return store, await load(store)
+
+        return await self._swap_in(produce)
+
+    async def _swap_in(self, produce: Callable[[], Awaitable[Tuple[object, Dict[str, str]]]]) -> dict:
+        """rebuild() for a producer that creates the store itself and returns (store, email map)"""
+        async with self._rebuild_lock:
+            start = time.perf_counter()
+            journal = []
+            live = self.store
+            self._journal = journal
+            # The proxy reads and writes the live store, so readers cannot tell the two apart
+            self.store = _JournaledStore(live, journal)
+            try:
+                store, user_emails = await produce()
+            except BaseException:
+                self.store = live
+                self._journal = None
+                raise
+
+            # Writes keep being journaled until the lock is ours; from here on nothing awaits
+            async with self.lock.writing():
+                self._journal = None
+                for op, args, kwargs in journal:
+                    if op == "email":
+                        user_emails[args[0]] = args[1]
+                    elif op == "forget_emails":
+                        user_emails = {email: uid for email, uid in user_emails.items() if uid != args[0]}
+                    else:
+                        getattr(store, op)(*args, **kwargs)
+                self.replace_store(store, user_emails, time.perf_counter() - start)
+            self.last_rebuild["replayed_writes"] = len(journal)
+            return self.last_rebuild
+
+    @property
+    def rebuilding(self) -> bool:
+        return self._journal is not None
+
+    @_writes
+    def replace_store(self, store, user_emails: Dict[str, str], duration: Optional[float] = None):
+        """Swap in a fully loaded store"""
+        self.store = store
+        self.user_emails = user_emails
+        self._bump_version()
+
+        self.last_rebuild = {
+            "backend": self.backend,
+            "nodes": store.number_of_nodes(),
+            "edges": store.number_of_edges(),
+            "duration_s": round(duration, 3) if duration is not None else None,
+            "finished_at": datetime.utcnow().isoformat(),
+        }
+        if duration is not None:
+            graph_rebuilds.observe(duration, backend=self.backend)
+        logger.info(f"Graph built ({self.backend}): {self.last_rebuild['nodes']} nodes, "
+                    f"{self.last_rebuild['edges']} edges in {self.last_rebuild['duration_s']}s")
+
+    # ============== SNAPSHOTS ==============
+
+    async def save_snapshot(self, path: str, meta: Optional[dict] = None) -> dict:
+        """
+        Write the graph to a binary snapshot file.
+
+        The graph is captured on the calling (event loop) thread so the snapshot is
+        consistent with `meta`; encoding and disk I/O run on the executors.
+        """
+        start = time.perf_counter()
+        header = {
+            "format": SNAPSHOT_FORMAT,
+            "backend": self.backend,
+            "version": self.version,
+            "created_at": datetime.utcnow().isoformat(),
+            "user_emails": dict(self.user_emails),
+            "relations": dict(self.social.relations),
+            "meta": meta or {},
+        }
+        if self.backend == "compact":
+            arrays, strings = await self._compacted(self.store.snapshot)
+        else:
+            # Re-encode as compact arrays in a rebuild worker
+            from .compact_graph import build_snapshot
+            arrays, strings = await executors.rebuild(build_snapshot, *self.store.records())
+
+        size = await executors.load(write_snapshot, path, arrays, {**header, "strings": strings})
+        info = {"path": path, "bytes": size, "version": header["version"],
+                "duration_s": round(time.perf_counter() - start, 3)}
+        logger.info(f"Graph snapshot written: {info}")
+        return info
+
+    def load_snapshot(self, path: str) -> dict:
+        """Replace the graph with a snapshot file (memory-mapped); returns the snapshot's meta"""
+        return self.install_snapshot(*self.read_snapshot(path))
+
+    def read_snapshot(self, path: str) -> Tuple[object, SocialGraph, dict, float]:
+        """
+        Build the store and social layer of a snapshot file without touching the live graph.
+
+        This is the O(N) part of loading one, so it can run on an executor;
+        install_snapshot then swaps the result in.
+        """
+        from .compact_graph import CompactGraphStore
+
+        start = time.perf_counter()
+        arrays, header = read_snapshot(path)
+        if header.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"Unsupported graph snapshot format {header.get('format')}")
+
+        store = CompactGraphStore.from_snapshot(arrays, header["strings"])
+        if self.backend != "compact":
+            records = store.records()
+            store = create_store(self.backend)
+            store.load(*records)
+        social = SocialGraph()
+        social.load((relation_id, a, b) for relation_id, (a, b) in header.get("relations", {}).items())
+        return store, social, header, time.perf_counter() - start
+
+    @_writes
+    def install_snapshot(self, store, social: SocialGraph, header: dict, duration: float) -> dict:
+        """Serve a store built by read_snapshot; returns the snapshot's meta"""
+        self.social = social
+        self.version = max(self.version, header["version"])
+        self.replace_store(store, header["user_emails"], duration)
+        return header["meta"]
+
+    # ============== MUTATIONS ==============
+
+    def _bump_version(self):
+        self.version += 1
+
+    def _notify(self, op: str, payload: dict):
+        for listener in self.mutation_listeners:
+            listener(op, payload)
+
+    def _remember_email(self, email: str, user_id: str):
+        self.user_emails[email] = user_id
+        if self._journal is not None:
+            self._journal.append(("email", (email, user_id), {}))
+
+    def _forget_emails(self, user_id: str):
+        self.user_emails = {email: uid for email, uid in self.user_emails.items() if uid != user_id}
+        if self._journal is not None:
+            self._journal.append(("forget_emails", (user_id,), {}))
+
+    @_writes
+    def register_user(self, user: User):
+        """Add a newly registered user to the graph"""
+        self.store.add_user(user.id, user.name, user.year, user.branch)
+        self._remember_email(user.email, user.id)
+        self._bump_version()
+        self._notify("register_user", {"user": user.model_dump()})
+
+    @_writes
+    def update_user_profile(self, user_id: str, name: Optional[str] = None,
+                            year: Optional[int] = None, branch: Optional[str] = None) -> bool:
+        """Update user node attributes. Returns False if the user is unknown."""
+        updated = self.store.update_user(user_id, name=name, year=year, branch=branch)
+        if updated:
+            self._bump_version()
+            self._notify("update_user_profile", {"user_id": user_id, "name": name, "year": year, "branch": branch})
+        return updated
+
+    @_writes
+    def update_user_skills(self, user_id: str, skill_id: str, skill_name: str, proficiency: int,
+                           is_teaching: bool = False, is_learning: bool = False) -> bool:
+        """Add or update a user's skill edge. Returns False if the user is unknown."""
+        if not self.store.has_user(user_id):
+            return False
+
+        # Add skill node if doesn't exist
+        if not self.store.has_skill(skill_id):
+            self.store.add_skill(skill_id, skill_name, "Custom")
+
+        if is_teaching:
+            self.store.set_edge(user_id, skill_id, RelationType.CAN_TEACH, proficiency)
+        if is_learning:
+            self.store.set_edge(user_id, skill_id, RelationType.WANTS_TO_LEARN)
+        self._bump_version()
+        self._notify("update_user_skills", {
+            "user_id": user_id, "skill_id": skill_id, "skill_name": skill_name, "proficiency": proficiency,
+            "is_teaching": is_teaching, "is_learning": is_learning,
+        })
+        return True
+
+    @_writes
+    def set_relation(self, relation_id: str, user_a: str, user_b: str) -> bool:
+        """Record a session or accepted connection between two users"""
+        changed = self.social.set_relation(relation_id, user_a, user_b)
+        if changed:
+            self._bump_version()
+            self._notify("set_relation", {"relation_id": relation_id, "user_a": user_a, "user_b": user_b})
+        return changed
+
+    @_writes
+    def remove_relation(self, relation_id: str) -> bool:
+        removed = self.social.remove_relation(relation_id)
+        if removed:
+            self._bump_version()
+            self._notify("remove_relation", {"relation_id": relation_id})
+        return removed
+
+    @_writes
+    def replace_social(self, social: SocialGraph):
+        self.social = social
+        self._bump_version()
+
+    # ============== SYNC DELTAS ==============
+    # Idempotent per-document updates applied by the incremental MongoDB sync
+
+    @_writes
+    def upsert_skill(self, skill: Skill):
+        self.store.add_skill(skill.id, skill.name, skill.category)
+        self._bump_version()
+
+    @_writes
+    def upsert_user(self, user: User):
+        """Create the user node or overwrite its attributes, keeping its edges"""
+        self.store.add_user(user.id, user.name, user.year, user.branch)
+        if user.email:
+            self._remember_email(user.email, user.id)
+        self._bump_version()
+
+    @_writes
+    def set_user_skill(self, user_id: str, skill_id: str, proficiency: int,
+                       is_teaching: bool = False, is_learning: bool = False):
+        """Make the user -> skill edge reflect one userskills document exactly"""
+        if is_teaching:
+            self.store.set_edge(user_id, skill_id, RelationType.CAN_TEACH, proficiency)
+        if is_learning:
+            self.store.set_edge(user_id, skill_id, RelationType.WANTS_TO_LEARN)
+        if not is_teaching and not is_learning:
+            self.store.remove_edge(user_id, skill_id)
+        self._bump_version()
+
+    @_writes
+    def remove_user_skill(self, user_id: str, skill_id: str) -> bool:
+        removed = self.store.remove_edge(user_id, skill_id)
+        if removed:
+            self._bump_version()
+        return removed
+
+    @_writes
+    def remove_user(self, user_id: str) -> bool:
+        removed = self.store.remove_user(user_id)
+        if removed:
+            self._forget_emails(user_id)
+            self._bump_version()
+        return removed
+
+    @_writes
+    def remove_skill(self, skill_id: str) -> bool:
+        removed = self.store.remove_skill(skill_id)
+        if removed:
+            self._bump_version()
+        return removed
+
+    # ============== LOOKUPS ==============
+
+    def has_user(self, user_id: str) -> bool:
+        return self.store.has_user(user_id)
+
+    def has_skill(self, skill_id: str) -> bool:
+        return self.store.has_skill(skill_id)
+
+    def get_user(self, user_id: str) -> Optional[dict]:
+        """Node attributes (name, year, branch) for a user, or None"""
+        return self.store.get_user(user_id)
+
+    def find_user_by_email(self, email: str) -> Optional[str]:
+        return self.user_emails.get(email)
+
+    def number_of_nodes(self) -> int:
+        return self.store.number_of_nodes()
+
+    def number_of_edges(self) -> int:
+        return self.store.number_of_edges()
+
+    def user_count(self) -> int:
+        return self.store.user_count()
+
+    def skill_count(self) -> int:
+        return self.store.skill_count()
+
+    # ============== MATCHING ==============
+
+    def calculate_match_score(self, seeker_id: str, mentor_id: str, skill_id: str) -> float:
         """Calculate match score between seeker and potential mentor"""
         score = 0.0
-        
-        seeker_node = f"user:{seeker_id}"
-        mentor_node = f"user:{mentor_id}"
-        
+
+        seeker = self.store.get_user(seeker_id) or {}
+        mentor = self.store.get_user(mentor_id) or {}
+
         # Factor 1: Mentor's proficiency (0-25 points)
-        edge_data = self.G.edges.get((mentor_node, skill_node), {})
-        proficiency = edge_data.get("proficiency", 1)
+        proficiency = self.store.edge_proficiency(mentor_id, skill_id) or 1
         score += proficiency * 5
-        
+
         # Factor 2: Year difference bonus (seniors teaching = good)
-        seeker_year = self.G.nodes[seeker_node].get("year", 1)
-        mentor_year = self.G.nodes[mentor_node].get("year", 1)
+        seeker_year = seeker.get("year", 1)
+        mentor_year = mentor.get("year", 1)
         if mentor_year > seeker_year:
             score += (mentor_year - seeker_year) * 10
-        
+
         # Factor 3: Same branch bonus
-        if self.G.nodes[seeker_node].get("branch") == self.G.nodes[mentor_node].get("branch"):
+        if seeker.get("branch") == mentor.get("branch"):
             score += 15
-        
+
         # Factor 4: Mutual exchange opportunity
-        mutual = self._find_mutual_skills(seeker_node, mentor_node)
+        mutual = self._find_mutual_skills(seeker_id, mentor_id)
         if mutual:
             score += 25  # Big bonus!
-        
+
         return min(score, 100.0)
 
-    def _find_mutual_skills(self, seeker_node: str, mentor_node: str) -> Set[str]:
-        seeker_teaches = set()
-        for neighbor in self.G.neighbors(seeker_node):
-            edge = self.G.edges.get((seeker_node, neighbor), {})
-            if edge.get("relation") == RelationType.CAN_TEACH:
-                seeker_teaches.add(neighbor)
-        
-        mentor_learns = set()
-        for neighbor in self.G.neighbors(mentor_node):
-            edge = self.G.edges.get((mentor_node, neighbor), {})
-            if edge.get("relation") == RelationType.WANTS_TO_LEARN:
-                mentor_learns.add(neighbor)
-        
-        return seeker_teaches & mentor_learns
+    def _find_mutual_skills(self, seeker_id: str, mentor_id: str) -> Set[str]:
+        return self.store.mutual_skills(seeker_id, mentor_id)
+
+    def _skill_name(self, skill_id: str) -> str:
+        return (self.store.get_skill(skill_id) or {}).get("name", "Unknown")
 
     def find_mutual_exchange(self, seeker_id: str, mentor_id: str) -> Optional[str]:
         """Find if seeker can teach something the mentor wants to learn"""
-        seeker_node = f"user:{seeker_id}"
-        mentor_node = f"user:{mentor_id}"
-        
-        if seeker_node not in self.G or mentor_node not in self.G:
+        if not self.store.has_user(seeker_id) or not self.store.has_user(mentor_id):
             return None
 
-        mutual = self._find_mutual_skills(seeker_node, mentor_node)
+        mutual = self._find_mutual_skills(seeker_id, mentor_id)
         if mutual:
-            skill_node = list(mutual)[0]
-            return self.G.nodes[skill_node].get("name", "Unknown")
-        
+            return min(self._skill_name(skill_id) for skill_id in mutual)
+
         return None
 
     def get_connection_degree(self, user1_id: str, user2_id: str) -> Tuple[int, List[str]]:
         """Get the connection degree between two users"""
-        node1 = f"user:{user1_id}"
-        node2 = f"user:{user2_id}"
-        
-        if node1 not in self.G or node2 not in self.G:
+        if not self.store.has_user(user1_id) or not self.store.has_user(user2_id):
             return (0, [])
-        
-        # Revert to original logic for consistency
-        neighbors1 = set(self.G.neighbors(node1)) if node1 in self.G else set()
-        neighbors2 = set(self.G.neighbors(node2)) if node2 in self.G else set()
-        
-        common_skills = neighbors1 & neighbors2
-        
-        if common_skills:
-            skill_name = self.G.nodes[list(common_skills)[0]].get("name", "Unknown")
-            return (2, [skill_name])
-        
-        return (3, [])
+
+        return self._connection_degree(user1_id, user2_id, self.social.degrees(user1_id, [user2_id]).get(user2_id))
+
+    def _connection_degree(self, user1_id: str, user2_id: str, path: Optional[List[str]]) -> Tuple[int, List[str]]:
+        """Hops and user names along a session/connection path; OUT_OF_NETWORK with no path when none is in reach"""
+        if path:
+            return (len(path) - 1, [(self.store.get_user(uid) or {}).get("name", "Unknown") for uid in path])
+        return (SocialGraph.OUT_OF_NETWORK, [])
 
     def get_user_connections(self, user_id: str):
         """Get all connections for a user"""
-        user_node = f"user:{user_id}"
-        
-        if user_node not in self.G.nodes():
+        if not self.store.has_user(user_id):
             return None
-        
-        teaching = []
-        learning = []
-        
-        for neighbor in self.G.neighbors(user_node):
-            edge = self.G.edges.get((user_node, neighbor), {})
-            if neighbor.startswith("skill:"):
-                skill_name = self.G.nodes[neighbor].get("name", "Unknown")
-                if edge.get("relation") == RelationType.CAN_TEACH:
-                    teaching.append({
-                        "skill": skill_name,
-                        "proficiency": edge.get("proficiency", 1)
-                    })
-                elif edge.get("relation") == RelationType.WANTS_TO_LEARN:
-                    learning.append({"skill": skill_name})
-        
+
+        teaching = [
+            {"skill": self._skill_name(skill_id), "proficiency": proficiency}
+            for skill_id, proficiency in self.store.teaches(user_id)
+        ]
+        learning = [{"skill": self._skill_name(skill_id)} for skill_id in self.store.learns(user_id)]
+
         return {"teaching": teaching, "learning": learning}
 
-    def find_matches(self, seeker_id: str, skill_name: str, limit: int = 5) -> List[MatchResult]:
-        """Find mentors for a skill using efficient graph traversal"""
+    def skill_profile(self, user_id: str) -> Optional[Dict[str, List[Tuple[str, str]]]]:
+        """(name, category) of the skills a user teaches and wants to learn, or None for an unknown user"""
+        if not self.store.has_user(user_id):
+            return None
+        skills = self.store.views.skills
+        return {
+            "teaching": [skills[skill_id] for skill_id, _ in self.store.teaches(user_id) if skill_id in skills],
+            "learning": [skills[skill_id] for skill_id in self.store.learns(user_id) if skill_id in skills],
+        }
+
+    def find_matches(self, seeker_id: str, skill_name: str, limit: int = 5,
+                     include_related: bool = False, exclude: Optional[frozenset] = None) -> List[MatchResult]:
+        """
+        Find mentors for a skill, served from the match cache when the graph is unchanged.
+
+        With include_related, slots the skill's own mentors leave empty are filled
+        with mentors of related skills from the last computed similarity (see
+        skill_similarity, which callers await first for an up-to-date one).
+        Mentors in `exclude` (e.g. booked at the requested time) are dropped
+        before scoring, so they never take a top-k slot.
+        """
         target_skill = skill_name.lower()
         if not target_skill:
              return []
 
-        # 1. Resolve Skill Node (O(N) -> can be O(1) with name map)
-        skill_node = None
-        for node in self.G.nodes():
-            if str(node).startswith("skill:") and self.G.nodes[node].get("name", "").lower() == target_skill:
-                skill_node = node
-                break
-        
-        if not skill_node:
+        similarity = self.similarity if include_related else None
+        key = self._match_key(seeker_id, target_skill, limit, include_related, similarity, exclude)
+        version = self.version
+        cached = self.match_cache.get(key, version)
+        if cached is not None:
+            return list(cached)
+
+        matches = self._find_matches(seeker_id, target_skill, limit, similarity, exclude)
+        self.match_cache.set(key, matches, version)
+        return list(matches)
+
+    @staticmethod
+    def _match_key(seeker_id: str, target_skill: str, limit: int, include_related: bool,
+                   similarity: Optional[SkillSimilarity], exclude: Optional[frozenset] = None) -> tuple:
+        key = (seeker_id, target_skill, limit)
+        if include_related:
+            key += ("related", similarity.version if similarity is not None else None)
+        if exclude:
+            key += ("exclude", exclude)
+        return key
+
+    def _resolve_skill(self, target_skill: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Exact lower-cased name, else the closest name in the search index ("ML", "Pyhton").
+        Returns (skill_id, via) where via is the substituted skill's name when the fallback was used.
+        """
+        skill_id = self.store.resolve_skill(target_skill)
+        if skill_id is not None:
+            return skill_id, None
+        views = self.store.views
+        skill_id = views.search.resolve(target_skill, popularity=views.learners)
+        return skill_id, (self._skill_name(skill_id) if skill_id is not None else None)
+
+    @staticmethod
+    def _tag(matches: List[MatchResult], via: Optional[str]) -> List[MatchResult]:
+        """Mark mentors found for a substituted skill (they were not asked for by name)"""
+        if via is not None:
+            for match in matches:
+                match.via_skill = via
+        return matches
+
+    def _find_matches(self, seeker_id: str, target_skill: str, limit: int,
+                      similarity: Optional[SkillSimilarity] = None,
+                      exclude: Optional[frozenset] = None) -> List[MatchResult]:
+        """Find mentors for a skill using efficient graph traversal"""
+        # 1. Resolve Skill Node via the name index, falling back to fuzzy search
+        skill_id, via = self._resolve_skill(target_skill)
+        if not skill_id:
             # Return empty or raise error? Service should probably return empty
             return []
 
-        seeker_node = f"user:{seeker_id}"
+        # 2. Score every mentor of the skill in one vectorized pass
+        matches = self._tag(self._rank(seeker_id, self.store.match_candidates(skill_id, seeker_id), limit, exclude),
+                            via)
+        if similarity is not None and len(matches) < limit:
+            matches = self._expand_related(seeker_id, skill_id, matches, limit, similarity, exclude)
+        return matches
+
+    def _expand_related(self, seeker_id: str, skill_id: str, matches: List[MatchResult], limit: int,
+                        similarity: SkillSimilarity, exclude: Optional[frozenset] = None) -> List[MatchResult]:
+        """Top up matches with mentors of the skills most often held alongside skill_id, closest skill first"""
+        matches = list(matches)
+        seen = {match.user_id for match in matches}
+        for related_id, _, _ in similarity.related(skill_id, settings.MATCH_RELATED_SKILLS):
+            if len(matches) >= limit:
+                break
+            if not self.store.has_skill(related_id):
+                continue
+            via = self._skill_name(related_id)
+            for match in self._rank(seeker_id, self.store.match_candidates(related_id, seeker_id), limit, exclude):
+                if match.user_id not in seen and len(matches) < limit:
+                    seen.add(match.user_id)
+                    match.via_skill = via
+                    matches.append(match)
+        return matches
+
+    def _rank(self, seeker_id: str, batch: CandidateBatch, limit: int,
+              exclude: Optional[frozenset] = None) -> List[MatchResult]:
+        """Score a candidate batch (minus excluded mentors) and enrich the top `limit` mentors"""
+        if exclude:
+            batch = batch.without(self.store.user_handles(exclude))
+        scores = score_candidates(batch)
+
+        # 3. Partial top-k, then enrich only the winners
         matches = []
-        
-        # 2. Optimization: Use graph predecessors to find potential mentors
-        # Users who "CAN_TEACH" are predecessors of the skill node
-        try:
-            potential_mentors = list(self.G.predecessors(skill_node))
-        except nx.NetworkXError:
-             return []
-        
-        for node in potential_mentors:
-            if str(node).startswith("user:") and node != seeker_node:
-                # Verifying edge relation explicitly for safety
-                edge = self.G.edges.get((node, skill_node))
-                if edge and edge.get("relation") == RelationType.CAN_TEACH:
-                    
-                    user_id = str(node).split(":")[1]
-                    user_data = self.G.nodes[node]
-                    
-                    # metrics
-                    score = self.calculate_match_score(seeker_id, user_id, skill_node)
-                    degree, path = self.get_connection_degree(seeker_id, user_id)
-                    mutual = self.find_mutual_exchange(seeker_id, user_id)
-                    
-                    matches.append(MatchResult(
-                        user_id=user_id,
-                        name=user_data.get("name", "Unknown"),
-                        year=user_data.get("year", 0),
-                        branch=user_data.get("branch", "Unknown"),
-                        proficiency=edge.get("proficiency", 1),
-                        match_score=score,
-                        connection_degree=degree,
-                        connection_path=path,
-                        mutual_exchange=mutual
-                    ))
-        
-        matches.sort(key=lambda x: x.match_score, reverse=True)
-        return matches[:limit]
-
-graph_service = GraphService()
+        best = top_k(scores, limit)
+        winners = self.store.user_ids(batch.users[best])
+        # One multi-target search from the seeker covers every winner
+        paths = self.social.degrees(seeker_id, winners) if self.social.relations else {}
+        for idx, user_id in zip(best.tolist(), winners):
+            user_data = self.store.get_user(user_id) or {}
+            degree, path = self._connection_degree(seeker_id, user_id, paths.get(user_id))
+            mutual = self.find_mutual_exchange(seeker_id, user_id) if batch.mutual[idx] else None
+
+            matches.append(MatchResult(
+                user_id=user_id,
+                name=user_data.get("name", "Unknown"),
+                year=user_data.get("year", 0),
+                branch=user_data.get("branch", "Unknown"),
+                proficiency=int(batch.proficiency[idx]),
+                match_score=float(scores[idx]),
+                connection_degree=degree,
+                connection_path=path,
+                mutual_exchange=mutual
+            ))
+
+        return matches
+
+    async def find_matches_batch(self, queries: List[MatchRequest], schedule=None) -> AsyncIterator[List[dict]]:
+        """
+        Answer many /match/find queries, one skill group at a time.
+
+        Queries are grouped by skill so the skill is resolved and its mentors'
+        columns gathered once per group; each seeker then only adds its own
+        branch/exchange columns. Work runs on the read executor in chunks of
+        MATCH_BATCH_CHUNK_SIZE queries, each yielded as soon as it is done, as
+        {"index", "user_id", "skill_name", "matches"} rows where index is the
+        query's position in the request. Cached matches are reused, but batch
+        results are not cached so a bulk job cannot evict interactive entries.
+        Queries with available_at skip mentors `schedule` (an AvailabilityIndex)
+        has booked during their slot.
+        """
+        similarity = None
+        if any(query.include_related for query in queries):
+            similarity = await self.skill_similarity()
+
+        groups: Dict[str, List[Tuple[int, MatchRequest]]] = {}
+        for index, query in enumerate(queries):
+            groups.setdefault(query.skill_name.lower(), []).append((index, query))
+
+        size = max(settings.MATCH_BATCH_CHUNK_SIZE, 1)
+        for target_skill, group in groups.items():
+            columns = None
+            for start in range(0, len(group), size):
+                columns, rows = await executors.read(
+                    self._match_chunk, target_skill, group[start:start + size], columns, similarity, schedule
+                )
+                yield rows
+
+    def _match_chunk(self, target_skill: str, chunk: List[Tuple[int, MatchRequest]], columns=None,
+                     similarity: Optional[SkillSimilarity] = None, schedule=None):
+        """
+        One chunk of a skill group. `columns` is (version, skill_id, MentorColumns, via)
+        from the previous query and is rebuilt if the graph changed since. The
+        read lock is held per query, so a write waits for one query, not the chunk.
+        """
+        rows = []
+        for index, query in chunk:
+            related = similarity if query.include_related else None
+            exclude = None
+            if schedule is not None and query.available_at is not None:
+                exclude = frozenset(schedule.busy(*match_slot(query)))
+            with self.lock.read():
+                store, version = self.store, self.version
+                if columns is None or columns[0] != version:
+                    skill_id, via = self._resolve_skill(target_skill) if target_skill else (None, None)
+                    columns = (version, skill_id, store.mentor_columns(skill_id) if skill_id else None, via)
+                _, skill_id, mentors, via = columns
+
+                key = self._match_key(query.user_id, target_skill, query.limit, query.include_related,
+                                      related, exclude)
+                matches = self.match_cache.get(key, version)
+                if matches is None:
+                    matches = self._tag(self._rank(query.user_id, store.seeker_candidates(mentors, query.user_id),
+                                                   query.limit, exclude), via) if skill_id else []
+                    if related is not None and skill_id and len(matches) < query.limit:
+                        matches = self._expand_related(query.user_id, skill_id, matches, query.limit,
+                                                       related, exclude)
+            rows.append({
+                "index": index,
+                "user_id": query.user_id,
+                "skill_name": query.skill_name,
+                "matches": [match.model_dump() for match in matches],
+            })
+        return columns, rows
+
+    # ============== ANALYTICS ==============
+
+    def trending_skills(self, limit: int = 10) -> List[dict]:
+        """Skills with the most learners"""
+        return [
+            {"skill": self._skill_name(skill_id), "learners": count}
+            for skill_id, count in self.store.views.top_skills(limit)
+        ]
+
+    def search_skills(self, query: str, limit: int = 10) -> List[dict]:
+        """Autocomplete: exact, then prefix (name, word or acronym), then fuzzy matches"""
+        views = self.store.views
+        results = []
+        for skill_id, kind, score in views.search.search(query, limit, popularity=views.learners):
+            name, category = views.skills.get(skill_id, ("Unknown", "General"))
+            results.append({
+                "skill_id": skill_id,
+                "name": name,
+                "category": category,
+                "learners": views.learners.get(skill_id, 0),
+                "match": kind,
+                "score": score,
+            })
+        return results
+
+    async def skill_similarity(self) -> SkillSimilarity:
+        """
+        Skill co-occurrence for the current graph version.
+
+        The user -> skill incidence arrays are captured on the loop and the
+        sparse A^T A product runs in a rebuild worker. The result is kept until
+        the next write; callers arriving while one is computing share it (and
+        may get one a few writes old, which the next call then replaces).
+        """
+        similarity = self.similarity
+        if similarity is not None and similarity.version == self.version:
+            return similarity
+        if self._similarity_task is None:
+            task = asyncio.ensure_future(self._compute_similarity())
+            task.add_done_callback(lambda _: setattr(self, "_similarity_task", None))
+            self._similarity_task = task
+        return await asyncio.shield(self._similarity_task)
+
+    async def _compute_similarity(self) -> SkillSimilarity:
+        start = time.perf_counter()
+        version = self.version
+        users, skills, skill_ids = await self._compacted(self.store.skill_incidence)
+        table = await executors.rebuild(related_table, users, skills, len(skill_ids), settings.SKILL_RELATED_TOP_N)
+        similarity = SkillSimilarity(version, skill_ids, table, time.perf_counter() - start)
+        if self.similarity is None or self.similarity.version <= version:
+            self.similarity = similarity
+        logger.info(f"Skill similarity computed: {similarity.stats()}")
+        return similarity
+
+    async def related_skills(self, skill_id: str, limit: int = 10) -> List[dict]:
+        """Skills most often taught/learned by the same users as skill_id, by cosine similarity"""
+        similarity = await self.skill_similarity()
+        views = self.store.views
+        related = []
+        for other_id, score, shared in similarity.related(skill_id, limit):
+            skill = views.skills.get(other_id)
+            if skill is None:
+                continue
+            related.append({
+                "skill_id": other_id,
+                "name": skill[0],
+                "category": skill[1],
+                "score": score,
+                "shared_users": shared,
+            })
+        return related
+
+    async def assign_mentors(self, capacity: Optional[int] = None) -> Tuple[List[dict], dict]:
+        """
+        One mentor for every WANTS_TO_LEARN edge, maximizing the total match
+        score with at most `capacity` learners per mentor (see assignment.assign).
+
+        The graph is captured as columns on the loop and the optimization runs
+        in a rebuild worker. Returns (rows, stats); stats carry the graph version
+        the rows were computed from.
+        """
+        start = time.perf_counter()
+        version = self.version
+        columns = await self._compacted(self.store.edge_columns)
+        rows, stats = await executors.rebuild(
+            assign, columns, capacity or settings.ASSIGNMENT_MENTOR_CAPACITY,
+            settings.ASSIGNMENT_CANDIDATES, settings.ASSIGNMENT_EPSILON
+        )
+        stats.update(graph_version=version, duration_s=round(time.perf_counter() - start, 3))
+        logger.info(f"Mentor assignment computed: {stats}")
+        return rows, stats
+
+    def skill_categories(self) -> dict:
+        """Skill names grouped by category"""
+        return self.store.views.category_names()
+
+    def leaderboard(self, limit: int = 10) -> List[dict]:
+        """Top mentors by teaching proficiency"""
+        return [
+            {
+                "rank": i + 1,
+                "user_id": user_id,
+                "name": (self.store.get_user(user_id) or {}).get("name", "Unknown"),
+                "total_proficiency": total,
+                "skills_teaching": count,
+                "score": total * count,
+            }
+            for i, (user_id, total, count) in enumerate(self.store.views.top_mentors(limit))
+        ]
+
+graph_service = GraphService(backend=settings.GRAPH_BACKEND)
@@ -0,0 +1,368 @@
+import asyncio
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, Tuple
+from bson import json_util
+from ..core.config import settings
+from ..core.database import db
+from ..core.executors import executors
+from ..models import User, Skill
+from .graph_service import GraphService, graph_service
+from .graph_sync import GraphSyncService, graph_sync
+
+try:
+    import fcntl
+except ImportError:  # Windows: shared mode is unavailable, single-worker mode still runs
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class SharedGraphCoordinator:
+    """
+    Keeps every uvicorn worker serving the same graph.
+
+    One worker, the leader (whoever holds an flock on `leader.lock`), owns the graph:
+    it follows MongoDB and periodically publishes a snapshot into a shared (tmpfs)
+    directory, then bumps a generation counter kept in a small memory-mapped file.
+    Every other worker maps the published snapshot; on the compact backend its arrays
+    are the same page-cache pages in every process rather than per-worker copies.
+
+    API mutations are applied locally at once and broadcast through an append-only
+    log that every worker replays. Each snapshot records the log offset it already
+    includes, so a worker adopting it only replays what came after. Requests only the
+    leader can serve (a MongoDB full sync) are routed to it through the same log.
+
+    Log offsets are logical: the log file starts with a {"log_base": n} line and holds
+    the entries from offset n on. After each publish the leader rotates in a copy
+    without the entries the snapshot already covers, so the file stays bounded; a
+    worker that finds its offset below the base adopts the snapshot instead.
+    """
+    SNAPSHOT = "graph.snap"
+    LOG = "mutations.log"
+    LOCK = "leader.lock"
+    GENERATION = "generation"
+
+    def __init__(self, graph: GraphService, sync: GraphSyncService):
+        self.graph = graph
+        self.sync = sync
+        self.directory: Optional[str] = None
+        self.role = "off"
+        self.worker_id = str(os.getpid())
+        self.generation = 0           # generation of the snapshot this worker serves
+        self.log_offset = 0           # bytes of the mutation log applied here (logical, see log_base)
+        self.log_base = 0             # logical offset the log file currently starts at
+        self.entries_replayed = 0
+        self.last_publish: Optional[dict] = None
+        self._published_version: Optional[int] = None
+        self._last_publish_at = 0.0
+        self._lock_fd: Optional[int] = None
+        self._log_fd: Optional[int] = None
+        # flock does not exclude threads sharing our descriptor (compaction runs on one)
+        self._log_lock = threading.Lock()
+        self._counter: Optional[mmap.mmap] = None
+        self._replaying = False
+        self._replay_own = False      # set after adopting a snapshot
+        self._snapshot_meta: Optional[dict] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    # ============== LIFECYCLE ==============
+
+    async def start(self, directory: str, worker_id: Optional[str] = None):
+        if fcntl is None:
+            raise RuntimeError("GRAPH_SHARED_DIR needs flock (fcntl), which this platform lacks; "
+                               "unset it to run a single worker")
+        self.directory = directory
+        self.worker_id = worker_id or str(os.getpid())
+        if self.graph.backend != "compact":
+            logger.warning("Shared graph mode maps snapshots zero-copy only with GRAPH_BACKEND=compact")
+
+        await asyncio.to_thread(self._open_files)
+        self.graph.mutation_listeners.append(self._broadcast)
+
+        self.role = "follower"
+        await self._adopt_snapshot()
+        await self._replay()
+        if self._try_lead():
+            await self._promote()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._broadcast in self.graph.mutation_listeners:
+            self.graph.mutation_listeners.remove(self._broadcast)
+
+        if self.role == "leader":
+            await self.sync.stop()
+            await self.publish()
+            if settings.GRAPH_SNAPSHOT_PATH:
+                await self.sync.save_snapshot(settings.GRAPH_SNAPSHOT_PATH)
+        for fd in (self._lock_fd, self._log_fd):
+            if fd is not None:
+                os.close(fd)
+        self._lock_fd = self._log_fd = None
+        if self._counter is not None:
+            self._counter.close()
+            self._counter = None
+        self.role = "off"
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.GRAPH_SHARED_POLL_INTERVAL)
+            try:
+                await self.tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Shared graph tick failed: {e}")
+
+    def _open_files(self):
+        os.makedirs(self.directory, exist_ok=True)
+        counter_path = self._path(self.GENERATION)
+        with open(counter_path, "ab") as f:
+            if f.tell() < 8:
+                f.write(b"\0" * (8 - f.tell()))
+        counter_fd = os.open(counter_path, os.O_RDWR)
+        self._counter = mmap.mmap(counter_fd, 8)
+        os.close(counter_fd)
+        self._log_fd = self._open_log()
+
+    async def tick(self):
+        """One round: leader election, snapshot adoption, log replay, publishing"""
+        if self.role == "follower":
+            if self._try_lead():
+                await self._promote()
+            elif self._read_generation() != self.generation:
+                await self._adopt_snapshot()
+        await self._replay()
+        if self.role == "leader":
+            due = time.monotonic() - self._last_publish_at >= settings.GRAPH_SHARED_PUBLISH_INTERVAL
+            if due and self.graph.version != self._published_version:
+                await self.publish()
+
+    # ============== LEADERSHIP ==============
+
+    def _try_lead(self) -> bool:
+        fd = os.open(self._path(self.LOCK), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    async def _promote(self):
+        """Become the leader: own the MongoDB sync and start publishing"""
+        self.role = "leader"
+        logger.info(f"Worker {self.worker_id} is the shared graph leader")
+        if self._snapshot_meta is not None:
+            self.sync.restore_state(self._snapshot_meta)
+        elif settings.GRAPH_SNAPSHOT_PATH:
+            self.sync.load_snapshot(settings.GRAPH_SNAPSHOT_PATH)
+        if db.db is not None and settings.GRAPH_SYNC_MODE == "incremental":
+            await self.sync.start()
+        await self.publish()
+
+    # ============== SNAPSHOTS ==============
+
+    def _read_generation(self) -> int:
+        return struct.unpack_from("<Q", self._counter, 0)[0]
+
+    async def publish(self) -> dict:
+        """Leader: write the current graph to the shared snapshot and bump the generation"""
+        version = self.graph.version
+        meta = {**self.sync.sync_state(), "log_offset": self.log_offset}
+        info = await self.graph.save_snapshot(self._path(self.SNAPSHOT), meta=meta)
+        self.generation = self._read_generation() + 1
+        struct.pack_into("<Q", self._counter, 0, self.generation)
+        self._published_version = version
+        self._last_publish_at = time.monotonic()
+        # Entries up to the snapshot's offset are in it now
+        self.log_base = await asyncio.to_thread(self._compact_log, meta["log_offset"])
+        self.last_publish = {**info, "generation": self.generation, "log_offset": meta["log_offset"]}
+        return self.last_publish
+
+    async def _adopt_snapshot(self):
+        """
+        Follower: serve the latest published snapshot, then replay the log after it.
+
+        The snapshot is built on the load executor and only swapped in on the loop,
+        so requests keep being served from the current graph meanwhile.
+        """
+        generation = self._read_generation()
+        if not generation:
+            return
+        try:
+            prepared = await executors.load(self.graph.read_snapshot, self._path(self.SNAPSHOT))
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Could not map shared graph snapshot: {e}")
+            return
+        meta = await self.graph.write(self.graph.install_snapshot, *prepared)
+        self.generation = generation
+        self._snapshot_meta = meta
+        # Everything after the snapshot's offset, our own writes included, is replayed again
+        self.log_offset = meta.get("log_offset", 0)
+        self._replay_own = True
+
+    # ============== MUTATION LOG ==============
+
+    def _broadcast(self, op: str, payload: dict):
+        if self._replaying or self._log_fd is None:
+            return
+        self._append({"op": op, "payload": payload})
+
+    def _append(self, entry: dict):
+        line = (json_util.dumps({"worker": self.worker_id, **entry}) + "\n").encode()
+        with self._locked_log() as fd:
+            os.write(fd, line)
+
+    @staticmethod
+    def _log_header(base: int) -> bytes:
+        return (json_util.dumps({"log_base": base}) + "\n").encode()
+
+    def _open_log(self) -> int:
+        """Open the log for appending, writing its header if this creates it"""
+        fd = os.open(self._path(self.LOG), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(fd).st_size == 0:
+                os.write(fd, self._log_header(0))
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        return fd
+
+    @contextmanager
+    def _locked_log(self):
+        """The current log file's descriptor, exclusively locked; reopened first if the leader rotated it"""
+        with self._log_lock:
+            while True:
+                fcntl.flock(self._log_fd, fcntl.LOCK_EX)
+                try:
+                    current = os.fstat(self._log_fd).st_ino == os.stat(self._path(self.LOG)).st_ino
+                except FileNotFoundError:
+                    current = False
+                if current:
+                    break
+                fcntl.flock(self._log_fd, fcntl.LOCK_UN)
+                os.close(self._log_fd)
+                self._log_fd = self._open_log()
+            try:
+                yield self._log_fd
+            finally:
+                fcntl.flock(self._log_fd, fcntl.LOCK_UN)
+
+    def _read_log(self, offset: int) -> Tuple[int, bytes]:
+        """(log base, bytes from logical offset on); nothing when offset is below the base"""
+        with open(self._path(self.LOG), "rb") as f:
+            header = f.readline()
+            if not header.endswith(b"\n"):
+                return offset, b""
+            base = json_util.loads(header)["log_base"]
+            if offset < base:
+                return base, b""
+            f.seek(len(header) + offset - base)
+            return base, f.read()
+
+    def _compact_log(self, upto: int) -> int:
+        """Leader: replace the log with a copy starting at logical offset `upto`; returns the new base"""
+        path = self._path(self.LOG)
+        with self._locked_log():
+            with open(path, "rb") as f:
+                header = f.readline()
+                base = json_util.loads(header)["log_base"]
+                if upto <= base:
+                    return base
+                f.seek(len(header) + upto - base)
+                tail = f.read()
+            # Writers wait on the old file's lock, then notice the rename and reopen
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(self._log_header(upto))
+                f.write(tail)
+            os.replace(tmp_path, path)
+        return upto
+
+    def route_full_sync(self):
+        """Ask the leader to run a MongoDB full sync; the result arrives via its next publish"""
+        self._append({"op": "full_sync", "payload": {}})
+
+    async def _replay(self):
+        self.log_base, data = await asyncio.to_thread(self._read_log, self.log_offset)
+        if self.log_offset < self.log_base:
+            # What we had not applied yet was compacted away after a publish; the snapshot has it
+            await self._adopt_snapshot()
+            self.log_base, data = await asyncio.to_thread(self._read_log, self.log_offset)
+            if self.log_offset < self.log_base:
+                logger.warning(f"Mutation log entries before {self.log_base} were dropped before worker "
+                               f"{self.worker_id} applied them (it was at {self.log_offset})")
+                self.log_offset = self.log_base
+                self.log_base, data = await asyncio.to_thread(self._read_log, self.log_offset)
+        end = data.rfind(b"\n") + 1
+        if not end:
+            return
+        replay_own = self._replay_own
+        self._replay_own = False
+        self.log_offset += end
+
+        for line in data[:end].splitlines():
+            entry = json_util.loads(line)
+            # Our own writes were applied when they were made
+            if entry["worker"] == self.worker_id and not replay_own:
+                continue
+            await self._apply(entry["op"], entry["payload"])
+            self.entries_replayed += 1
+
+    async def _apply(self, op: str, payload: dict):
+        await self.graph.write(self._apply_mutation, op, payload)
+
+        if op == "rebuild_graph":
+            await self.graph.rebuild_graph([User(**u) for u in payload["users"]],
+                                           [Skill(**k) for k in payload["skills"]], notify=False)
+        elif op == "full_sync" and self.role == "leader" and db.db is not None:
+            await self.sync.full_sync()
+            await self.publish()
+
+    def _apply_mutation(self, op: str, payload: dict):
+        self._replaying = True
+        try:
+            if op == "register_user":
+                self.graph.register_user(User(**payload["user"]))
+            elif op == "update_user_profile":
+                self.graph.update_user_profile(**payload)
+            elif op == "update_user_skills":
+                self.graph.update_user_skills(**payload)
+            elif op == "set_relation":
+                self.graph.set_relation(**payload)
+            elif op == "remove_relation":
+                self.graph.remove_relation(**payload)
+        finally:
+            self._replaying = False
+
+    def status(self) -> dict:
+        return {
+            "role": self.role,
+            "worker": self.worker_id,
+            "generation": self.generation,
+            "published_generation": self._read_generation() if self._counter is not None else None,
+            "log_offset": self.log_offset,
+            "log_base": self.log_base,
+            "entries_replayed": self.entries_replayed,
+            "last_publish": self.last_publish,
+        }
+
+graph_shared = SharedGraphCoordinator(graph_service, graph_sync)
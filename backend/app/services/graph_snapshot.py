@@ -0,0 +1,70 @@
+import os
+import struct
+import numpy as np
+from typing import Dict, Tuple
+from bson import json_util
+
+# File layout: MAGIC | uint64 header length | JSON header | arrays, each 64-byte aligned.
+# The header records dtype/shape/offset per array so they can be memory-mapped in place.
+MAGIC = b"SKGRAPH1"
+ALIGN = 64
+
+
+def _aligned(offset: int) -> int:
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+def write_snapshot(path: str, arrays: Dict[str, np.ndarray], header: dict) -> int:
+    """Write arrays plus a JSON header atomically (temp file + rename); returns bytes written"""
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        arrays[name] = array
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset = _aligned(offset + array.nbytes)
+
+    encoded = json_util.dumps({**header, "arrays": layout}).encode()
+    data_start = _aligned(len(MAGIC) + 8 + len(encoded))
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(encoded)))
+        f.write(encoded)
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name]["offset"])
+            f.write(array.tobytes())
+        size = f.tell()
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return size
+
+
+def read_snapshot(path: str) -> Tuple[Dict[str, np.ndarray], dict]:
+    """
+    Memory-map a snapshot's arrays (copy-on-write) and parse its header.
+
+    Pages are only read from disk as they are touched, and writes through
+    the returned arrays stay private to this process.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a graph snapshot")
+        raw = f.read(8)
+        if len(raw) != 8:
+            raise ValueError(f"{path} is truncated")
+        (length,) = struct.unpack("<Q", raw)
+        header = json_util.loads(f.read(length).decode())
+    data_start = _aligned(len(MAGIC) + 8 + length)
+
+    arrays = {}
+    for name, spec in header.pop("arrays").items():
+        dtype, shape = np.dtype(spec["dtype"]), tuple(spec["shape"])
+        if not np.prod(shape):
+            arrays[name] = np.zeros(shape, dtype=dtype)
+        else:
+            mapped = np.memmap(path, dtype=dtype, mode="c", offset=data_start + spec["offset"], shape=shape)
+            arrays[name] = mapped.view(np.ndarray)
+    return arrays, header
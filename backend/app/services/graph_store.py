@@ -0,0 +1,340 @@
+import networkx as nx
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from ..core.constants import RelationType, NodeType
+from .match_scoring import CandidateBatch, EdgeColumns, MentorColumns
+from .graph_views import GraphViews
+
+# Record shapes accepted by load(): plain tuples so loaders can stream straight from the DB
+SkillRecord = Tuple[str, str, str]                          # (skill_id, name, category)
+UserRecord = Tuple[str, str, int, str]                      # (user_id, name, year, branch)
+EdgeRecord = Tuple[str, str, RelationType, Optional[int]]   # (user_id, skill_id, relation, proficiency)
+
+
+class NetworkXGraphStore:
+    """networkx DiGraph plus the secondary indexes the matching paths rely on"""
+    backend = "networkx"
+
+    def __init__(self):
+        self.G = nx.DiGraph()
+        self.skill_by_name: Dict[str, str] = {}             # lower-cased name -> skill node
+        self.skill_teachers: Dict[str, Dict[str, int]] = {}  # skill node -> {user node: proficiency}
+        self.skill_learners: Dict[str, Set[str]] = {}        # skill node -> user nodes
+        self.user_teaches: Dict[str, Dict[str, int]] = {}    # user node -> {skill node: proficiency}
+        self.user_learns: Dict[str, Set[str]] = {}           # user node -> skill nodes
+        self.views = GraphViews()
+
+    def load(self, skills: Iterable[SkillRecord], users: Iterable[UserRecord], edges: Iterable[EdgeRecord]):
+        """Bulk-populate an empty store"""
+        for skill_id, name, category in skills:
+            self.add_skill(skill_id, name, category)
+        for user_id, name, year, branch in users:
+            self.add_user(user_id, name, year, branch)
+        self.load_edges(edges)
+        self.finish_load()
+
+    def load_edges(self, edges: Iterable[EdgeRecord]):
+        """Add a batch of edges during a bulk load"""
+        for user_id, skill_id, relation, proficiency in edges:
+            self.set_edge(user_id, skill_id, relation, proficiency)
+
+    def finish_load(self):
+        """End of a bulk load (nothing to finalize for networkx)"""
+
+    def records(self):
+        """(skills, users, edges) records, as accepted by load()"""
+        skills, users, edges = [], [], []
+        for node, attrs in self.G.nodes(data=True):
+            kind, node_id = node.split(":", 1)
+            if kind == "skill":
+                skills.append((node_id, attrs.get("name", "Unknown"), attrs.get("category", "General")))
+            else:
+                users.append((node_id, attrs.get("name", "Unknown"), attrs.get("year", 1), attrs.get("branch", "Unknown")))
+        for user_node, skill_node, attrs in self.G.edges(data=True):
+            relation = attrs["relation"]
+            level = attrs.get("proficiency", 1) if relation == RelationType.CAN_TEACH else None
+            edges.append((user_node.split(":", 1)[1], skill_node.split(":", 1)[1], relation, level))
+        return skills, users, edges
+
+    # ============== MUTATIONS (graph + indexes) ==============
+
+    def add_skill(self, skill_id: str, name: str, category: str = "General"):
+        skill_node = f"skill:{skill_id}"
+        previous = self.G.nodes[skill_node].get("name") if skill_node in self.G else None
+        if previous is not None and self.skill_by_name.get(previous.lower()) == skill_node:
+            del self.skill_by_name[previous.lower()]
+
+        self.G.add_node(skill_node, type=NodeType.SKILL, name=name, category=category)
+        # First skill registered under a name wins, as with the old linear scan
+        self.skill_by_name.setdefault(name.lower(), skill_node)
+        self.skill_teachers.setdefault(skill_node, {})
+        self.skill_learners.setdefault(skill_node, set())
+        self.views.skill_set(skill_id, name, category)
+
+    def add_user(self, user_id: str, name: str, year: int, branch: str):
+        user_node = f"user:{user_id}"
+        self.G.add_node(user_node, type=NodeType.USER, name=name, year=year, branch=branch)
+        self.user_teaches.setdefault(user_node, {})
+        self.user_learns.setdefault(user_node, set())
+
+    def update_user(self, user_id: str, name: Optional[str] = None,
+                    year: Optional[int] = None, branch: Optional[str] = None) -> bool:
+        user_node = f"user:{user_id}"
+        if user_node not in self.G:
+            return False
+
+        if name:
+            self.G.nodes[user_node]["name"] = name
+        if year:
+            self.G.nodes[user_node]["year"] = year
+        if branch:
+            self.G.nodes[user_node]["branch"] = branch
+        return True
+
+    def set_edge(self, user_id: str, skill_id: str, relation: RelationType, proficiency: Optional[int] = None):
+        """Add/overwrite the user -> skill edge and re-file it in the relation indexes"""
+        user_node = f"user:{user_id}"
+        skill_node = f"skill:{skill_id}"
+        attrs = {"relation": relation}
+        if proficiency is not None:
+            attrs["proficiency"] = proficiency
+        existed = self.G.has_edge(user_node, skill_node)
+        self.G.add_edge(user_node, skill_node, **attrs)
+
+        # A DiGraph holds one edge per pair, so the latest relation replaces the previous one
+        old_level = self.skill_teachers.setdefault(skill_node, {}).pop(user_node, None)
+        self.skill_learners.setdefault(skill_node, set()).discard(user_node)
+        self.user_teaches.setdefault(user_node, {}).pop(skill_node, None)
+        self.user_learns.setdefault(user_node, set()).discard(skill_node)
+        if existed:
+            self.views.edge_removed(user_id, skill_id, old_level)
+
+        if relation == RelationType.CAN_TEACH:
+            level = self.G.edges[user_node, skill_node].get("proficiency", 1)
+            self.skill_teachers[skill_node][user_node] = level
+            self.user_teaches[user_node][skill_node] = level
+            self.views.edge_added(user_id, skill_id, level)
+        elif relation == RelationType.WANTS_TO_LEARN:
+            self.skill_learners[skill_node].add(user_node)
+            self.user_learns[user_node].add(skill_node)
+            self.views.edge_added(user_id, skill_id, None)
+
+    def remove_edge(self, user_id: str, skill_id: str) -> bool:
+        user_node = f"user:{user_id}"
+        skill_node = f"skill:{skill_id}"
+        if not self.G.has_edge(user_node, skill_node):
+            return False
+
+        self.G.remove_edge(user_node, skill_node)
+        level = self.skill_teachers[skill_node].pop(user_node, None)
+        self.skill_learners[skill_node].discard(user_node)
+        self.user_teaches[user_node].pop(skill_node, None)
+        self.user_learns[user_node].discard(skill_node)
+        self.views.edge_removed(user_id, skill_id, level)
+        return True
+
+    def remove_user(self, user_id: str) -> bool:
+        user_node = f"user:{user_id}"
+        if user_node not in self.G:
+            return False
+
+        for skill_node, level in self.user_teaches.pop(user_node, {}).items():
+            self.skill_teachers[skill_node].pop(user_node, None)
+            self.views.edge_removed(user_id, skill_node.split(":", 1)[1], level)
+        for skill_node in self.user_learns.pop(user_node, set()):
+            self.skill_learners[skill_node].discard(user_node)
+            self.views.edge_removed(user_id, skill_node.split(":", 1)[1], None)
+        self.G.remove_node(user_node)
+        return True
+
+    def remove_skill(self, skill_id: str) -> bool:
+        skill_node = f"skill:{skill_id}"
+        if skill_node not in self.G:
+            return False
+
+        for user_node, level in self.skill_teachers.pop(skill_node, {}).items():
+            self.user_teaches[user_node].pop(skill_node, None)
+            self.views.edge_removed(user_node.split(":", 1)[1], skill_id, level)
+        for user_node in self.skill_learners.pop(skill_node, set()):
+            self.user_learns[user_node].discard(skill_node)
+            self.views.edge_removed(user_node.split(":", 1)[1], skill_id, None)
+        self.views.skill_removed(skill_id)
+        name = self.G.nodes[skill_node].get("name")
+        if name is not None and self.skill_by_name.get(name.lower()) == skill_node:
+            del self.skill_by_name[name.lower()]
+        self.G.remove_node(skill_node)
+        return True
+
+    # ============== LOOKUPS ==============
+
+    def has_user(self, user_id: str) -> bool:
+        return f"user:{user_id}" in self.G
+
+    def has_skill(self, skill_id: str) -> bool:
+        return f"skill:{skill_id}" in self.G
+
+    def get_user(self, user_id: str) -> Optional[dict]:
+        user_node = f"user:{user_id}"
+        if user_node not in self.G:
+            return None
+        return dict(self.G.nodes[user_node])
+
+    def get_skill(self, skill_id: str) -> Optional[dict]:
+        skill_node = f"skill:{skill_id}"
+        if skill_node not in self.G:
+            return None
+        return dict(self.G.nodes[skill_node])
+
+    def resolve_skill(self, name: str) -> Optional[str]:
+        """Lower-cased skill name -> skill id"""
+        skill_node = self.skill_by_name.get(name)
+        return skill_node.split(":", 1)[1] if skill_node else None
+
+    def teachers(self, skill_id: str) -> List[Tuple[str, int]]:
+        """(user_id, proficiency) for every CAN_TEACH edge into the skill"""
+        return [
+            (user_node.split(":", 1)[1], level)
+            for user_node, level in self.skill_teachers.get(f"skill:{skill_id}", {}).items()
+        ]
+
+    def teaches(self, user_id: str) -> List[Tuple[str, int]]:
+        return [
+            (skill_node.split(":", 1)[1], level)
+            for skill_node, level in self.user_teaches.get(f"user:{user_id}", {}).items()
+        ]
+
+    def learns(self, user_id: str) -> List[str]:
+        return [skill_node.split(":", 1)[1] for skill_node in self.user_learns.get(f"user:{user_id}", set())]
+
+    def edge_proficiency(self, user_id: str, skill_id: str) -> Optional[int]:
+        return self.G.edges.get((f"user:{user_id}", f"skill:{skill_id}"), {}).get("proficiency")
+
+    def mutual_skills(self, seeker_id: str, mentor_id: str) -> Set[str]:
+        """Skills the seeker can teach that the mentor wants to learn"""
+        seeker_teaches = self.user_teaches.get(f"user:{seeker_id}", {}).keys()
+        mentor_learns = self.user_learns.get(f"user:{mentor_id}", set())
+        return {skill_node.split(":", 1)[1] for skill_node in mentor_learns & seeker_teaches}
+
+    def shared_skills(self, user1_id: str, user2_id: str) -> List[str]:
+        """Skills both users have an edge to, in any relation"""
+        node1 = f"user:{user1_id}"
+        node2 = f"user:{user2_id}"
+        if node1 not in self.G or node2 not in self.G:
+            return []
+        common = set(self.G.neighbors(node1)) & set(self.G.neighbors(node2))
+        return [skill_node.split(":", 1)[1] for skill_node in common]
+
+    def match_candidates(self, skill_id: str, seeker_id: str) -> CandidateBatch:
+        """Every mentor of the skill other than the seeker, as scoring columns"""
+        return self.seeker_candidates(self.mentor_columns(skill_id), seeker_id)
+
+    def mentor_columns(self, skill_id: str) -> MentorColumns:
+        """The seeker-independent half of match_candidates, computed once per skill"""
+        teachers = self.skill_teachers.get(f"skill:{skill_id}", {})
+        attrs = self.G.nodes
+        n = len(teachers)
+        return MentorColumns(
+            users=np.array([node.split(":", 1)[1] for node in teachers], dtype=object),
+            proficiency=np.fromiter(teachers.values(), dtype=np.int16, count=n),
+            year=np.fromiter((attrs[node].get("year", 1) for node in teachers), dtype=np.int16, count=n),
+            branch=np.array([attrs[node].get("branch") for node in teachers], dtype=object),
+        )
+
+    def seeker_candidates(self, columns: MentorColumns, seeker_id: str) -> CandidateBatch:
+        """Narrow a skill's mentor columns to one seeker's candidate batch"""
+        seeker_node = f"user:{seeker_id}"
+        seeker = self.G.nodes[seeker_node] if seeker_node in self.G else {}
+        keep = columns.users != seeker_id
+        users = columns.users[keep]
+        if not len(users):
+            return CandidateBatch.empty(seeker.get("year", 1))
+
+        # Everyone who wants to learn something the seeker teaches
+        exchange = set()
+        for skill_node in self.user_teaches.get(seeker_node, {}):
+            exchange |= self.skill_learners.get(skill_node, set())
+
+        return CandidateBatch(
+            users=users,
+            proficiency=columns.proficiency[keep],
+            year=columns.year[keep],
+            same_branch=columns.branch[keep] == seeker.get("branch"),
+            mutual=np.fromiter((f"user:{u}" in exchange for u in users), dtype=bool, count=len(users)),
+            seeker_year=seeker.get("year", 1),
+        )
+
+    def user_ids(self, handles: np.ndarray) -> List[str]:
+        return list(handles)
+
+    def user_handles(self, user_ids: Iterable[str]) -> np.ndarray:
+        """Inverse of user_ids"""
+        return np.array(list(user_ids), dtype=object)
+
+    # ============== AGGREGATES ==============
+
+    def number_of_nodes(self) -> int:
+        return self.G.number_of_nodes()
+
+    def number_of_edges(self) -> int:
+        return self.views.edges
+
+    def user_count(self) -> int:
+        return len(self.user_teaches)
+
+    def skill_count(self) -> int:
+        return len(self.skill_teachers)
+
+    def iter_skills(self) -> Iterable[Tuple[str, dict]]:
+        for skill_node in self.skill_teachers:
+            yield skill_node.split(":", 1)[1], self.G.nodes[skill_node]
+
+    def skill_learner_counts(self) -> Iterable[Tuple[str, dict, int]]:
+        for skill_node, learners in self.skill_learners.items():
+            yield skill_node.split(":", 1)[1], self.G.nodes[skill_node], len(learners)
+
+    def user_teaching_totals(self) -> Iterable[Tuple[str, dict, int, int]]:
+        """(user_id, attrs, total proficiency, skills taught) for every user who teaches"""
+        for user_node, teaches in self.user_teaches.items():
+            if teaches:
+                yield user_node.split(":", 1)[1], self.G.nodes[user_node], sum(teaches.values()), len(teaches)
+
+    def skill_incidence(self) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+        """(user, skill) index arrays for every edge, and the skill id behind each skill index"""
+        skill_index = {skill_node: s for s, skill_node in enumerate(self.skill_teachers)}
+        users, skills = [], []
+        for u, (user_node, teaches) in enumerate(self.user_teaches.items()):
+            for skill_node in (*teaches, *self.user_learns.get(user_node, ())):
+                users.append(u)
+                skills.append(skill_index[skill_node])
+        skill_ids = [skill_node.split(":", 1)[1] for skill_node in skill_index]
+        return np.array(users, dtype=np.int32), np.array(skills, dtype=np.int32), skill_ids
+
+    def edge_columns(self) -> EdgeColumns:
+        """Every user, skill and edge as index columns (see EdgeColumns)"""
+        nodes = self.G.nodes
+        user_index = {user_node: u for u, user_node in enumerate(self.user_teaches)}
+        skill_index = {skill_node: s for s, skill_node in enumerate(self.skill_teachers)}
+        branches: Dict[str, int] = {}
+        teach_user, teach_skill, teach_prof, learn_user, learn_skill = [], [], [], [], []
+        for user_node, u in user_index.items():
+            for skill_node, level in self.user_teaches[user_node].items():
+                teach_user.append(u)
+                teach_skill.append(skill_index[skill_node])
+                teach_prof.append(level)
+            for skill_node in self.user_learns.get(user_node, ()):
+                learn_user.append(u)
+                learn_skill.append(skill_index[skill_node])
+        return EdgeColumns(
+            user_ids=[user_node.split(":", 1)[1] for user_node in user_index],
+            user_names=[nodes[user_node].get("name", "Unknown") for user_node in user_index],
+            year=np.array([nodes[user_node].get("year", 1) for user_node in user_index], dtype=np.int16),
+            branch=np.array([branches.setdefault(nodes[user_node].get("branch"), len(branches))
+                             for user_node in user_index], dtype=np.int32),
+            skill_ids=[skill_node.split(":", 1)[1] for skill_node in skill_index],
+            skill_names=[nodes[skill_node].get("name", "Unknown") for skill_node in skill_index],
+            teach_user=np.array(teach_user, dtype=np.int32),
+            teach_skill=np.array(teach_skill, dtype=np.int32),
+            teach_prof=np.array(teach_prof, dtype=np.int16),
+            learn_user=np.array(learn_user, dtype=np.int32),
+            learn_skill=np.array(learn_skill, dtype=np.int32),
+        )
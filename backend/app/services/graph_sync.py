@@ -0,0 +1,329 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Dict, Optional, Set, Tuple
+from pymongo.errors import OperationFailure, PyMongoError
+from ..core.config import settings
+from ..core.database import db, stream_graph_data, stream_relations, skill_from_doc, user_from_doc
+from .graph_service import GraphService, graph_service
+from .social_graph import RELATION_SOURCES, SocialGraph
+
+logger = logging.getLogger(__name__)
+
+# Applied in this order when polling so edges never arrive before their nodes
+SYNC_COLLECTIONS = ("skills", "users", "userskills", "sessions", "connection_requests")
+
+
+class GraphSyncService:
+    """
+    Keeps the in-memory graph in step with MongoDB.
+
+    A full rebuild is only used for cold start (and the manual /graph/sync); after that
+    per-document deltas are applied as they happen. Change streams are used when the
+    deployment supports them (replica set / Atlas); a standalone mongod falls back to
+    polling each collection for documents whose watermark field (stamped with the
+    server's clock by every service write, see database.stamped) reached the last poll's.
+    Polling cannot observe deletes.
+    """
+
+    def __init__(self, graph: GraphService):
+        self.graph = graph
+        self.mode = "idle"
+        self._task: Optional[asyncio.Task] = None
+        self._resume_token = None
+        self._watermark: Optional[datetime] = None
+        # (collection, _id) of documents already applied at exactly the watermark
+        self._watermark_seen: Set[Tuple[str, object]] = set()
+        # userskills _id -> (user_id, skill_id), needed to resolve delete events
+        self._userskill_keys: Dict[str, Tuple[str, str]] = {}
+        # sessions / connection_requests _id -> relation id, needed to resolve delete events
+        self._relation_keys: Dict[str, str] = {}
+        # Key updates seen while a full sync is loading (None = deleted)
+        self._key_changes: Optional[Dict[str, Optional[Tuple[str, str]]]] = None
+        self.events_applied = 0
+        self.last_event_at: Optional[float] = None
+        self.last_full_sync: Optional[dict] = None
+        self.last_snapshot: Optional[dict] = None
+
+    # ============== FULL SYNC ==============
+
+    async def full_sync(self) -> dict:
+        """Rebuild the whole graph from MongoDB; the old graph serves until the swap"""
+        loaded = {}
+
+        async def load(store):
+            stats, user_emails, loaded["keys"] = await stream_graph_data(
+                store, batch_size=settings.GRAPH_LOAD_BATCH_SIZE
+            )
+            loaded["stats"] = stats
+            return user_emails
+
+        # userskills deltas that land mid-rebuild must survive the swap too
+        self._key_changes = {}
+        try:
+            rebuild = await self.graph.rebuild(load)
+            keys = loaded["keys"]
+            for doc_id, key in self._key_changes.items():
+                if key is None:
+                    keys.pop(doc_id, None)
+                else:
+                    keys[doc_id] = key
+            self._userskill_keys = keys
+        finally:
+            self._key_changes = None
+
+        relations, self._relation_keys = await stream_relations(settings.GRAPH_LOAD_BATCH_SIZE)
+        social = SocialGraph()
+        social.load(relations)
+        await self.graph.write(self.graph.replace_social, social)
+
+        self.last_full_sync = {
+            **loaded["stats"],
+            "rebuild_s": rebuild["duration_s"],
+            "replayed_writes": rebuild["replayed_writes"],
+            "finished_at": rebuild["finished_at"],
+        }
+        if settings.GRAPH_SNAPSHOT_PATH:
+            await self.save_snapshot(settings.GRAPH_SNAPSHOT_PATH)
+        return self.last_full_sync
+
+    # ============== SNAPSHOTS ==============
+
+    def sync_state(self) -> dict:
+        """Where to resume following MongoDB from, plus the userskill key map"""
+        return {
+            "resume_token": self._resume_token,
+            "watermark": self._watermark,
+            "userskill_keys": self._userskill_keys,
+            "relation_keys": self._relation_keys,
+        }
+
+    async def save_snapshot(self, path: str) -> dict:
+        """Snapshot the graph together with the sync position it reflects"""
+        self.last_snapshot = await self.graph.save_snapshot(path, meta=self.sync_state())
+        return self.last_snapshot
+
+    def load_snapshot(self, path: str) -> bool:
+        """
+        Warm start from a snapshot file. Returns False (and leaves the graph alone)
+        when there is no usable snapshot; start() then cold starts as usual.
+        """
+        if not os.path.exists(path):
+            return False
+        try:
+            meta = self.graph.load_snapshot(path)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable graph snapshot {path}: {e}")
+            return False
+
+        self.restore_state(meta)
+        return True
+
+    def restore_state(self, meta: dict):
+        """Adopt the sync position saved alongside a snapshot"""
+        self._resume_token = meta.get("resume_token")
+        self._watermark = meta.get("watermark")
+        self._userskill_keys = {doc_id: tuple(key) for doc_id, key in meta.get("userskill_keys", {}).items()}
+        self._relation_keys = dict(meta.get("relation_keys", {}))
+        self.mode = "snapshot"
+
+    # ============== DELTAS ==============
+
+    def apply_document(self, collection: str, doc: dict):
+        """Upsert one users / skills / userskills document into the graph"""
+        if collection == "users":
+            self.graph.upsert_user(user_from_doc(doc))
+        elif collection == "skills":
+            self.graph.upsert_skill(skill_from_doc(doc))
+        elif collection == "userskills":
+            doc_id = str(doc["_id"])
+            key = (str(doc["userId"]), str(doc["skillId"]))
+            previous = self._userskill_keys.get(doc_id)
+            if previous and previous != key:
+                self.graph.remove_user_skill(*previous)
+            self._userskill_keys[doc_id] = key
+            if self._key_changes is not None:
+                self._key_changes[doc_id] = key
+
+            # Same rule as the full loader: edges need both endpoints
+            if self.graph.has_user(key[0]) and self.graph.has_skill(key[1]):
+                self.graph.set_user_skill(
+                    key[0], key[1],
+                    proficiency=doc.get("proficiency", 1),
+                    is_teaching=doc.get("isTeaching", False),
+                    is_learning=doc.get("isLearning", False)
+                )
+
+        elif collection in RELATION_SOURCES:
+            if "id" not in doc:
+                return
+            relation_id, pair = RELATION_SOURCES[collection](doc)
+            self._relation_keys[str(doc["_id"])] = relation_id
+            if pair:
+                self.graph.set_relation(relation_id, *pair)
+            else:
+                self.graph.remove_relation(relation_id)
+
+    def apply_delete(self, collection: str, doc_id: str):
+        if collection == "users":
+            self.graph.remove_user(doc_id)
+        elif collection == "skills":
+            self.graph.remove_skill(doc_id)
+        elif collection == "userskills":
+            key = self._userskill_keys.pop(doc_id, None)
+            if self._key_changes is not None:
+                self._key_changes[doc_id] = None
+            if key:
+                self.graph.remove_user_skill(*key)
+        elif collection in RELATION_SOURCES:
+            relation_id = self._relation_keys.pop(doc_id, None)
+            if relation_id:
+                self.graph.remove_relation(relation_id)
+
+    def apply_change(self, change: dict):
+        """Apply one change stream event"""
+        collection = change["ns"]["coll"]
+        operation = change["operationType"]
+        if operation in ("insert", "update", "replace"):
+            doc = change.get("fullDocument")
+            if doc is None:
+                # Deleted before the lookup; the delete event follows
+                return
+            self.apply_document(collection, doc)
+        elif operation == "delete":
+            self.apply_delete(collection, str(change["documentKey"]["_id"]))
+        else:
+            return
+        self.events_applied += 1
+        self.last_event_at = time.time()
+
+    # ============== BACKGROUND TAIL ==============
+
+    async def start(self):
+        """Cold start from a full sync, then follow MongoDB in the background"""
+        if db.db is None or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self.mode = "idle"
+
+    async def _run(self):
+        try:
+            await self._follow()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Graph sync stopped: {e}")
+            self.mode = "failed"
+
+    async def _follow(self):
+        # Warm start: catch up from the position saved with the snapshot
+        if self._resume_token is not None:
+            self.mode = "catch_up"
+            try:
+                await self._tail_change_streams(None)
+                return
+            except OperationFailure as e:
+                logger.warning(f"Cannot resume from the snapshot position ({e}); running a full sync")
+                self._resume_token = None
+        elif self._watermark is not None:
+            await self._poll()
+            return
+
+        # Mark the starting point *before* the full read so nothing written during it is lost;
+        # replaying a change the full read already saw is harmless because deltas are idempotent.
+        hello = await db.db.command("hello")
+        start_at = hello.get("operationTime")
+        # Server time, the clock documents are stamped with
+        self._watermark = hello.get("localTime") or datetime.utcnow()
+
+        self.mode = "cold_start"
+        await self.full_sync()
+
+        if start_at is not None:
+            try:
+                await self._tail_change_streams(start_at)
+                return
+            except OperationFailure as e:
+                logger.warning(f"Change streams unavailable ({e}); falling back to polling")
+        await self._poll()
+
+    async def _tail_change_streams(self, start_at):
+        pipeline = [{"$match": {"ns.coll": {"$in": list(SYNC_COLLECTIONS)}}}]
+        while True:
+            position = {"resume_after": self._resume_token} if self._resume_token else {"start_at_operation_time": start_at}
+            try:
+                async with db.db.watch(pipeline, full_document="updateLookup", **position) as stream:
+                    self.mode = "change_stream"
+                    async for change in stream:
+                        await self.graph.write(self.apply_change, change)
+                        self._resume_token = stream.resume_token
+            except OperationFailure:
+                raise
+            except PyMongoError as e:
+                logger.error(f"Change stream interrupted: {e}; resuming")
+                await asyncio.sleep(settings.GRAPH_SYNC_POLL_INTERVAL)
+
+    async def _poll(self):
+        self.mode = "polling"
+        field = settings.GRAPH_SYNC_WATERMARK_FIELD
+        while True:
+            await asyncio.sleep(settings.GRAPH_SYNC_POLL_INTERVAL)
+            try:
+                await self._poll_once(field)
+            except PyMongoError as e:
+                logger.error(f"Graph sync poll failed: {e}")
+
+    async def _poll_once(self, field: str):
+        """
+        Apply every document stamped at or after the watermark. $gte (rather than $gt)
+        also catches documents committed later with the watermark's own timestamp;
+        the ones already applied there are remembered so they are not applied again.
+        """
+        newest, seen = self._watermark, set(self._watermark_seen)
+        for collection in SYNC_COLLECTIONS:
+            cursor = db.db[collection].find({field: {"$gte": self._watermark}}).sort(field, 1)
+            async for doc in cursor:
+                stamp, key = doc.get(field), (collection, doc.get("_id"))
+                if not isinstance(stamp, datetime):
+                    logger.warning(f"Graph sync skipped {collection} {key[1]}: {field} is {stamp!r}")
+                    continue
+                if stamp == self._watermark and key in self._watermark_seen:
+                    continue
+                try:
+                    await self.graph.write(self.apply_document, collection, doc)
+                except Exception as e:
+                    logger.warning(f"Graph sync skipped {collection} {key[1]}: {e!r}")
+                else:
+                    self.events_applied += 1
+                    self.last_event_at = time.time()
+                if stamp > newest:
+                    newest, seen = stamp, set()
+                if stamp == newest:
+                    seen.add(key)
+        self._watermark, self._watermark_seen = newest, seen
+
+    def status(self) -> dict:
+        return {
+            "mode": self.mode,
+            "events_applied": self.events_applied,
+            "last_event_at": self.last_event_at,
+            "watermark": self._watermark.isoformat() if self._watermark else None,
+            "last_full_sync": self.last_full_sync,
+            "last_snapshot": self.last_snapshot,
+            "rebuilding": self.graph.rebuilding,
+            "graph_version": self.graph.version,
+        }
+
+graph_sync = GraphSyncService(graph_service)
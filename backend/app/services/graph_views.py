@@ -0,0 +1,115 @@
+import heapq
+from typing import Dict, List, Optional, Tuple
+from .skill_search import SkillSearchIndex
+
+
+class GraphViews:
+    """
+    Analytics aggregates kept current by the graph store on every mutation.
+
+    Learner counts per skill, skills per category, per-mentor proficiency totals
+    and the edge count are adjusted in O(1) per write. Ranked reads go through
+    a heap (O(n log k)) and are memoized until the next write, so repeated
+    /skills/trending and /leaderboard calls on an unchanged graph are O(k).
+    Skill names are also kept in a search index for /skills/search and fuzzy
+    skill resolution.
+    """
+
+    def __init__(self):
+        self.skills: Dict[str, Tuple[str, str]] = {}           # skill_id -> (name, category)
+        self.categories: Dict[str, Dict[str, str]] = {}       # category -> {skill_id: name}
+        self.learners: Dict[str, int] = {}                    # skill_id -> learner count
+        self.mentors: Dict[str, Tuple[int, int]] = {}         # user_id -> (total proficiency, skills taught)
+        self.edges = 0
+        self.search = SkillSearchIndex()
+        self._memo: dict = {}
+
+    # ============== NODE EVENTS ==============
+
+    def skill_set(self, skill_id: str, name: str, category: str):
+        previous = self.skills.get(skill_id)
+        if previous is not None and previous[1] != category:
+            self._drop_from_category(skill_id, previous[1])
+        self.skills[skill_id] = (name, category)
+        self.categories.setdefault(category, {})[skill_id] = name
+        self.learners.setdefault(skill_id, 0)
+        self.search.add(skill_id, name)
+        self._memo.clear()
+
+    def skill_removed(self, skill_id: str):
+        previous = self.skills.pop(skill_id, None)
+        if previous is not None:
+            self._drop_from_category(skill_id, previous[1])
+        self.learners.pop(skill_id, None)
+        self.search.remove(skill_id)
+        self._memo.clear()
+
+    def _drop_from_category(self, skill_id: str, category: str):
+        members = self.categories.get(category, {})
+        members.pop(skill_id, None)
+        if not members:
+            self.categories.pop(category, None)
+
+    # ============== EDGE EVENTS ==============
+    # teach_level is the proficiency of a CAN_TEACH edge, None for WANTS_TO_LEARN
+
+    def edge_added(self, user_id: str, skill_id: str, teach_level: Optional[int]):
+        self.edges += 1
+        if teach_level is None:
+            self.learners[skill_id] = self.learners.get(skill_id, 0) + 1
+        else:
+            total, count = self.mentors.get(user_id, (0, 0))
+            self.mentors[user_id] = (total + teach_level, count + 1)
+        self._memo.clear()
+
+    def edge_removed(self, user_id: str, skill_id: str, teach_level: Optional[int]):
+        self.edges -= 1
+        if teach_level is None:
+            if skill_id in self.learners:
+                self.learners[skill_id] -= 1
+        else:
+            total, count = self.mentors.pop(user_id, (0, 0))
+            if count > 1:
+                self.mentors[user_id] = (total - teach_level, count - 1)
+        self._memo.clear()
+
+    def load_edges(self, learners: Dict[str, int], mentors: Dict[str, Tuple[int, int]], edges: int):
+        """Install edge aggregates computed in bulk by a loader"""
+        for skill_id in self.learners:
+            self.learners[skill_id] = 0
+        self.learners.update(learners)
+        self.mentors = mentors
+        self.edges = edges
+        self._memo.clear()
+
+    # ============== READS ==============
+
+    def top_skills(self, limit: int) -> List[Tuple[str, int]]:
+        """(skill_id, learners) for the most-learned skills; ties go to the lower name"""
+        key = ("skills", limit)
+        if key not in self._memo:
+            skills = self.skills
+            self._memo[key] = heapq.nsmallest(
+                limit, self.learners.items(),
+                key=lambda item: (-item[1], skills.get(item[0], ("Unknown",))[0], item[0])
+            )
+        return self._memo[key]
+
+    def top_mentors(self, limit: int) -> List[Tuple[str, int, int]]:
+        """(user_id, total proficiency, skills taught) ranked by total * skills; ties by user id"""
+        key = ("mentors", limit)
+        if key not in self._memo:
+            best = heapq.nsmallest(
+                limit, self.mentors.items(),
+                key=lambda item: (-item[1][0] * item[1][1], item[0])
+            )
+            self._memo[key] = [(user_id, total, count) for user_id, (total, count) in best]
+        return self._memo[key]
+
+    def category_names(self) -> Dict[str, List[str]]:
+        """Skill names grouped by category (shared; do not mutate)"""
+        if "categories" not in self._memo:
+            self._memo["categories"] = {
+                category: list(members.values()) for category, members in self.categories.items()
+            }
+        return self._memo["categories"]
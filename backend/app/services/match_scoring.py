@@ -0,0 +1,87 @@
+import numpy as np
+from typing import NamedTuple
+
+
+class CandidateBatch(NamedTuple):
+    """Column view of every mentor candidate for one (seeker, skill) query"""
+    users: np.ndarray          # store-specific handles (ids or interned ints)
+    proficiency: np.ndarray    # mentor proficiency on the skill
+    year: np.ndarray           # mentor year
+    same_branch: np.ndarray    # bool, mentor branch == seeker branch
+    mutual: np.ndarray         # bool, seeker can teach something the mentor wants to learn
+    seeker_year: int
+
+    def without(self, handles: np.ndarray) -> "CandidateBatch":
+        """The batch minus the given user handles (e.g. mentors booked at the requested time)"""
+        if not len(handles) or not len(self.users):
+            return self
+        keep = ~np.isin(self.users, handles)
+        return self._replace(users=self.users[keep], proficiency=self.proficiency[keep], year=self.year[keep],
+                             same_branch=self.same_branch[keep], mutual=self.mutual[keep])
+
+    @classmethod
+    def empty(cls, seeker_year: int = 1) -> "CandidateBatch":
+        return cls(
+            users=np.zeros(0, dtype=np.int32),
+            proficiency=np.zeros(0, dtype=np.int16),
+            year=np.zeros(0, dtype=np.int16),
+            same_branch=np.zeros(0, dtype=bool),
+            mutual=np.zeros(0, dtype=bool),
+            seeker_year=seeker_year,
+        )
+
+
+class MentorColumns(NamedTuple):
+    """Seeker-independent columns for every mentor of one skill, shared across a batch"""
+    users: np.ndarray          # store-specific handles (ids or interned ints)
+    proficiency: np.ndarray    # mentor proficiency on the skill
+    year: np.ndarray           # mentor year
+    branch: np.ndarray         # store-specific branch keys (names or interned ints)
+
+
+class EdgeColumns(NamedTuple):
+    """The whole graph as columns, for jobs that score every learner at once; users and skills are dense indexes"""
+    user_ids: list
+    user_names: list
+    year: np.ndarray           # per user
+    branch: np.ndarray         # per user, interned branch codes
+    skill_ids: list
+    skill_names: list
+    teach_user: np.ndarray     # one entry per CAN_TEACH edge
+    teach_skill: np.ndarray
+    teach_prof: np.ndarray
+    learn_user: np.ndarray     # one entry per WANTS_TO_LEARN edge
+    learn_skill: np.ndarray
+
+
+def score_candidates(batch: CandidateBatch) -> np.ndarray:
+    """Vectorized GraphService.calculate_match_score over a whole batch"""
+    # Factor 1: Mentor's proficiency (0-25 points)
+    scores = batch.proficiency.astype(np.float64) * 5
+    # Factor 2: Year difference bonus (seniors teaching = good)
+    scores += np.maximum(batch.year.astype(np.int16) - batch.seeker_year, 0) * 10
+    # Factor 3: Same branch bonus
+    scores += batch.same_branch * 15
+    # Factor 4: Mutual exchange opportunity
+    scores += batch.mutual * 25
+    return np.minimum(scores, 100.0)
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k best scores, best first.
+
+    Uses a partial selection instead of a full sort; equal scores keep candidate
+    order, exactly like a stable descending sort truncated to k.
+    """
+    n = len(scores)
+    if k <= 0 or n == 0:
+        return np.zeros(0, dtype=np.int64)
+    if k < n:
+        kth = scores[np.argpartition(-scores, k - 1)[k - 1]]
+        above = np.flatnonzero(scores > kth)
+        ties = np.flatnonzero(scores == kth)[:k - len(above)]
+        chosen = np.concatenate([above, ties])
+    else:
+        chosen = np.arange(n)
+    return chosen[np.lexsort((chosen, -scores[chosen]))]
@@ -1,12 +1,30 @@
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional, Tuple
 from ..models import Session
-from ..core.database import db
+from ..core.database import db, insert_stamped, stamped
+from ..core.cache import ResponseCache
+from ..core.config import settings
+from ..core.pagination import DEFAULT_PAGE_SIZE, Keyset, encode_models
+from .availability import FREE_STATUSES, AvailabilityIndex, SlotConflict
+import asyncio
 import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+SESSION_PAGES = Keyset(("id",))
 
 class SessionService:
     def __init__(self):
         # Fallback in-memory storage
         self.sessions: List[Session] = []
+        # Encoded /sessions pages, read through from MongoDB and dropped on every write
+        self.cache = ResponseCache(maxsize=settings.READ_CACHE_SIZE, ttl=settings.READ_CACHE_TTL)
+        # Booked slots per mentor, kept current by create/update_status/delete
+        self.schedule = AvailabilityIndex()
+        self._schedule_source: Optional[object] = None
+        self._schedule_built: Optional[float] = None
+        # Serializes book() so two requests cannot both pass the conflict check
+        self._booking_lock = asyncio.Lock()
 
     @property
     def collection(self):
@@ -14,13 +32,33 @@ class SessionService:
             return db.db["sessions"]
         return None
 
+    async def get_page(self, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None) -> Tuple[List[Session], Optional[str]]:
+        """One page of sessions ordered by id, plus the cursor for the next page (None on the last)"""
+        if self.collection is not None:
+            return await SESSION_PAGES.find(self.collection, {}, Session, limit, cursor)
+        return SESSION_PAGES.slice(self.sessions, limit, cursor)
+
+    async def get_page_json(self, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None) -> Tuple[bytes, Optional[str]]:
+        """get_page already encoded as a JSON array; served from the cache when MongoDB backs the service"""
+        async def load():
+            items, next_cursor = await self.get_page(limit, cursor)
+            return encode_models(items), next_cursor
+
+        if self.collection is None:
+            return await load()
+        return await self.cache.get_or_load(("page", limit, cursor), load)
+
+    async def stream(self) -> AsyncIterator[List[Session]]:
+        """All sessions in id order, in batches (exports)"""
+        if self.collection is not None:
+            async for batch in SESSION_PAGES.stream(self.collection, {}, Session):
+                yield batch
+        elif self.sessions:
+            yield SESSION_PAGES.slice(self.sessions, len(self.sessions))[0]
+
     async def get_all(self) -> List[Session]:
         """Get all sessions"""
-        if self.collection:
-            cursor = self.collection.find({})
-            docs = await cursor.to_list(length=1000)
-            return [Session(**{k: v for k, v in d.items() if k != "_id"}) for d in docs]
-        return self.sessions
+        return [session async for batch in self.stream() for session in batch]
 
     async def get_by_id(self, session_id: str) -> Optional[Session]:
         """Get session by ID"""
@@ -40,35 +78,108 @@ class SessionService:
         """Create a session"""
         if self.collection:
             # Upsert not typical for create, ensuring unique id in app logic if needed
-            await self.collection.insert_one(session.model_dump())
+            await insert_stamped(self.collection, session.model_dump())
+            self.cache.invalidate()
+            self.schedule.add(session)
             return session
 
         self.sessions.append(session)
+        self.schedule.add(session)
         return session
 
+    async def book(self, session: Session) -> Session:
+        """
+        create() after checking the mentor is free for the session's slot.
+
+        Raises SlotConflict if an existing session overlaps it. The interval
+        index answers for this instance; with MongoDB an indexed range query
+        also catches bookings made through other instances.
+        """
+        async with self._booking_lock:
+            if session.mentor_id and session.starts_at is not None and session.ends_at is not None:
+                schedule = await self.availability()
+                conflict = schedule.conflict(session.mentor_id, session.starts_at, session.ends_at)
+                if conflict is None and self.collection is not None:
+                    doc = await self.collection.find_one(
+                        self.overlap_filter(session.mentor_id, session.starts_at, session.ends_at), {"id": 1}
+                    )
+                    conflict = doc["id"] if doc else None
+                if conflict is not None:
+                    raise SlotConflict(conflict)
+            return await self.create(session)
+
+    @staticmethod
+    def overlap_filter(mentor_id: str, starts_at, ends_at) -> dict:
+        """MongoDB filter for the mentor's live sessions overlapping [starts_at, ends_at)"""
+        return {
+            "mentor_id": mentor_id,
+            "starts_at": {"$lt": ends_at},
+            "ends_at": {"$gt": starts_at},
+            "status": {"$nin": sorted(FREE_STATUSES)},
+        }
+
+    async def availability(self) -> AvailabilityIndex:
+        """
+        The slot index, built from the store on first use. With MongoDB it is
+        also rebuilt every SESSION_INDEX_REFRESH seconds to pick up sessions
+        booked through other instances; in memory, whenever the list is replaced.
+        """
+        if self.collection is not None:
+            source = "mongodb"
+            stale = self._schedule_built is not None and settings.SESSION_INDEX_REFRESH > 0 and \
+                time.monotonic() - self._schedule_built >= settings.SESSION_INDEX_REFRESH
+        else:
+            source, stale = self.sessions, False
+
+        if stale or self._schedule_source is not source:
+            schedule = AvailabilityIndex()
+            async for batch in self.stream():
+                for session in batch:
+                    schedule.add(session)
+            self.schedule, self._schedule_source, self._schedule_built = schedule, source, time.monotonic()
+            logger.info(f"Session slot index built: {len(schedule)} booked slots")
+        return self.schedule
+
     async def update_status(self, session_id: str, status: str) -> bool:
         """Update session status. Returns True if updated."""
         if self.collection:
             result = await self.collection.update_one(
                 {"id": session_id},
-                {"$set": {"status": status}}
+                stamped({"$set": {"status": status}})
             )
+            if result.modified_count:
+                self.cache.invalidate()
+                await self._reschedule(session_id, status)
             return result.modified_count > 0
 
         session = await self.get_by_id(session_id)
         if session:
             session.status = status
+            self.schedule.add(session)
             return True
         return False
 
+    async def _reschedule(self, session_id: str, status: str):
+        """Free a cancelled session's slot, or re-book one that was un-cancelled"""
+        if status in FREE_STATUSES:
+            self.schedule.remove(session_id)
+        elif session_id not in self.schedule:
+            session = await self.get_by_id(session_id)
+            if session:
+                self.schedule.add(session)
+
     async def delete(self, session_id: str) -> bool:
         """Delete a session"""
         if self.collection:
             result = await self.collection.delete_one({"id": session_id})
+            if result.deleted_count:
+                self.cache.invalidate()
+                self.schedule.remove(session_id)
             return result.deleted_count > 0
 
         for i, session in enumerate(self.sessions):
             if session.id == session_id:
                 self.sessions.pop(i)
+                self.schedule.remove(session_id)
                 return True
         return False
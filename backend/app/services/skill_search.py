@@ -0,0 +1,206 @@
+import heapq
+import math
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+_NON_WORD = re.compile(r"[^0-9a-z+#]+")
+
+# Minimum Dice trigram similarity for a fuzzy hit: suggestions vs. auto-resolving a query
+SUGGEST_SIMILARITY = 0.3
+RESOLVE_SIMILARITY = 0.4
+
+EXACT, PREFIX, FUZZY = "exact", "prefix", "fuzzy"
+
+
+def normalize(name: str) -> str:
+    """Lower-case, punctuation/hyphens to single spaces ("Machine-Learning" -> "machine learning")"""
+    return " ".join(_NON_WORD.split(name.lower())).strip()
+
+
+def trigrams(text: str) -> Set[str]:
+    """Character trigrams of each word, padded like pg_trgm ("  p", " py", ..., "on ")"""
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def search_keys(text: str) -> Set[str]:
+    """Strings a name can be found by prefix: the full name, each word, and its acronym ("ml")"""
+    words = text.split()
+    keys = {text, *words}
+    if len(words) > 1:
+        keys.add("".join(word[0] for word in words))
+    keys.discard("")
+    return keys
+
+
+class _TrieNode:
+    __slots__ = ("children", "ids")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.ids: Set[str] = set()   # skills with a key passing through (or ending at) this node
+
+
+class SkillSearchIndex:
+    """
+    Skill name lookup for autocomplete and fuzzy resolution, kept current per skill write.
+
+    A prefix trie over each skill's search keys (full name, words, acronym)
+    answers autocomplete in O(len(query)) plus the size of the answer, and a
+    character-trigram inverted index scores misspellings by Dice similarity
+    over only the skills that share a trigram with the query.
+    """
+
+    def __init__(self):
+        self.names: Dict[str, Tuple[str, str]] = {}          # skill_id -> (name, normalized)
+        self.by_name: Dict[str, Set[str]] = {}               # normalized name -> skill ids
+        self.by_key: Dict[str, Set[str]] = {}                # exact search key -> skill ids
+        self.grams: Dict[str, Set[str]] = {}                 # trigram -> skill ids
+        self.skill_grams: Dict[str, frozenset] = {}          # skill_id -> its trigrams
+        self._root = _TrieNode()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    # ============== WRITES ==============
+
+    def add(self, skill_id: str, name: str):
+        previous = self.names.get(skill_id)
+        if previous is not None:
+            if previous[0] == name:
+                return
+            self.remove(skill_id)
+
+        text = normalize(name)
+        self.names[skill_id] = (name, text)
+        self.by_name.setdefault(text, set()).add(skill_id)
+        for key in search_keys(text):
+            self.by_key.setdefault(key, set()).add(skill_id)
+            node = self._root
+            for char in key:
+                node = node.children.setdefault(char, _TrieNode())
+                node.ids.add(skill_id)
+        grams = frozenset(trigrams(text))
+        self.skill_grams[skill_id] = grams
+        for gram in grams:
+            self.grams.setdefault(gram, set()).add(skill_id)
+
+    def remove(self, skill_id: str):
+        previous = self.names.pop(skill_id, None)
+        if previous is None:
+            return
+        text = previous[1]
+        _discard(self.by_name, text, skill_id)
+        for key in search_keys(text):
+            _discard(self.by_key, key, skill_id)
+            self._trie_remove(key, skill_id)
+        for gram in self.skill_grams.pop(skill_id, ()):
+            _discard(self.grams, gram, skill_id)
+
+    def _trie_remove(self, key: str, skill_id: str):
+        path = [self._root]
+        for char in key:
+            node = path[-1].children.get(char)
+            if node is None:
+                break
+            node.ids.discard(skill_id)
+            path.append(node)
+        # Prune nodes no key passes through any more
+        for depth in range(len(path) - 1, 0, -1):
+            if path[depth].ids:
+                break
+            del path[depth - 1].children[key[depth - 1]]
+
+    # ============== READS ==============
+
+    def prefix(self, query: str) -> Set[str]:
+        """Skills with a search key starting with the (normalized) query"""
+        node = self._root
+        for char in query:
+            node = node.children.get(char)
+            if node is None:
+                return set()
+        return node.ids
+
+    def similar(self, query: str, threshold: float = SUGGEST_SIMILARITY) -> Dict[str, float]:
+        """
+        skill_id -> Dice trigram similarity, for skills at or above threshold.
+
+        A match needs at least ceil(threshold * (|q| + 1) / 2) of the query's
+        trigrams, so it must contain one of the rarest |q| - that + 1 of them;
+        only skills in those posting lists are scored (prefix filtering).
+        """
+        grams = trigrams(query)
+        if not grams:
+            return {}
+        needed = max(math.ceil(threshold * (len(grams) + 1) / 2), 1)
+        rarest = sorted(grams, key=lambda gram: len(self.grams.get(gram, ())))[:len(grams) - needed + 1]
+        candidates = set()
+        for gram in rarest:
+            candidates.update(self.grams.get(gram, ()))
+
+        scored = {}
+        for skill_id in candidates:
+            skill_grams = self.skill_grams[skill_id]
+            score = 2 * len(grams & skill_grams) / (len(grams) + len(skill_grams))
+            if score >= threshold:
+                scored[skill_id] = score
+        return scored
+
+    def search(self, query: str, limit: int = 10, popularity: Optional[Dict[str, int]] = None) -> List[Tuple[str, str, float]]:
+        """
+        (skill_id, kind, score) ranked exact > prefix > fuzzy, then by score and
+        popularity (e.g. learner counts), then name.
+        """
+        text = normalize(query)
+        if not text:
+            return []
+        popularity = popularity or {}
+        hits: Dict[str, Tuple[int, str, float]] = {}
+
+        # Whole-name matches first, then a word or acronym matching exactly
+        for skill_id in self.by_key.get(text, ()):
+            hits[skill_id] = (0, EXACT, 0.9)
+        for skill_id in self.by_name.get(text, ()):
+            hits[skill_id] = (0, EXACT, 1.0)
+        for skill_id in self.prefix(text):
+            if skill_id not in hits:
+                hits[skill_id] = (1, PREFIX, len(text) / max(len(self.names[skill_id][1]), 1))
+        if len(hits) < limit:
+            for skill_id, score in self.similar(text).items():
+                if skill_id not in hits:
+                    hits[skill_id] = (2, FUZZY, score)
+
+        ranked = heapq.nsmallest(
+            limit, hits.items(),
+            key=lambda item: (item[1][0], -item[1][2], -popularity.get(item[0], 0), self.names[item[0]][1], item[0])
+        )
+        return [(skill_id, kind, round(score, 3)) for skill_id, (_, kind, score) in ranked]
+
+    def resolve(self, query: str, popularity: Optional[Dict[str, int]] = None) -> Optional[str]:
+        """Best single skill for a free-form name ("ML", "machine-learning", "Pyhton"), or None"""
+        text = normalize(query)
+        if not text:
+            return None
+        popularity = popularity or {}
+        rank = lambda ids: min(ids, key=lambda sid: (-popularity.get(sid, 0), self.names[sid][1], sid))
+
+        exact = self.by_name.get(text) or self.by_key.get(text)
+        if exact:
+            return rank(exact)
+        scored = self.similar(text, RESOLVE_SIMILARITY)
+        if not scored:
+            return None
+        best = max(scored.values())
+        return rank([skill_id for skill_id, score in scored.items() if score == best])
+
+
+def _discard(index: Dict[str, Set[str]], key: str, skill_id: str):
+    ids = index.get(key)
+    if ids is not None:
+        ids.discard(skill_id)
+        if not ids:
+            del index[key]
@@ -0,0 +1,121 @@
+import numpy as np
+from typing import Dict, List, NamedTuple, Tuple
+
+# Ordered skill pairs expanded at once while forming A^T A; bounds peak memory
+PAIR_CHUNK = 4_000_000
+
+
+def cooccurrence(users: np.ndarray, skills: np.ndarray, n_skills: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Sparse C = A^T A for the user x skill incidence matrix A (one entry per edge).
+
+    Returns the off-diagonal entries as COO (row skill, column skill, users
+    holding both) sorted by (row, column), plus the diagonal (users per skill).
+    Each user row of A contributes the outer product of its skills, so the
+    product is formed by expanding every user's skill pairs in chunks and
+    summing duplicates, without materializing anything dense.
+    """
+    degree = np.bincount(skills, minlength=n_skills).astype(np.int64)
+    empty = np.zeros(0, dtype=np.int64)
+    if len(users) == 0:
+        return empty.astype(np.int32), empty.astype(np.int32), empty, degree
+
+    order = np.argsort(users, kind="stable")
+    skills = skills[order].astype(np.int32)
+    _, starts, sizes = np.unique(users[order], return_index=True, return_counts=True)
+    row_size = np.repeat(sizes, sizes)        # per edge: skills its user holds
+    row_start = np.repeat(starts, sizes)      # per edge: where its user's skills begin
+    total = np.cumsum(row_size)
+
+    keys, counts = [], []
+    lo, n = 0, len(skills)
+    while lo < n:
+        hi = max(int(np.searchsorted(total, total[lo] - row_size[lo] + PAIR_CHUNK, side="right")), lo + 1)
+        k = row_size[lo:hi]
+        offsets = np.cumsum(k) - k
+        left = np.repeat(skills[lo:hi], k)
+        right = skills[np.repeat(row_start[lo:hi] - offsets, k) + np.arange(int(k.sum()))]
+        off_diagonal = left != right
+        chunk_keys, chunk_counts = np.unique(
+            left[off_diagonal].astype(np.int64) * n_skills + right[off_diagonal], return_counts=True
+        )
+        keys.append(chunk_keys)
+        counts.append(chunk_counts)
+        lo = hi
+
+    merged, inverse = np.unique(np.concatenate(keys), return_inverse=True)
+    shared = np.bincount(inverse, weights=np.concatenate(counts)).astype(np.int64)
+    return (merged // n_skills).astype(np.int32), (merged % n_skills).astype(np.int32), shared, degree
+
+
+class RelatedTable(NamedTuple):
+    """Best related skills per skill index, as CSR rows ordered best first"""
+    indptr: np.ndarray       # int64, n_skills + 1
+    neighbors: np.ndarray    # int32 skill indexes
+    scores: np.ndarray       # float32 cosine similarity of the two skills' user sets
+    shared: np.ndarray       # int32 users holding both skills
+
+
+def related_table(users: np.ndarray, skills: np.ndarray, n_skills: int, top_n: int) -> RelatedTable:
+    """
+    Cosine-normalized co-occurrence, pruned to each skill's top_n neighbours.
+
+    score(a, b) = |users(a) & users(b)| / sqrt(|users(a)| * |users(b)|); ties go
+    to more shared users, then the lower skill index. Pure NumPy on plain
+    arrays so it can run in a rebuild worker process.
+    """
+    rows, cols, shared, degree = cooccurrence(users, skills, n_skills)
+    scores = shared / np.sqrt(degree[rows] * degree[cols]) if len(rows) else np.zeros(0)
+
+    order = np.lexsort((cols, -shared, -scores, rows))
+    rows, cols, shared, scores = rows[order], cols[order], shared[order], scores[order]
+    first = np.searchsorted(rows, rows, side="left")
+    keep = np.arange(len(rows)) - first < top_n
+    rows = rows[keep]
+
+    indptr = np.zeros(n_skills + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n_skills), out=indptr[1:])
+    return RelatedTable(
+        indptr=indptr,
+        neighbors=cols[keep].astype(np.int32),
+        scores=scores[keep].astype(np.float32),
+        shared=shared[keep].astype(np.int32),
+    )
+
+
+class SkillSimilarity:
+    """
+    "Users who have X also have Y" for one graph version.
+
+    Built from every user -> skill edge, teaching and learning alike, and
+    immutable once built: a newer graph version gets a new instance.
+    """
+
+    def __init__(self, version: int, skill_ids: List[str], table: RelatedTable, duration: float = 0.0):
+        self.version = version
+        self.skill_ids = skill_ids
+        self.index: Dict[str, int] = {skill_id: s for s, skill_id in enumerate(skill_ids)}
+        self.table = table
+        self.duration = duration
+
+    def related(self, skill_id: str, limit: int) -> List[Tuple[str, float, int]]:
+        """(skill_id, score, shared users) for the skill's closest neighbours, best first"""
+        s = self.index.get(skill_id)
+        if s is None:
+            return []
+        lo = int(self.table.indptr[s])
+        hi = min(int(self.table.indptr[s + 1]), lo + max(limit, 0))
+        return [
+            (self.skill_ids[t], round(float(score), 4), int(shared))
+            for t, score, shared in zip(self.table.neighbors[lo:hi].tolist(),
+                                        self.table.scores[lo:hi].tolist(),
+                                        self.table.shared[lo:hi].tolist())
+        ]
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "skills": len(self.skill_ids),
+            "pairs": len(self.table.neighbors),
+            "duration_s": round(self.duration, 3),
+        }
@@ -0,0 +1,158 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from ..core.cache import TTLCache
+
+# Relation ids are namespaced by their source document so every writer agrees on them
+def session_relation(session_id: str) -> str:
+    return f"session:{session_id}"
+
+def connection_relation(request_id: str) -> str:
+    return f"connection:{request_id}"
+
+def session_link(doc: dict) -> Tuple[str, Optional[Tuple[str, str]]]:
+    """(relation id, (learner, mentor)) for a sessions document; no pair unless it links two users"""
+    pair = None
+    if doc.get("learner_id") and doc.get("mentor_id") and doc.get("status") != "Cancelled":
+        pair = (str(doc["learner_id"]), str(doc["mentor_id"]))
+    return session_relation(doc["id"]), pair
+
+def connection_link(doc: dict) -> Tuple[str, Optional[Tuple[str, str]]]:
+    """(relation id, (from, to)) for a connection_requests document; no pair unless accepted"""
+    pair = None
+    if doc.get("status") == "accepted":
+        pair = (str(doc["from_user_id"]), str(doc["to_user_id"]))
+    return connection_relation(doc["id"]), pair
+
+# Collection -> link function, for loaders and the incremental sync
+RELATION_SOURCES = {"sessions": session_link, "connection_requests": connection_link}
+RELATION_PROJECTIONS = {
+    "sessions": {"id": 1, "learner_id": 1, "mentor_id": 1, "status": 1},
+    "connection_requests": {"id": 1, "from_user_id": 1, "to_user_id": 1, "status": 1},
+}
+
+
+class SocialGraph:
+    """
+    Undirected user <-> user layer (HAD_SESSION / accepted connections).
+
+    Each relation is keyed by the document it came from, so applying the same
+    session or connection twice (API handler and change stream) is a no-op.
+    Degrees are found with a bounded bidirectional search: a radius-2 ball around
+    the seeker (cached per user until the layer changes) meets each target's direct
+    neighbors, which covers every path of up to MAX_DEGREE hops.
+    """
+    MAX_DEGREE = 3
+    # Reported when no path exists within MAX_DEGREE hops; ranks after every real degree
+    OUT_OF_NETWORK = MAX_DEGREE + 1
+
+    def __init__(self, cache_size: int = 1024):
+        self.relations: Dict[str, Tuple[str, str]] = {}   # relation id -> (user a, user b)
+        self.adj: Dict[str, Dict[str, int]] = {}          # user -> {neighbor: relation count}
+        self.version = 0
+        self._balls = TTLCache(maxsize=cache_size, ttl=float("inf"))
+
+    def __len__(self):
+        return len(self.relations)
+
+    # ============== MUTATIONS ==============
+
+    def set_relation(self, relation_id: str, user_a: str, user_b: str) -> bool:
+        """Add (or move) a relation. Returns False if nothing changed."""
+        if user_a == user_b:
+            return self.remove_relation(relation_id)
+        pair = (user_a, user_b)
+        previous = self.relations.get(relation_id)
+        if previous == pair:
+            return False
+        if previous is not None:
+            self._unlink(*previous)
+        self.relations[relation_id] = pair
+        for a, b in (pair, pair[::-1]):
+            neighbors = self.adj.setdefault(a, {})
+            neighbors[b] = neighbors.get(b, 0) + 1
+        self.version += 1
+        return True
+
+    def remove_relation(self, relation_id: str) -> bool:
+        pair = self.relations.pop(relation_id, None)
+        if pair is None:
+            return False
+        self._unlink(*pair)
+        self.version += 1
+        return True
+
+    def _unlink(self, user_a: str, user_b: str):
+        for a, b in ((user_a, user_b), (user_b, user_a)):
+            neighbors = self.adj[a]
+            neighbors[b] -= 1
+            if not neighbors[b]:
+                del neighbors[b]
+            if not neighbors:
+                del self.adj[a]
+
+    def load(self, relations: Iterable[Tuple[str, str, str]]):
+        """Bulk-populate from (relation id, user a, user b) records"""
+        for relation_id, user_a, user_b in relations:
+            self.set_relation(relation_id, user_a, user_b)
+
+    # ============== SEARCH ==============
+
+    def neighbors(self, user_id: str) -> List[str]:
+        return list(self.adj.get(user_id, {}))
+
+    def _ball(self, user_id: str) -> Tuple[Dict[str, int], Dict[str, Optional[str]]]:
+        """Hop counts and BFS parents for everyone within MAX_DEGREE - 1 hops"""
+        cached = self._balls.get(user_id, self.version)
+        if cached is not None:
+            return cached
+
+        dist = {user_id: 0}
+        parent: Dict[str, Optional[str]] = {user_id: None}
+        frontier = [user_id]
+        for hops in range(1, self.MAX_DEGREE):
+            next_frontier = []
+            for node in frontier:
+                for neighbor in self.adj.get(node, {}):
+                    if neighbor not in dist:
+                        dist[neighbor] = hops
+                        parent[neighbor] = node
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+
+        ball = (dist, parent)
+        self._balls.set(user_id, ball, self.version)
+        return ball
+
+    def degrees(self, seeker_id: str, targets: Iterable[str]) -> Dict[str, List[str]]:
+        """
+        Shortest path (seeker first, target last) to each target within MAX_DEGREE hops.
+
+        One cached ball around the seeker serves every target, so ranking many mentors
+        costs one small BFS plus a neighbor scan per target. Unreachable targets are left out.
+        """
+        dist, parent = self._ball(seeker_id)
+
+        def path_to(node: str) -> List[str]:
+            path = []
+            while node is not None:
+                path.append(node)
+                node = parent[node]
+            return path[::-1]
+
+        found = {}
+        for target in targets:
+            if target == seeker_id:
+                continue
+            if target in dist:
+                found[target] = path_to(target)
+                continue
+            # Meet in the middle: a neighbor of the target on the ball's rim
+            via = min(
+                ((dist[n], n) for n in self.adj.get(target, {}) if n in dist),
+                default=None,
+            )
+            if via is not None:
+                found[target] = path_to(via[1]) + [target]
+        return found
+
+    def cache_stats(self) -> Dict[str, float]:
+        return self._balls.stats()
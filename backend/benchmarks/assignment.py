@@ -0,0 +1,100 @@
+"""
+Runtime and quality of the global mentor assignment (/match/assignments) as the cohort grows.
+
+    cd backend && python -m benchmarks.assignment --users 5000,20000,50000
+
+For each size it also reports what independent top-1 matching (every learner
+taking their own best mentor, as /match/find ranks them) does to mentor load.
+"""
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+import numpy as np
+from app.services.assignment import auction, candidate_arcs
+from app.services.graph_service import GraphService
+from .synthetic import generate_campus
+
+
+def run_size(n_users: int, n_skills: int, skills_per_user: int, capacity: int, candidates: int,
+             epsilon: float, seed: int = 42) -> dict:
+    users, skills = generate_campus(n_users, n_skills, skills_per_user, seed=seed)
+    service = GraphService(backend="compact")
+    service.build_graph(users, skills)
+    del users, skills
+    gc.collect()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    columns = service.store.edge_columns()
+    captured = time.perf_counter()
+    arcs = candidate_arcs(columns, candidates)
+    pruned = time.perf_counter()
+    result = auction(arcs, len(columns.user_ids), capacity, epsilon)
+    solved = time.perf_counter()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Independent top-1: each learning edge takes the first (best) candidate, capacity ignored
+    has_arcs = np.diff(arcs.indptr) > 0
+    greedy = np.bincount(arcs.mentors[arcs.indptr[:-1][has_arcs]], minlength=len(columns.user_ids))
+    placed = result.mentor >= 0
+    total = float(result.score.sum())
+    return {
+        "users": n_users,
+        "learners": int(len(np.unique(columns.learn_user))),
+        "learning_edges": int(len(columns.learn_user)),
+        "candidate_arcs": int(len(arcs.mentors)),
+        "capture_s": round(captured - start, 3),
+        "prune_s": round(pruned - captured, 3),
+        "auction_s": round(solved - pruned, 3),
+        "total_s": round(solved - start, 3),
+        "peak_mb": round(peak / 2**20, 1),
+        "rounds": result.rounds,
+        "assigned": int(placed.sum()),
+        "coverage": round(float(placed.mean()), 4) if len(placed) else 0.0,
+        "total_score": round(total, 1),
+        "upper_bound": round(result.upper_bound, 1),
+        "gap_pct": round((result.upper_bound - total) / result.upper_bound * 100, 3) if result.upper_bound else 0.0,
+        "max_mentor_load": int(np.bincount(result.mentor[placed]).max(initial=0)),
+        "top1_max_mentor_load": int(greedy.max(initial=0)),
+        "top1_over_capacity": round(float(np.maximum(greedy - capacity, 0).sum() / max(has_arcs.sum(), 1)), 4),
+    }
+
+
+def run(sizes, n_skills: int = 300, skills_per_user: int = 6, capacity: int = 3, candidates: int = 16,
+        epsilon: float = 1.0) -> dict:
+    return {
+        "skills": n_skills,
+        "skills_per_user": skills_per_user,
+        "mentor_capacity": capacity,
+        "candidates": candidates,
+        "epsilon": epsilon,
+        "sizes": [run_size(n, n_skills, skills_per_user, capacity, candidates, epsilon) for n in sizes],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", default="5000,20000,50000", help="Comma-separated cohort sizes")
+    parser.add_argument("--skills", type=int, default=300)
+    parser.add_argument("--skills-per-user", type=int, default=6)
+    parser.add_argument("--capacity", type=int, default=3)
+    parser.add_argument("--candidates", type=int, default=16)
+    parser.add_argument("--epsilon", type=float, default=1.0)
+    parser.add_argument("--json", dest="json_path", help="Write results to this file as well")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.users.split(",") if size]
+    report = run(sizes, args.skills, args.skills_per_user, args.capacity, args.candidates, args.epsilon)
+    print(json.dumps(report, indent=2))
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
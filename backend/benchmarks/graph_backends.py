@@ -0,0 +1,88 @@
+"""
+Memory and latency comparison of the networkx and compact graph backends.
+
+    cd backend && python -m benchmarks.graph_backends --users 100000 --skills 500
+"""
+
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+
+from app.services.graph_service import GraphService, GRAPH_BACKENDS
+from .synthetic import generate_campus
+
+
+def _percentiles(samples):
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+    return {"p50_ms": round(pick(0.50), 4), "p95_ms": round(pick(0.95), 4), "p99_ms": round(pick(0.99), 4)}
+
+
+def _time(fn, args_list):
+    samples = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - start)
+    return _percentiles(samples)
+
+
+def run(n_users: int, n_skills: int, skills_per_user: int, queries: int, seed: int = 42) -> dict:
+    users, skills = generate_campus(n_users, n_skills, skills_per_user, seed=seed)
+    rng = random.Random(seed)
+    popular = [skill.name for skill in skills[:10]]
+    match_queries = [(rng.choice(users).id, rng.choice(popular), 5) for _ in range(queries)]
+    user_queries = [(rng.choice(users).id,) for _ in range(queries)]
+
+    results = {}
+    for backend in GRAPH_BACKENDS:
+        service = GraphService(backend=backend)
+        gc.collect()
+        tracemalloc.start()
+        start = time.perf_counter()
+        service.build_graph(users, skills)
+        build_s = time.perf_counter() - start
+        gc.collect()
+        graph_bytes, build_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        results[backend] = {
+            "build_s": round(build_s, 3),
+            "graph_mb": round(graph_bytes / 2**20, 1),
+            "build_peak_mb": round(build_peak / 2**20, 1),
+            "find_matches": _time(service.find_matches, match_queries),
+            "get_user_connections": _time(service.get_user_connections, user_queries),
+            "leaderboard": _time(service.leaderboard, [()] * max(1, queries // 20)),
+            "trending_skills": _time(service.trending_skills, [()] * max(1, queries // 20)),
+        }
+        del service
+    return {
+        "users": n_users,
+        "skills": n_skills,
+        "skills_per_user": skills_per_user,
+        "edges": sum(len(u.skills) for u in users),
+        "backends": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--skills", type=int, default=300)
+    parser.add_argument("--skills-per-user", type=int, default=6)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--json", dest="json_path", help="Write results to this file as well")
+    args = parser.parse_args()
+
+    report = run(args.users, args.skills, args.skills_per_user, args.queries)
+    print(json.dumps(report, indent=2))
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
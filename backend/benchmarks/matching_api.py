@@ -0,0 +1,258 @@
+"""
+Load test and latency benchmark for the matching API.
+
+Builds a synthetic campus through GraphService.build_graph, then measures
+throughput and p50/p95/p99 for find_matches (in process) and for /match/find,
+/leaderboard, /skills/trending and /graph/sync over HTTP (in-process ASGI, so
+numbers exclude the network but include routing, validation and middleware).
+/graph/sync runs against --mongo-uri (a scratch database on a local mongod) or,
+when mongomock_motor is installed, an in-memory stand-in; otherwise it is skipped.
+
+    cd backend && python -m benchmarks.matching_api --users 10000 --json bench.json
+    cd backend && python -m benchmarks.matching_api --compare bench.json --fail-on-regression
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import platform
+import random
+import subprocess
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+import httpx
+
+from app.core import database
+from app.main import app
+from app.services.graph_service import graph_service
+from .synthetic import campus_documents, generate_campus
+
+SCRATCH_DB = "skillsync_bench"
+
+
+def _percentiles(samples: List[float]) -> dict:
+    if not samples:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None}
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+    return {"p50_ms": round(pick(0.50), 4), "p95_ms": round(pick(0.95), 4), "p99_ms": round(pick(0.99), 4)}
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _summary(samples: List[float], wall: float, errors: int = 0) -> dict:
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "throughput_rps": round(len(samples) / wall, 1) if wall > 0 else None,
+        **_percentiles(samples),
+    }
+
+
+def bench_direct(queries: List[tuple]) -> Dict[str, dict]:
+    """find_matches called directly, with and without the match cache"""
+    results = {}
+    for name, clear in (("find_matches_uncached", True), ("find_matches_cached", False)):
+        graph_service.match_cache.clear()
+        if not clear:
+            for query in queries:
+                graph_service.find_matches(*query)
+        samples = []
+        wall = time.perf_counter()
+        for query in queries:
+            if clear:
+                graph_service.match_cache.clear()
+            start = time.perf_counter()
+            graph_service.find_matches(*query)
+            samples.append(time.perf_counter() - start)
+        results[name] = _summary(samples, time.perf_counter() - wall)
+    return results
+
+
+async def _load(client: httpx.AsyncClient, requests: List[tuple], concurrency: int) -> dict:
+    """Fire requests with at most `concurrency` in flight; returns latency/throughput summary"""
+    samples: List[float] = []
+    errors = 0
+    pending = iter(requests)
+
+    async def worker():
+        nonlocal errors
+        for method, url, body in pending:
+            start = time.perf_counter()
+            response = await client.request(method, url, json=body)
+            samples.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    wall = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return _summary(samples, time.perf_counter() - wall, errors)
+
+
+async def bench_http(match_queries: List[tuple], n_requests: int, concurrency: int) -> Dict[str, dict]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        graph_service.match_cache.clear()
+        match = [("POST", "/match/find", {"user_id": u, "skill_name": s, "limit": k})
+                 for u, s, k in match_queries[:n_requests]]
+        results = {"/match/find": await _load(client, match, concurrency)}
+        for path in ("/leaderboard", "/skills/trending"):
+            results[path] = await _load(client, [("GET", path, None)] * n_requests, concurrency)
+        return results
+
+
+def _mongo_database(mongo_uri: Optional[str]):
+    """(database, source) for the sync benchmark, or (None, reason) when nothing is available"""
+    if mongo_uri:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        return AsyncIOMotorClient(mongo_uri)[SCRATCH_DB], "mongod"
+    try:
+        from mongomock_motor import AsyncMongoMockClient
+    except ImportError:
+        return None, "skipped: pass --mongo-uri or install mongomock_motor"
+    return AsyncMongoMockClient()[SCRATCH_DB], "mongomock"
+
+
+async def bench_sync(users, skills, runs: int, mongo_uri: Optional[str]) -> dict:
+    mongo, source = _mongo_database(mongo_uri)
+    if mongo is None:
+        return {"source": source}
+
+    for collection, docs in campus_documents(users, skills).items():
+        await mongo[collection].delete_many({})
+        for start in range(0, len(docs), 10000):
+            await mongo[collection].insert_many(docs[start:start + 10000])
+
+    previous = database.db.db
+    database.db.db = mongo
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            samples, loads = [], []
+            wall = time.perf_counter()
+            for _ in range(runs):
+                start = time.perf_counter()
+                response = await client.post("/graph/sync")
+                samples.append(time.perf_counter() - start)
+                response.raise_for_status()
+                loads.append(response.json()["load"])
+            result = _summary(samples, time.perf_counter() - wall)
+    finally:
+        database.db.db = previous
+        if mongo_uri:
+            await mongo.client.drop_database(SCRATCH_DB)
+
+    result["source"] = source
+    result["rows_per_sec"] = max(load.get("rows_per_sec", 0) for load in loads)
+    return result
+
+
+def run(n_users: int = 10000, n_skills: int = 300, skills_per_user: int = 6, skew: float = 1.1,
+        backend: str = "networkx", queries: int = 500, concurrency: int = 16, sync_runs: int = 3,
+        mongo_uri: Optional[str] = None, seed: int = 42) -> dict:
+    users, skills = generate_campus(n_users, n_skills, skills_per_user, skew=skew, seed=seed)
+    rng = random.Random(seed)
+    popular = [skill.name for skill in skills[:10]]
+    match_queries = [(rng.choice(users).id, rng.choice(popular), 5) for _ in range(queries)]
+
+    graph_service.backend = backend
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    graph_service.build_graph(users, skills)
+    build_s = time.perf_counter() - start
+    gc.collect()
+    graph_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    async def api():
+        return (await bench_http(match_queries, queries, concurrency),
+                await bench_sync(users, skills, sync_runs, mongo_uri))
+
+    http, sync = asyncio.run(api())
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "params": {
+            "users": n_users, "skills": n_skills, "skills_per_user": skills_per_user, "skew": skew,
+            "backend": backend, "queries": queries, "concurrency": concurrency,
+        },
+        "build": {
+            "build_s": round(build_s, 3),
+            "graph_mb": round(graph_bytes / 2**20, 1),
+            "mb_per_10k_users": round(graph_bytes / 2**20 / n_users * 10000, 2),
+            "nodes": graph_service.number_of_nodes(),
+            "edges": graph_service.number_of_edges(),
+        },
+        "direct": bench_direct(match_queries),
+        "http": http,
+        "/graph/sync": sync,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float = 0.2) -> List[str]:
+    """p95 latencies (and graph memory) that got worse than baseline by more than `threshold`"""
+    regressions = []
+
+    def check(name, now, before):
+        if now is not None and before and now > before * (1 + threshold):
+            regressions.append(f"{name}: {before} -> {now} (+{round((now / before - 1) * 100)}%)")
+
+    for section in ("direct", "http"):
+        for name, stats in current.get(section, {}).items():
+            before = baseline.get(section, {}).get(name, {})
+            check(f"{section} {name} p95_ms", stats.get("p95_ms"), before.get("p95_ms"))
+    check("/graph/sync p95_ms", current["/graph/sync"].get("p95_ms"), baseline.get("/graph/sync", {}).get("p95_ms"))
+    check("build mb_per_10k_users", current["build"]["mb_per_10k_users"], baseline.get("build", {}).get("mb_per_10k_users"))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--skills", type=int, default=300)
+    parser.add_argument("--skills-per-user", type=int, default=6)
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent of skill popularity")
+    parser.add_argument("--backend", default="networkx", choices=["networkx", "compact"])
+    parser.add_argument("--queries", type=int, default=500, help="Requests per measured endpoint")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--sync-runs", type=int, default=3)
+    parser.add_argument("--mongo-uri", help=f"Local mongod for /graph/sync (uses scratch db '{SCRATCH_DB}')")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", dest="json_path", help="Write results to this file as well")
+    parser.add_argument("--compare", help="Baseline results JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed p95 slowdown (0.2 = 20%%)")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    report = run(args.users, args.skills, args.skills_per_user, args.skew, args.backend,
+                 args.queries, args.concurrency, args.sync_runs, args.mongo_uri, args.seed)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        report["regressions"] = compare(report, baseline, args.threshold)
+        report["baseline_commit"] = baseline.get("meta", {}).get("commit")
+
+    print(json.dumps(report, indent=2))
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.fail_on_regression and report.get("regressions"):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
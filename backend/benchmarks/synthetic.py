@@ -0,0 +1,76 @@
+"""
+Synthetic campus generator for graph benchmarks and backend parity tests
+"""
+
+import random
+from typing import Dict, List, Tuple
+from app.models import User, Skill, UserSkill
+
+BRANCHES = ["CSE", "ECE", "EEE", "MECH", "CIVIL", "BIO"]
+CATEGORIES = ["Programming", "Frontend", "Backend", "AI/ML", "Data", "Design", "DevOps", "Fundamentals"]
+
+
+def generate_campus(n_users: int = 1000, n_skills: int = 100, skills_per_user: int = 6,
+                    skew: float = 1.1, teach_ratio: float = 0.5, seed: int = 42) -> Tuple[List[User], List[Skill]]:
+    """
+    Random users and skills. Skill popularity follows a Zipf-like law with exponent
+    `skew` so a handful of skills (think Python) collect most of the teachers.
+    """
+    rng = random.Random(seed)
+    skills = [
+        Skill(id=f"k{i}", name=f"Skill {i}", category=CATEGORIES[i % len(CATEGORIES)])
+        for i in range(n_skills)
+    ]
+    weights = [1.0 / (rank + 1) ** skew for rank in range(n_skills)]
+
+    users = []
+    for i in range(n_users):
+        user_id = f"u{i}"
+        picked = set()
+        while len(picked) < min(skills_per_user, n_skills):
+            picked.add(rng.choices(range(n_skills), weights=weights)[0])
+
+        user_skills = []
+        for idx in picked:
+            teaching = rng.random() < teach_ratio
+            user_skills.append(UserSkill(
+                user_id=user_id,
+                skill_id=skills[idx].id,
+                skill_name=skills[idx].name,
+                proficiency=rng.randint(1, 5),
+                is_teaching=teaching,
+                is_learning=not teaching
+            ))
+
+        users.append(User(
+            id=user_id,
+            name=f"Student {i}",
+            email=f"student{i}@srmap.edu.in",
+            year=rng.randint(1, 4),
+            branch=rng.choice(BRANCHES),
+            skills=user_skills
+        ))
+    return users, skills
+
+
+def campus_documents(users: List[User], skills: List[Skill]) -> Dict[str, List[dict]]:
+    """The same campus as MongoDB documents (skills, users, userskills collections)"""
+    userskills = [
+        {
+            "_id": f"us-{us.user_id}-{us.skill_id}",
+            "userId": us.user_id,
+            "skillId": us.skill_id,
+            "proficiency": us.proficiency,
+            "isTeaching": us.is_teaching,
+            "isLearning": us.is_learning,
+        }
+        for user in users for us in user.skills
+    ]
+    return {
+        "skills": [{"_id": s.id, "name": s.name, "category": s.category} for s in skills],
+        "users": [
+            {"_id": u.id, "name": u.name, "email": u.email, "year": u.year, "branch": u.branch}
+            for u in users
+        ],
+        "userskills": userskills,
+    }
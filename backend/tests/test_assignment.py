@@ -0,0 +1,327 @@
+"""
+Global mentor assignment tests
+Candidate pruning against calculate_match_score, the capacity-constrained auction against an exact
+min-cost flow, the background run and the /match/assignments endpoints
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import networkx as nx
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from app.core import database
+from app.main import app, assignment_service
+from app.models import Skill, User, UserSkill
+from app.services import assignment, assignment_service as assignment_store
+from app.services.assignment import CandidateArcs, assign, auction, candidate_arcs
+from app.services.assignment_service import AssignmentService
+from app.services.graph_service import GraphService
+from benchmarks.synthetic import generate_campus
+
+client = TestClient(app)
+
+
+def exact_total(arcs, n_mentors, capacity):
+    """Optimal total score via networkx min-cost flow; every learner may also stay unassigned"""
+    flow_graph = nx.DiGraph()
+    n = len(arcs.indptr) - 1
+    for i in range(n):
+        flow_graph.add_edge("s", ("l", i), capacity=1, weight=0)
+        flow_graph.add_edge(("l", i), "t", capacity=1, weight=0)
+        for a in range(arcs.indptr[i], arcs.indptr[i + 1]):
+            flow_graph.add_edge(("l", i), ("m", int(arcs.mentors[a])), capacity=1, weight=-int(arcs.scores[a]))
+    for j in range(n_mentors):
+        flow_graph.add_edge(("m", j), "t", capacity=capacity, weight=0)
+    flow_graph.nodes["s"]["demand"], flow_graph.nodes["t"]["demand"] = -n, n
+    return -nx.cost_of_flow(flow_graph, nx.min_cost_flow(flow_graph))
+
+
+def test_auction_matches_min_cost_flow():
+    rng = np.random.default_rng(1)
+    epsilon = 0.1
+    for _ in range(40):
+        n, n_mentors, capacity = int(rng.integers(1, 30)), int(rng.integers(1, 10)), int(rng.integers(1, 4))
+        indptr, mentors, scores = [0], [], []
+        for _ in range(n):
+            k = int(rng.integers(0, min(n_mentors, 5) + 1))
+            mentors += rng.choice(n_mentors, k, replace=False).tolist()
+            scores += (rng.integers(1, 21, k) * 5).tolist()
+            indptr.append(len(mentors))
+        arcs = CandidateArcs(np.array(indptr), np.array(mentors, dtype=np.int32), np.array(scores, dtype=float))
+
+        result = auction(arcs, n_mentors, capacity, epsilon)
+        best = exact_total(arcs, n_mentors, capacity)
+        placed = result.mentor[result.mentor >= 0]
+        assert np.bincount(placed, minlength=n_mentors).max(initial=0) <= capacity
+        # Scores are multiples of 5, so an epsilon-optimal total below n * epsilon of the optimum is the optimum
+        assert result.score.sum() == best
+        assert result.upper_bound >= best
+
+
+@pytest.mark.parametrize("backend", ["networkx", "compact"])
+def test_candidates_are_top_scores(backend, monkeypatch):
+    # A tiny chunk size makes every skill span several learner chunks
+    monkeypatch.setattr(assignment, "ARC_CHUNK", 200)
+    users, skills = generate_campus(150, 12, 5, seed=3)
+    graph = GraphService(backend=backend)
+    graph.build_graph(users, skills)
+    columns = graph.store.edge_columns()
+    arcs = candidate_arcs(columns, 4)
+
+    for i, (learner, skill) in enumerate(zip(columns.learn_user, columns.learn_skill)):
+        learner_id, skill_id = columns.user_ids[learner], columns.skill_ids[skill]
+        span = slice(arcs.indptr[i], arcs.indptr[i + 1])
+        for mentor, score in zip(arcs.mentors[span], arcs.scores[span]):
+            assert columns.user_ids[mentor] != learner_id
+            assert graph.calculate_match_score(learner_id, columns.user_ids[mentor], skill_id) == score
+        everyone = sorted((graph.calculate_match_score(learner_id, t, skill_id)
+                           for t, _ in graph.store.teachers(skill_id) if t != learner_id), reverse=True)
+        assert arcs.scores[span].tolist() == everyone[:4]
+
+
+def crowd(n_learners, *mentors):
+    """n_learners first-years who want Python, and (id, proficiency) senior mentors who teach it"""
+    skills = [Skill(id="k1", name="Python", category="Programming")]
+    users = [User(id=f"l{i}", name=f"L{i}", email=f"l{i}@x.edu", year=1, branch="CSE",
+                  skills=[UserSkill(user_id=f"l{i}", skill_id="k1", skill_name="Python",
+                                    proficiency=1, is_learning=True)])
+             for i in range(n_learners)]
+    for uid, proficiency in mentors:
+        users.append(User(id=uid, name=uid.title(), email=f"{uid}@x.edu", year=4, branch="CSE",
+                          skills=[UserSkill(user_id=uid, skill_id="k1", skill_name="Python",
+                                            proficiency=proficiency, is_teaching=True)]))
+    return users, skills
+
+
+@pytest.mark.parametrize("backend", ["networkx", "compact"])
+def test_capacity_spreads_learners(backend):
+    graph = GraphService(backend=backend)
+    graph.build_graph(*crowd(5, ("star", 5), ("solid", 3)))
+    rows, stats = assign(graph.store.edge_columns(), capacity=2, per_learner=8, epsilon=0.5)
+
+    # Independent ranking sends all five to the star; capacity 2 spreads them and leaves one unmatched
+    assert all(m.user_id == "star" for m in [graph.find_matches(f"l{i}", "Python", limit=1)[0] for i in range(5)])
+    mentors = [row["mentor_id"] for row in rows]
+    assert mentors.count("star") == 2 and mentors.count("solid") == 2 and mentors.count(None) == 1
+    assert stats["assigned"] == 4 and stats["unassigned"] == 1 and stats["mentors_used"] == 2
+    assert stats["total_score"] == 2 * 70 + 2 * 60 <= stats["upper_bound"]
+    for row in rows:
+        if row["mentor_id"] is not None:
+            assert row["match_score"] == graph.calculate_match_score(row["learner_id"], row["mentor_id"], "k1")
+
+
+def test_service_runs_in_background():
+    graph = GraphService()
+    graph.build_graph(*crowd(3, ("star", 5)))
+    service = AssignmentService()
+
+    async def scenario():
+        run = await service.start(graph, capacity=1)
+        assert run["status"] == "running" and await service.start(graph) is run
+        done = await service.wait()
+        assert done["status"] == "completed" and done["stats"]["assigned"] == 1
+        assert service.running is None and await service.latest() is done
+        assert [row["learner_id"] for row in await service.get_assignments(done["id"], mentor_id="star")] != []
+        assert len(await service.get_assignments(done["id"])) == 3
+        return done
+
+    asyncio.run(scenario())
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length):
+        return self.docs[:length]
+
+
+def matches(doc, query):
+    for key, want in query.items():
+        if isinstance(want, dict) and "$in" in want:
+            if doc.get(key) not in want["$in"]:
+                return False
+        elif isinstance(want, dict) and "$ne" in want:
+            if doc.get(key) == want["$ne"]:
+                return False
+        elif isinstance(want, dict) and "$lt" in want:
+            if not doc.get(key) < want["$lt"]:
+                return False
+        elif doc.get(key) != want:
+            return False
+    return True
+
+
+class FakeCollection:
+    def __init__(self):
+        self.docs = []
+        self.before_write = None
+
+    async def insert_one(self, doc):
+        self.docs.append(doc)
+
+    async def insert_many(self, docs):
+        if self.before_write:
+            await self.before_write()
+        self.docs.extend(docs)
+
+    async def update_one(self, query, update):
+        if self.before_write:
+            await self.before_write()
+        for doc in self.docs:
+            if matches(doc, query):
+                doc.update(update["$set"])
+
+    async def delete_many(self, query):
+        self.docs = [doc for doc in self.docs if not matches(doc, query)]
+
+    async def find_one(self, query, projection=None, sort=None):
+        docs = [doc for doc in self.docs if matches(doc, query)]
+        return max(docs, key=lambda doc: doc["started_at"]) if docs else None
+
+    def find(self, query, projection=None):
+        return FakeCursor([doc for doc in self.docs if matches(doc, query)])
+
+
+@pytest.fixture
+def fake_mongo(monkeypatch):
+    fake = {"assignments": FakeCollection(), "assignment_runs": FakeCollection()}
+    monkeypatch.setattr(database.db, "db", fake)
+    monkeypatch.setattr(assignment_store, "INSERT_BATCH", 1)
+    return fake
+
+
+def test_mongo_runs_replace_previous_rows(fake_mongo):
+    graph = GraphService()
+    graph.build_graph(*crowd(2, ("star", 5)))
+    service = AssignmentService()
+    seen_while_writing = []
+
+    async def read_latest():
+        # Readers keep getting the previous run's rows while the next one is written
+        latest = await service.latest()
+        if latest is not None:
+            seen_while_writing.append(len(await service.get_assignments(latest["id"])))
+
+    async def scenario():
+        await service.start(graph)
+        first = await service.wait()
+        fake_mongo["assignments"].before_write = fake_mongo["assignment_runs"].before_write = read_latest
+        await service.start(graph)
+        second = await service.wait()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert [run["status"] for run in fake_mongo["assignment_runs"].docs] == ["completed", "completed"]
+    # Two row inserts, then the update that completes the second run
+    assert seen_while_writing == [2, 2, 2]
+    assert {doc["run_id"] for doc in fake_mongo["assignments"].docs} == {second["id"]}
+    assert len(fake_mongo["assignments"].docs) == 2
+    assert asyncio.run(service.latest())["id"] == second["id"]
+    rows = asyncio.run(service.get_assignments(second["id"], learner_id="l0"))
+    assert rows == [doc for doc in fake_mongo["assignments"].docs if doc["learner_id"] == "l0"]
+
+
+class HeldGraph:
+    """assign_mentors answers only once released"""
+
+    def __init__(self, learner_id):
+        self.rows = [{"learner_id": learner_id, "mentor_id": "star"}]
+        self.release = asyncio.Event()
+
+    async def assign_mentors(self, capacity=None):
+        await self.release.wait()
+        return self.rows, {}
+
+
+def test_workers_keep_each_others_newer_rows(fake_mongo):
+    # Two workers run at once; the one started later finishes first
+    early, late = AssignmentService(), AssignmentService()
+
+    async def scenario():
+        early_graph, late_graph = HeldGraph("l0"), HeldGraph("l1")
+        early_run = await early.start(early_graph)
+        await asyncio.sleep(0.01)
+        late_run = await late.start(late_graph)
+        late_graph.release.set()
+        await late.wait()
+        early_graph.release.set()
+        await early.wait()
+        return early_run, late_run
+
+    early_run, late_run = asyncio.run(scenario())
+    assert asyncio.run(early.latest())["id"] == late_run["id"]
+    assert [row["learner_id"] for row in asyncio.run(early.get_assignments(late_run["id"]))] == ["l1"]
+
+
+def test_drop_older_spares_runs_still_writing(fake_mongo):
+    # Another worker's earlier run is still inserting; a failed one left rows behind
+    fake_mongo["assignment_runs"].docs += [
+        {"id": "writing", "status": "running", "started_at": "2000-01-01T00:00:00"},
+        {"id": "broken", "status": "failed", "started_at": "2000-01-01T00:00:00"},
+    ]
+    fake_mongo["assignments"].docs += [{"learner_id": "l9", "mentor_id": "star", "run_id": run_id}
+                                       for run_id in ("writing", "broken")]
+    service, graph = AssignmentService(), HeldGraph("l0")
+
+    async def scenario():
+        run = await service.start(graph)
+        graph.release.set()
+        await service.wait()
+        return run
+
+    run = asyncio.run(scenario())
+    assert {doc["run_id"] for doc in fake_mongo["assignments"].docs} == {"writing", run["id"]}
+
+
+def test_failed_run_deletes_its_rows(fake_mongo):
+    service, graph = AssignmentService(), HeldGraph("l0")
+    graph.rows = [{"learner_id": "l0", "mentor_id": "star"}, {"learner_id": "l1", "mentor_id": "star"}]
+    inserts = []
+
+    async def fail_second_insert():
+        inserts.append(1)
+        if len(inserts) == 2:
+            raise RuntimeError("connection reset")
+
+    async def scenario():
+        fake_mongo["assignments"].before_write = fail_second_insert
+        await service.start(graph)
+        graph.release.set()
+        return await service.wait()
+
+    run = asyncio.run(scenario())
+    assert run["status"] == "failed" and run["error"] == "connection reset"
+    assert fake_mongo["assignments"].docs == []
+
+
+class TestAssignmentAPI:
+    def setup_method(self):
+        assignment_service.__init__()
+        client.post("/demo/seed")
+
+    def test_empty_before_first_run(self):
+        assert client.get("/match/assignments").json() == {"run": None, "running": None, "assignments": []}
+
+    def test_run_and_filter(self):
+        res = client.post("/match/assignments", params={"capacity": 1, "wait": True})
+        assert res.status_code == 200
+        run = res.json()["run"]
+        assert run["status"] == "completed" and run["stats"]["mentor_capacity"] == 1
+
+        body = client.get("/match/assignments", params={"limit": 1000}).json()
+        assert body["run"]["id"] == run["id"] and len(body["assignments"]) == run["stats"]["learning_edges"]
+        mentors = [row["mentor_id"] for row in body["assignments"] if row["mentor_id"] is not None]
+        assert len(mentors) == len(set(mentors)) == run["stats"]["assigned"]
+
+        row = next(row for row in body["assignments"] if row["mentor_id"] is not None)
+        by_learner = client.get("/match/assignments", params={"learner_id": row["learner_id"]}).json()["assignments"]
+        by_mentor = client.get("/match/assignments", params={"mentor_id": row["mentor_id"]}).json()["assignments"]
+        assert row in by_learner and by_mentor == [row]
+
+    def test_capacity_is_validated(self):
+        assert client.post("/match/assignments", params={"capacity": 0}).status_code == 422
@@ -0,0 +1,228 @@
+"""
+Mentor availability tests
+Session slot parsing, the per-mentor interval index, booking conflicts and availability-filtered matching
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import json
+import pytest
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+from fastapi.testclient import TestClient
+from app.core import database
+from app.main import app, session_service
+from pydantic import ValidationError
+from app.core.config import Settings, settings
+from app.models import Session, SessionBookRequest
+from app.services.availability import AvailabilityIndex, SlotConflict, booking_slot, campus_zone, parse_duration, parse_slot
+from app.services.graph_service import GraphService
+from app.services.session_service import SessionService
+
+client = TestClient(app)
+
+NOW = datetime(2026, 3, 2, 9, 30)
+
+
+def at(hour, minute=0, day=2):
+    return datetime(2026, 3, day, hour, minute, tzinfo=timezone.utc)
+
+
+def session(sid, mentor, start, end, status="Scheduled"):
+    return Session(id=sid, mentor_name=mentor.title(), topic="T", date="d", time="t", status=status,
+                   duration="1 hr", mentor_id=mentor, starts_at=start, ends_at=end)
+
+
+def test_parse_slot():
+    assert parse_slot("Today", "04:00 PM", "1.5 hr", NOW) == (at(16), at(17, 30))
+    assert parse_slot("Tomorrow", "9 am", "45 min", NOW) == (at(9, day=3), at(9, 45, day=3))
+    assert parse_slot("2026-02-12", "16:00", "", NOW) == (at(16, day=12).replace(month=2), at(17, day=12).replace(month=2))
+    assert parse_slot("Feb 12", "06:00 PM", "1 hr", NOW)[0] == at(18, day=12).replace(month=2)
+    assert parse_slot("Every Sat", "06:00 PM", "1 hr", NOW) is None
+    assert parse_duration("1 hr 30 min") == timedelta(minutes=90) and parse_duration("soon") is None
+
+
+def test_slot_strings_are_campus_local():
+    kolkata = ZoneInfo("Asia/Kolkata")
+    # 01:00 on Mar 3 in Kolkata is still Mar 2 in UTC; "Today" is the campus's date
+    now = datetime(2026, 3, 2, 19, 30, tzinfo=timezone.utc).astimezone(kolkata)
+    assert parse_slot("Today", "04:00 PM", "1 hr", now) == (at(10, 30, day=3), at(11, 30, day=3))
+    assert parse_slot("2026-03-02", "09:00", "1 hr", now)[0] == at(3, 30)
+
+    request = SessionBookRequest(mentor_id="m1", topic="T", date="2026-03-02", time="09:00", duration="1 hr")
+    assert booking_slot(request, now)[0] == at(3, 30)
+    # An explicit starts_at wins over the strings; naive means UTC
+    exact = request.model_copy(update={"starts_at": datetime(2026, 3, 2, 9)})
+    assert booking_slot(exact, now) == (at(9), at(10))
+
+
+def test_conflicts_are_half_open():
+    index = AvailabilityIndex()
+    index.add(session("a", "m1", at(10), at(11)))
+    index.add(session("b", "m1", at(13), at(14)))
+    assert index.conflict("m1", at(11), at(13)) is None
+    assert index.conflict("m1", at(10, 30), at(10, 45)) == "a"
+    assert index.conflict("m1", at(12), at(13, 1)) == "b"
+    assert index.conflict("m2", at(10), at(11)) is None
+
+
+def test_overlapping_bookings_and_removal():
+    # A long session swallowing later short ones must still be found through the running max of ends
+    index = AvailabilityIndex()
+    index.add(session("long", "m1", at(8), at(18)))
+    index.add(session("short", "m1", at(9), at(10)))
+    assert index.conflict("m1", at(16), at(17)) == "long"
+    index.remove("long")
+    assert index.conflict("m1", at(16), at(17)) is None and index.conflict("m1", at(9, 30), at(11)) == "short"
+
+    index.add(session("short", "m1", at(9), at(10), status="Cancelled"))
+    assert "short" not in index and len(index) == 0
+
+
+def test_scan_window_shrinks_after_removal():
+    index = AvailabilityIndex()
+    index.add(session("long", "m1", at(8), at(18)))
+    index.add(session("short", "m2", at(9), at(10)))
+    index.add(session("short2", "m3", at(11), at(12)))
+    assert index._longest == 10 * 3600
+    index.remove("long")
+    assert index._longest == 3600 and index.busy(at(11, 30), at(13)) == {"m3"}
+    index.remove("short")
+    assert index._longest == 3600
+    index.remove("short2")
+    assert index._longest == 0 and index._lengths == {}
+
+
+def test_busy_mentors_in_window():
+    index = AvailabilityIndex()
+    index.add(session("a", "m1", at(8), at(12)))
+    index.add(session("b", "m2", at(11), at(12)))
+    index.add(session("c", "m3", at(14), at(15)))
+    index.add(session("d", "m4", at(9), at(10)))
+    assert index.busy(at(10, 30), at(11, 30)) == {"m1", "m2"}
+    # Aware datetimes are compared in UTC
+    assert index.busy(at(15, 30).replace(tzinfo=timezone(timedelta(hours=1))), at(16)) == {"m3"}
+
+
+def test_book_rejects_conflicts_and_cancel_frees_slot():
+    service = SessionService()
+
+    async def scenario():
+        await service.book(session("a", "m1", at(10), at(11)))
+        with pytest.raises(SlotConflict) as conflict:
+            await service.book(session("b", "m1", at(10, 30), at(11, 30)))
+        assert conflict.value.session_id == "a"
+        await service.book(session("c", "m2", at(10, 30), at(11, 30)))
+
+        await service.update_status("a", "Cancelled")
+        await service.book(session("b", "m1", at(10, 30), at(11, 30)))
+        await service.delete("b")
+        assert (await service.availability()).conflict("m1", at(10), at(12)) is None
+
+    asyncio.run(scenario())
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, keys):
+        return self
+
+    async def to_list(self, length):
+        docs, self.docs = self.docs[:length], self.docs[length:]
+        return docs
+
+
+class FakeSessions:
+    """Another instance has already booked m1 at 10:00"""
+
+    def __init__(self):
+        self.inserted = []
+        self.stamped = []
+        self.overlap_queries = []
+
+    def find(self, query, projection=None, batch_size=None):
+        return FakeCursor([])
+
+    async def find_one(self, query, projection=None):
+        self.overlap_queries.append(query)
+        return {"id": "remote"} if query["mentor_id"] == "m1" else None
+
+    async def update_one(self, query, update, upsert=False):
+        assert upsert and query == {"id": update["$setOnInsert"]["id"]}
+        self.inserted.append(update["$setOnInsert"])
+        self.stamped.extend(update["$currentDate"])
+
+
+def test_mongo_booking_checks_other_instances(monkeypatch):
+    fake = FakeSessions()
+    monkeypatch.setattr(database.db, "db", {"sessions": fake})
+    service = SessionService()
+
+    with pytest.raises(SlotConflict):
+        asyncio.run(service.book(session("a", "m1", at(10), at(11))))
+    asyncio.run(service.book(session("b", "m2", at(10), at(11))))
+
+    assert fake.overlap_queries[0] == SessionService.overlap_filter("m1", at(10), at(11))
+    assert [doc["id"] for doc in fake.inserted] == ["b"] and "b" in service.schedule
+    # Stamped with the server's clock for graph sync's polling fallback
+    assert fake.stamped == [settings.GRAPH_SYNC_WATERMARK_FIELD]
+
+
+@pytest.mark.parametrize("backend", ["networkx", "compact"])
+def test_find_matches_skips_excluded_mentors(backend):
+    from test_graph_rebuild import campus
+    service = GraphService(backend=backend)
+    service.build_graph(*campus("ada", "bob", "cy"))
+    everyone = [m.user_id for m in service.find_matches("seeker", "Python", limit=2)]
+    free = [m.user_id for m in service.find_matches("seeker", "Python", limit=2, exclude=frozenset([everyone[0]]))]
+    assert len(free) == 2 and everyone[0] not in free
+
+
+class TestBookingAPI:
+    def setup_method(self):
+        session_service.sessions = []
+        client.post("/demo/seed")
+
+    def test_double_booking_is_409(self):
+        slot = {"mentor_id": "u1", "topic": "ML", "date": "2026-04-01", "time": "10:00 AM", "duration": "1 hr"}
+        first = client.post("/sessions/book", json=slot)
+        assert first.status_code == 200 and first.json()["session"]["starts_at"] == "2026-04-01T10:00:00Z"
+        assert client.post("/sessions/book", json={**slot, "time": "10:30 AM"}).status_code == 409
+        assert client.post("/sessions/book", json={**slot, "time": "11:00 AM"}).status_code == 200
+        assert client.post("/sessions/book", json={**slot, "date": "Every Sat"}).status_code == 200
+
+    def test_slot_strings_use_campus_timezone(self, monkeypatch):
+        monkeypatch.setattr(settings, "CAMPUS_TIMEZONE", "Asia/Kolkata")
+        slot = {"mentor_id": "u1", "topic": "ML", "date": "2026-04-01", "time": "03:30 PM", "duration": "1 hr"}
+        booked = client.post("/sessions/book", json=slot).json()["session"]
+        assert booked["starts_at"] == "2026-04-01T10:00:00Z"
+        # The same instant given exactly, in UTC, collides with it
+        exact = {**slot, "starts_at": "2026-04-01T10:30:00Z"}
+        assert client.post("/sessions/book", json=exact).status_code == 409
+
+    def test_campus_zone_is_checked_at_load(self, monkeypatch):
+        with pytest.raises(ValidationError, match="Mars/Olympus"):
+            Settings(CAMPUS_TIMEZONE="Mars/Olympus")
+        assert Settings(CAMPUS_TIMEZONE="Asia/Kolkata").CAMPUS_TIMEZONE == "Asia/Kolkata"
+        # UTC never touches the zone database
+        monkeypatch.setattr(settings, "CAMPUS_TIMEZONE", "UTC")
+        assert campus_zone() is timezone.utc
+
+    def test_match_find_filters_booked_mentors(self):
+        client.post("/sessions/book", json={"mentor_id": "u1", "topic": "ML", "date": "d", "time": "t",
+                                            "starts_at": "2026-04-01T10:00:00Z", "duration": "2 hr"})
+        query = {"user_id": "u2", "skill_name": "Python", "limit": 5}
+        assert "u1" in [m["user_id"] for m in client.post("/match/find", json=query).json()]
+
+        busy = client.post("/match/find", json={**query, "available_at": "2026-04-01T11:00:00Z"}).json()
+        later = client.post("/match/find", json={**query, "available_at": "2026-04-01T12:00:00Z"}).json()
+        assert "u1" not in [m["user_id"] for m in busy] and "u1" in [m["user_id"] for m in later]
+
+        res = client.post("/match/batch", json={"queries": [{**query, "available_at": "2026-04-01T11:00:00Z"}]})
+        row = json.loads(res.text.splitlines()[0])
+        assert "u1" not in [m["user_id"] for m in row["matches"]]
@@ -0,0 +1,27 @@
+"""
+Benchmark harness smoke tests
+A tiny run produces the JSON report and regression comparison works on it
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import copy
+from benchmarks.matching_api import compare, run
+
+
+def test_small_run_report():
+    report = run(n_users=200, n_skills=20, queries=20, concurrency=4, sync_runs=1)
+    assert report["params"]["users"] == 200
+    assert report["build"]["mb_per_10k_users"] > 0
+    for endpoint in ("/match/find", "/leaderboard", "/skills/trending"):
+        stats = report["http"][endpoint]
+        assert stats["requests"] == 20 and stats["errors"] == 0
+        assert stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"]
+    assert "source" in report["/graph/sync"]
+
+    assert compare(report, report) == []
+    slower = copy.deepcopy(report)
+    slower["http"]["/leaderboard"]["p95_ms"] = report["http"]["/leaderboard"]["p95_ms"] * 2 + 1
+    assert [r.split(":")[0] for r in compare(slower, report)] == ["http /leaderboard p95_ms"]
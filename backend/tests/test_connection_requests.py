@@ -0,0 +1,102 @@
+"""
+Connection request lookup tests
+Both directions, status filtering and counts come back in one round trip
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+from fastapi.testclient import TestClient
+from app.core import database
+from app.main import app, connection_service
+from app.models import ConnectionRequestStatus
+from app.services.connection_service import ConnectionService
+
+client = TestClient(app)
+
+
+def request(rid, from_user, to_user, status="pending", day=1):
+    return ConnectionRequestStatus(id=rid, from_user_id=from_user, from_user_name=from_user.title(),
+                                   to_user_id=to_user, skill_name="Python", status=status,
+                                   created_at=f"2026-02-{day:02d}T00:00:00")
+
+
+class FakeAggregation:
+    def __init__(self, result):
+        self.result = result
+
+    async def to_list(self, length):
+        return self.result[:length]
+
+
+class FakeCollection:
+    def __init__(self, result):
+        self.result = result
+        self.pipelines = []
+
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        return FakeAggregation(self.result)
+
+    def find(self, *args, **kwargs):
+        raise AssertionError("get_by_user must not issue find()")
+
+
+class TestInMemory:
+    """Demo-mode fallback through the API"""
+
+    def setup_method(self):
+        connection_service.requests = [
+            request("r1", "bob", "ada", day=1),
+            request("r2", "cy", "ada", status="accepted", day=2),
+            request("r3", "ada", "dan", day=3),
+        ]
+
+    def test_status_filter(self):
+        data = client.get("/match/requests/ada", params={"status": "pending"}).json()
+        assert [r["id"] for r in data["incoming"]] == ["r1"]
+        assert [r["id"] for r in data["outgoing"]] == ["r3"]
+        assert data["counts"] == {"incoming": 1, "outgoing": 1}
+
+    def test_all_statuses(self):
+        data = client.get("/match/requests/ada").json()
+        assert [r["id"] for r in data["incoming"]] == ["r2", "r1"]
+        assert data["counts"] == {"incoming": 2, "outgoing": 1}
+
+    def test_counts_endpoint(self):
+        assert client.get("/match/requests/ada/counts").json() == {"user_id": "ada", "incoming": 2, "outgoing": 1}
+        assert client.get("/match/requests/dan/counts", params={"status": "pending"}).json()["incoming"] == 1
+
+    def test_self_addressed_request_is_listed_both_ways(self):
+        connection_service.requests.append(request("r4", "ada", "ada", day=4))
+        data = client.get("/match/requests/ada").json()
+        assert [r["id"] for r in data["incoming"]] == ["r4", "r2", "r1"]
+        assert [r["id"] for r in data["outgoing"]] == ["r4", "r3"]
+        assert data["counts"] == {"incoming": 3, "outgoing": 2}
+
+
+def test_mongo_lookup_is_one_aggregation(monkeypatch):
+    doc = request("r1", "bob", "ada").model_dump()
+    fake = FakeCollection([{"incoming": [doc], "outgoing": [], "counts": [{"_id": None, "incoming": 1, "outgoing": 0}]}])
+    monkeypatch.setattr(database.db, "db", {"connection_requests": fake})
+
+    result = asyncio.run(ConnectionService().get_by_user("ada", limit=10, status="pending"))
+
+    assert len(fake.pipelines) == 1
+    match, facet = fake.pipelines[0]
+    assert match["$match"] == {"$or": [{"to_user_id": "ada"}, {"from_user_id": "ada"}], "status": "pending"}
+    assert set(facet["$facet"]) == {"incoming", "outgoing", "counts"}
+    assert facet["$facet"]["incoming"][2] == {"$limit": 11}
+    assert [r.id for r in result["incoming"]] == ["r1"]
+    assert result["counts"] == {"incoming": 1, "outgoing": 0}
+    assert result["next_cursor"] == {"incoming": None, "outgoing": None}
+
+
+def test_mongo_counts_fetch_no_documents(monkeypatch):
+    fake = FakeCollection([{"_id": None, "incoming": 0, "outgoing": 4}])
+    monkeypatch.setattr(database.db, "db", {"connection_requests": fake})
+
+    assert asyncio.run(ConnectionService().count_by_user("ada")) == {"incoming": 0, "outgoing": 4}
+    assert [list(stage) for stage in fake.pipelines[0]] == [["$match"], ["$group"]]
@@ -0,0 +1,81 @@
+"""
+Event recommendation tests
+Tag/title inverted index, profile weighting, top-k selection and /events/recommended
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+from fastapi.testclient import TestClient
+from app.main import app, event_service
+from app.models import Event
+from app.services.event_index import EventIndex, event_terms, profile_terms
+from app.services.event_service import EventService
+
+client = TestClient(app)
+
+
+def event(eid, title, tags, participants=0, max_participants=10):
+    return Event(id=eid, title=title, description="", time="Today", location="Lab", type="Workshop",
+                 participants=participants, max_participants=max_participants, host="Host", tags=tags)
+
+
+def test_event_terms():
+    terms = event_terms(event("e1", "Intro to Machine Learning", ["Deep Learning", "AI"]))
+    assert terms["deep learning"] == terms["dl"] == terms["ai"] == 1.0
+    assert terms["machine learning"] == terms["intro"] == 0.5
+
+
+def test_profile_terms_strongest_source_wins():
+    terms = profile_terms(teaching=[("Python", "Programming")], learning=[("Machine Learning", "AI/ML")])
+    assert terms["ml"] == (3.0, "Machine Learning")
+    assert terms["python"] == (1.5, "Python")
+    assert terms["ai"] == (1.0, "AI/ML") and terms["programming"] == (1.0, "Programming")
+
+
+def test_recommend_ranks_and_skips_unrelated_and_full():
+    index = EventIndex()
+    index.add(event("e1", "ML Reading Group", ["Machine Learning"]))
+    index.add(event("e2", "Python for Data", ["Python"]))
+    index.add(event("e3", "Poetry Night", ["Arts"]))
+    index.add(event("e4", "Machine Learning Bootcamp", ["Machine Learning"], participants=10))
+    profile = profile_terms(teaching=[("Python", "Programming")], learning=[("Machine Learning", "AI/ML")])
+
+    ranked = index.recommend(profile, limit=5)
+    assert [(e.id, score, matched) for e, score, matched in ranked] == [
+        ("e1", 3.0, ["Machine Learning"]),
+        ("e2", 1.5, ["Python"]),
+    ]
+    assert [e.id for e, _, _ in index.recommend(profile, limit=1)] == ["e1"]
+
+    index.remove("e1")
+    assert "machine learning" in index.postings and "reading" not in index.postings
+    assert [e.id for e, _, _ in index.recommend(profile, limit=5)] == ["e2"]
+
+
+def test_create_keeps_index_current():
+    service = EventService()
+    profile = profile_terms(teaching=[], learning=[("Docker", "DevOps")])
+
+    async def scenario():
+        assert await service.recommend(profile) == []
+        await service.create(event("e9", "Containers 101", ["Docker"], max_participants=1))
+        assert [e.id for e, _, _ in await service.recommend(profile)] == ["e9"]
+        await service.register_user("e9", "u1")
+        assert await service.recommend(profile) == []
+
+    asyncio.run(scenario())
+
+
+def test_recommended_endpoint():
+    event_service.events = []
+    client.post("/demo/seed")
+    res = client.get("/events/recommended/u6")
+    assert res.status_code == 200
+    events = res.json()["events"]
+    # u6 wants Machine Learning (AI/ML) and teaches React (Frontend)
+    assert [e["id"] for e in events] == ["e3", "e2"]
+    assert events[0]["matched"][0] == "Machine Learning" and "React" in events[1]["matched"]
+    assert client.get("/events/recommended/nobody").status_code == 404
@@ -0,0 +1,248 @@
+"""
+Executor layer tests
+Graph work runs on dedicated pools with queue-depth and wait-time metrics
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import threading
+import time
+import pytest
+from app.core.config import settings
+from app.core.executors import GraphExecutors, ReadWriteLock
+from app.models import MatchRequest
+from app.services.compact_graph import CompactGraphStore, build_snapshot
+from app.services.graph_service import GraphService, graph_records
+from test_graph_backends import assert_same_answers
+from test_graph_rebuild import campus
+
+
+@pytest.fixture
+def pools(monkeypatch):
+    monkeypatch.setattr(settings, "GRAPH_READ_WORKERS", 1)
+    pools = GraphExecutors()
+    yield pools
+    pools.shutdown()
+
+
+def test_metrics_count_jobs(pools):
+    async def scenario():
+        return [await pools.read(pow, 2, n) for n in range(5)]
+
+    assert asyncio.run(scenario()) == [1, 2, 4, 8, 16]
+    stats = pools.stats()["read"]
+    assert stats["kind"] == "thread" and stats["workers"] == 1
+    assert stats["submitted"] == stats["completed"] == 5
+    assert stats["pending"] == stats["queue_depth"] == 0
+
+
+def test_queue_depth_and_wait(pools):
+    release = threading.Event()
+
+    async def scenario():
+        jobs = [asyncio.ensure_future(pools.read(release.wait)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        during = pools.stats()["read"]
+        release.set()
+        await asyncio.gather(*jobs)
+        return during
+
+    during = asyncio.run(scenario())
+    # One job runs on the single worker, two wait behind it
+    assert during["pending"] == 3 and during["queue_depth"] == 2
+    after = pools.stats()["read"]
+    assert after["completed"] == 3 and after["queue_depth"] == 0
+    assert after["wait_max_ms"] >= 40
+
+
+def test_slow_read_does_not_block_loop(pools):
+    async def scenario():
+        slow = asyncio.ensure_future(pools.read(time.sleep, 0.3))
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        tick = time.perf_counter() - start
+        await slow
+        return tick
+
+    assert asyncio.run(scenario()) < 0.2
+
+
+def test_read_errors_reach_the_caller(pools):
+    def half_swapped():
+        raise KeyError("k1")
+
+    with pytest.raises(KeyError):
+        asyncio.run(pools.read(half_swapped))
+    assert pools.stats()["read"]["failed"] == 1
+
+
+def test_waiting_writer_goes_before_new_readers():
+    lock = ReadWriteLock()
+    order = []
+    first_in, release = threading.Event(), threading.Event()
+
+    def reader(name, hold=None):
+        with lock.read():
+            order.append(name)
+            if hold:
+                first_in.set()
+                hold.wait()
+
+    def writer():
+        with lock.write():
+            order.append("writer")
+
+    threads = [threading.Thread(target=reader, args=("first", release))]
+    threads[0].start()
+    first_in.wait()
+    threads.append(threading.Thread(target=writer))
+    threads[1].start()
+    time.sleep(0.05)
+    threads.append(threading.Thread(target=reader, args=("second",)))
+    threads[2].start()
+    time.sleep(0.05)
+    # The writer waits for the first reader; the second waits for the writer
+    assert order == ["first"]
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert order == ["first", "writer", "second"]
+
+
+def test_lock_is_reentrant_for_its_holder():
+    lock = ReadWriteLock()
+    with lock.write():
+        with lock.write(), lock.read():
+            pass
+    with lock.read():
+        with lock.read():
+            pass
+        with pytest.raises(RuntimeError):
+            with lock.write():
+                pass
+    with lock.write():
+        pass
+
+
+@pytest.mark.parametrize("backend", ["networkx", "compact"])
+def test_loop_writes_wait_for_pool_reads(backend, pools, monkeypatch):
+    monkeypatch.setattr("app.services.graph_service.executors", pools)
+    # The compact store then folds every write straight back into its edge arrays
+    monkeypatch.setattr(CompactGraphStore, "COMPACT_THRESHOLD", 0)
+    graph = GraphService(backend=backend)
+    graph.build_graph(*campus("ada", "bob"))
+    entered, release = threading.Event(), threading.Event()
+
+    def two_looks():
+        before = sorted(graph.store.teachers("k1"))
+        entered.set()
+        release.wait()
+        return before, sorted(graph.store.teachers("k1"))
+
+    async def scenario():
+        job = asyncio.ensure_future(graph.read(two_looks))
+        await asyncio.to_thread(entered.wait)
+        write = asyncio.ensure_future(graph.write(graph.remove_user_skill, "bob", "k1"))
+        # The loop keeps running while the write waits for the read
+        await asyncio.sleep(0.05)
+        waiting = not write.done()
+        release.set()
+        return waiting, await job, await write
+
+    waiting, (before, after), removed = asyncio.run(scenario())
+    assert waiting and removed
+    assert before == after == [("ada", 4), ("bob", 4)]
+    assert graph.store.teachers("k1") == [("ada", 4)]
+
+
+def test_cancelled_write_gives_the_lock_back():
+    lock = ReadWriteLock()
+    entered, release = threading.Event(), threading.Event()
+
+    def hold():
+        with lock.read():
+            entered.set()
+            release.wait()
+
+    async def scenario():
+        reader = asyncio.ensure_future(asyncio.to_thread(hold))
+        await asyncio.to_thread(entered.wait)
+        write = asyncio.ensure_future(lock.writing().__aenter__())
+        await asyncio.sleep(0.01)
+        write.cancel()
+        release.set()
+        await reader
+        await asyncio.sleep(0.05)
+        async with lock.writing():
+            pass
+
+    asyncio.run(asyncio.wait_for(scenario(), 2))
+    with lock.read():
+        pass
+
+
+def test_batch_chunk_lets_writes_in_between_queries(pools, monkeypatch):
+    monkeypatch.setattr("app.services.graph_service.executors", pools)
+    graph = GraphService()
+    graph.build_graph(*campus("ada", "bob"))
+    second_query, release = threading.Event(), threading.Event()
+    rank = graph._rank
+
+    def slow_rank(seeker_id, *args):
+        if seeker_id == "q1":
+            second_query.set()
+            release.wait()
+        return rank(seeker_id, *args)
+
+    monkeypatch.setattr(graph, "_rank", slow_rank)
+    queries = [MatchRequest(user_id=f"q{i}", skill_name="Python") for i in range(3)]
+
+    async def scenario():
+        batch = graph.find_matches_batch(queries)
+        chunk = asyncio.ensure_future(batch.__anext__())
+        await asyncio.to_thread(second_query.wait)
+        threading.Timer(0.05, release.set).start()
+        # The chunk is inside its second query; the write waits for that one, not the third
+        await graph.write(graph.remove_user_skill, "bob", "k1")
+        return await chunk
+
+    rows = asyncio.run(scenario())
+    assert [len(row["matches"]) for row in rows] == [2, 2, 1]
+
+
+def test_failures_are_counted(pools):
+    with pytest.raises(ZeroDivisionError):
+        asyncio.run(pools.run("load", divmod, 1, 0))
+    assert pools.stats()["load"]["failed"] == 1
+
+
+def test_rebuild_pool_kind(pools, monkeypatch):
+    monkeypatch.setattr(settings, "GRAPH_REBUILD_PROCESSES", 0)
+    assert pools.kind("rebuild") == "thread"
+    pools.shutdown()
+    monkeypatch.setattr(settings, "GRAPH_REBUILD_PROCESSES", 1)
+    assert pools.kind("rebuild") == "process"
+
+
+def test_process_built_store_matches(pools, monkeypatch):
+    monkeypatch.setattr(settings, "GRAPH_REBUILD_PROCESSES", 1)
+    records = graph_records(*campus("ada", "bob"))
+    arrays, strings = asyncio.run(pools.rebuild(build_snapshot, *records))
+    built = CompactGraphStore.from_snapshot(arrays, strings)
+
+    reference = GraphService(backend="compact")
+    reference.build_graph(*campus("ada", "bob"))
+    assert sorted(built.records()[2]) == sorted(reference.store.records()[2])
+
+
+@pytest.mark.parametrize("backend", ["networkx", "compact"])
+def test_rebuild_graph_through_executors(backend):
+    users, skills = campus("ada", "bob", "cy")
+    direct = GraphService(backend=backend)
+    direct.build_graph(users, skills)
+    rebuilt = GraphService(backend=backend)
+    asyncio.run(rebuilt.rebuild_graph(users, skills))
+    assert_same_answers(direct, rebuilt, users, skills)
@@ -0,0 +1,136 @@
+"""
+Graph backend parity tests
+The compact (NumPy) store must answer every GraphService query exactly like networkx
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from app.services.graph_service import GraphService, create_store
+from app.models import User
+from app.core.constants import RelationType
+from app.services.compact_graph import CompactGraphStore
+from benchmarks.synthetic import generate_campus
+
+
+def build_pair(n_users=300, n_skills=40):
+    users, skills = generate_campus(n_users, n_skills, skills_per_user=5, seed=7)
+    services = []
+    for backend in ("networkx", "compact"):
+        service = GraphService(backend=backend)
+        service.build_graph(users, skills)
+        services.append(service)
+    return services, users, skills
+
+
+def assert_same_answers(nx_service, compact_service, users, skills):
+    assert nx_service.number_of_nodes() == compact_service.number_of_nodes()
+    assert nx_service.number_of_edges() == compact_service.number_of_edges()
+    assert nx_service.user_count() == compact_service.user_count()
+    assert nx_service.skill_count() == compact_service.skill_count()
+
+    # Equal scores may come back in a different order, so compare whole ranked lists by (score, id)
+    ranked = lambda matches: sorted((m.model_dump() for m in matches), key=lambda m: (-m["match_score"], m["user_id"]))
+    for user in users[:30]:
+        for skill in skills[:6]:
+            expected = nx_service.find_matches(user.id, skill.name, limit=1000)
+            actual = compact_service.find_matches(user.id, skill.name, limit=1000)
+            assert ranked(actual) == ranked(expected)
+
+            top = compact_service.find_matches(user.id, skill.name, limit=5)
+            assert [m.match_score for m in top] == [m.match_score for m in expected[:5]]
+
+        expected = nx_service.get_user_connections(user.id)
+        actual = compact_service.get_user_connections(user.id)
+        by_skill = lambda entries: sorted(entries, key=lambda e: e["skill"])
+        assert by_skill(actual["teaching"]) == by_skill(expected["teaching"])
+        assert by_skill(actual["learning"]) == by_skill(expected["learning"])
+
+    assert compact_service.leaderboard() == nx_service.leaderboard()
+    assert compact_service.trending_skills() == nx_service.trending_skills()
+    assert compact_service.skill_categories() == nx_service.skill_categories()
+
+
+class TestCompactBackend:
+    """Compact store vs networkx store"""
+
+    def test_unknown_backend_rejected(self):
+        with pytest.raises(ValueError):
+            create_store("igraph")
+
+    def test_parity_after_build(self):
+        (nx_service, compact_service), users, skills = build_pair()
+        assert_same_answers(nx_service, compact_service, users, skills)
+
+    def test_parity_after_mutations(self):
+        (nx_service, compact_service), users, skills = build_pair()
+
+        for service in (nx_service, compact_service):
+            service.register_user(User(id="new1", name="Fresh", email="f@srmap.edu.in", year=4, branch="CSE"))
+            service.update_user_skills("new1", skills[0].id, skills[0].name, 5, is_teaching=True)
+            service.update_user_skills("new1", "custom", "Elixir", 3, is_teaching=True)
+            # Flip existing edges both ways and update a profile
+            for user in users[:20]:
+                service.update_user_skills(user.id, skills[1].id, skills[1].name, 4, is_teaching=True)
+                service.update_user_skills(user.id, skills[2].id, skills[2].name, 2, is_learning=True)
+            service.update_user_profile(users[3].id, year=4, branch="ECE")
+
+        assert compact_service.find_matches(users[0].id, "elixir")[0].user_id == "new1"
+        assert_same_answers(nx_service, compact_service, users, skills)
+
+    def test_implicit_user_profile_updates(self):
+        (nx_service, compact_service), users, skills = build_pair()
+
+        for service in (nx_service, compact_service):
+            # Only known through an edge until the profile update
+            service.store.set_edge("ghost", skills[0].id, RelationType.CAN_TEACH, 4)
+            assert service.get_user("ghost") == {}
+            assert service.update_user_profile("ghost", year=3)
+        assert compact_service.get_user("ghost") == nx_service.get_user("ghost") == {"year": 3}
+
+        for service in (nx_service, compact_service):
+            service.update_user_profile("ghost", name="Ghost")
+        assert compact_service.get_user("ghost") == nx_service.get_user("ghost") == {"year": 3, "name": "Ghost"}
+        assert_same_answers(nx_service, compact_service, users, skills)
+
+        restored = CompactGraphStore.from_snapshot(*compact_service.store.snapshot())
+        assert restored.get_user("ghost") == {"year": 3, "name": "Ghost"}
+        assert sorted(compact_service.store.records()[1]) == sorted(nx_service.store.records()[1])
+
+    def test_overlay_compaction_keeps_answers(self):
+        (nx_service, compact_service), users, skills = build_pair()
+        compact_service.store.COMPACT_THRESHOLD = 4
+
+        for service in (nx_service, compact_service):
+            for user in users[:30]:
+                service.update_user_skills(user.id, skills[5].id, skills[5].name, 3, is_teaching=True)
+
+        assert len(compact_service.store._dirty) <= 4
+        assert_same_answers(nx_service, compact_service, users, skills)
+
+
+class TestBatchScoring:
+    """Vectorized scoring must agree with the scalar calculate_match_score"""
+
+    @pytest.mark.parametrize("backend", ["networkx", "compact"])
+    def test_batch_scores_match_scalar_scores(self, backend):
+        users, skills = generate_campus(200, 30, skills_per_user=5, seed=3)
+        service = GraphService(backend=backend)
+        service.build_graph(users, skills)
+
+        for seeker in users[:25]:
+            matches = service.find_matches(seeker.id, skills[0].name, limit=1000)
+            for match in matches:
+                assert match.match_score == service.calculate_match_score(seeker.id, match.user_id, skills[0].id)
+                assert (match.mutual_exchange is not None) == bool(service._find_mutual_skills(seeker.id, match.user_id))
+
+    def test_top_k_is_a_stable_truncated_sort(self):
+        import numpy as np
+        from app.services.match_scoring import top_k
+
+        scores = np.array([50.0, 70.0, 50.0, 90.0, 50.0, 70.0])
+        expected = sorted(range(len(scores)), key=lambda i: -scores[i])
+        for k in range(0, 8):
+            assert top_k(scores, k).tolist() == expected[:k]
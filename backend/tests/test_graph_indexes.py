@@ -0,0 +1,60 @@
+"""
+GraphService secondary index tests
+Indexes must stay consistent with the graph across every mutation path
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.graph_service import graph_service
+
+client = TestClient(app)
+
+
+class TestGraphIndexes:
+    """Skill/teacher/learner indexes behind find_matches"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        client.post("/demo/seed")
+
+    def test_skill_name_index_is_case_insensitive(self):
+        assert graph_service.store.skill_by_name["machine learning"] == "skill:4"
+        matches = graph_service.find_matches(seeker_id="u2", skill_name="MACHINE LEARNING")
+        assert "u1" in [m.user_id for m in matches]
+
+    def test_registered_user_becomes_mentor(self):
+        response = client.post("/user/register", json={
+            "name": "Index Tester", "email": "index@srmap.edu.in", "year": 4, "branch": "CSE"
+        })
+        user_id = response.json()["user_id"]
+
+        client.post(f"/user/{user_id}/skills", json={
+            "skill_id": "99", "skill_name": "Rust", "proficiency": 5, "is_teaching": True
+        })
+
+        assert graph_service.store.skill_by_name["rust"] == "skill:99"
+        assert graph_service.store.skill_teachers["skill:99"] == {f"user:{user_id}": 5}
+
+        matches = client.post("/match/find", json={"user_id": "u1", "skill_name": "Rust"}).json()
+        assert [m["user_id"] for m in matches] == [user_id]
+
+    def test_relation_change_moves_edge_between_indexes(self):
+        # u1 teaches Python; switching the edge to learning removes them as a mentor
+        client.post("/user/u1/skills", json={
+            "skill_id": "1", "skill_name": "Python", "proficiency": 5, "is_learning": True
+        })
+
+        assert "user:u1" not in graph_service.store.skill_teachers["skill:1"]
+        assert "user:u1" in graph_service.store.skill_learners["skill:1"]
+        matches = graph_service.find_matches(seeker_id="u2", skill_name="Python")
+        assert "u1" not in [m.user_id for m in matches]
+
+    def test_profile_update_is_visible_to_matching(self):
+        client.put("/user/u1", json={"branch": "ECE"})
+        matches = graph_service.find_matches(seeker_id="u4", skill_name="Python")
+        assert next(m for m in matches if m.user_id == "u1").branch == "ECE"
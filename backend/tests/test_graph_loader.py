@@ -0,0 +1,86 @@
+"""
+Streaming graph loader tests
+Projected cursor batches are fed straight into either graph store
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import pytest
+from types import SimpleNamespace
+from app.core import database
+from app.services.graph_service import GraphService, create_store
+
+
+class FakeCursor:
+    def __init__(self, docs, projection):
+        self.docs = [{k: v for k, v in d.items() if k == "_id" or k in projection} for d in docs]
+
+    async def to_list(self, length):
+        batch, self.docs = self.docs[:length], self.docs[length:]
+        return batch
+
+
+class FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+        self.projections = []
+
+    def find(self, query, projection, batch_size=None):
+        self.projections.append(projection)
+        return FakeCursor(self.docs, projection)
+
+
+class FakeDB(SimpleNamespace):
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    fake = FakeDB(
+        skills=FakeCollection([
+            {"_id": "k1", "name": "Python", "category": "Programming", "description": "unused"},
+            {"_id": "k2", "name": "Figma", "category": "Design"},
+        ]),
+        users=FakeCollection([
+            {"_id": "a", "name": "Asha", "email": "a@x.edu", "year": 4, "branch": "CSE", "password": "h"},
+            {"_id": "b", "name": "Bala", "email": "b@x.edu", "year": 1, "branch": "CSE"},
+            {"_id": "c", "name": "Chen", "email": "c@x.edu", "year": 3, "branch": "ECE"},
+        ]),
+        userskills=FakeCollection([
+            {"_id": "us1", "userId": "a", "skillId": "k1", "proficiency": 5, "isTeaching": True},
+            {"_id": "us2", "userId": "c", "skillId": "k1", "proficiency": 3, "isTeaching": True},
+            {"_id": "us3", "userId": "b", "skillId": "k2", "isLearning": True},
+            {"_id": "us4", "userId": "ghost", "skillId": "k1", "proficiency": 2, "isTeaching": True},
+        ]),
+    )
+    monkeypatch.setattr(database.db, "db", fake)
+    return fake
+
+
+@pytest.mark.parametrize("backend", ["networkx", "compact"])
+def test_stream_matches_bulk_build(fake_db, backend):
+    store = create_store(backend)
+    stats, emails, keys = asyncio.run(database.stream_graph_data(store, batch_size=2))
+
+    assert (stats["skills"], stats["users"], stats["userskills"]) == (2, 3, 4)
+    assert stats["rows_per_sec"] > 0 and stats["peak_rss_mb"] > 0
+    assert emails == {"a@x.edu": "a", "b@x.edu": "b", "c@x.edu": "c"}
+    assert keys["us4"] == ("ghost", "k1")
+
+    graph = GraphService(backend=backend)
+    graph.replace_store(store, emails)
+    # Edges to unknown users are dropped
+    assert graph.user_count() == 3 and graph.number_of_edges() == 3
+    assert [m.user_id for m in graph.find_matches("b", "python")] == ["a", "c"]
+    assert graph.find_user_by_email("c@x.edu") == "c"
+
+
+def test_stream_uses_projections(fake_db):
+    asyncio.run(database.stream_graph_data(create_store("networkx")))
+    assert fake_db.users.projections == [database.USER_PROJECTION]
+    assert "password" not in database.USER_PROJECTION
+    assert fake_db.userskills.projections == [database.USERSKILL_PROJECTION]
@@ -0,0 +1,95 @@
+"""
+Double-buffered rebuild tests
+The old graph keeps serving until the new one is swapped in whole
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import pytest
+from app.models import User, Skill, UserSkill
+from app.services.graph_service import GraphService, graph_records
+
+
+def campus(*mentors):
+    skills = [Skill(id="k1", name="Python", category="Programming")]
+    users = [User(id="seeker", name="Seeker", email="s@x.edu", year=1, branch="CSE", skills=[])]
+    for uid in mentors:
+        users.append(User(id=uid, name=uid.title(), email=f"{uid}@x.edu", year=4, branch="CSE",
+                          skills=[UserSkill(user_id=uid, skill_id="k1", skill_name="Python",
+                                          proficiency=4, is_teaching=True)]))
+    return users, skills
+
+
+@pytest.fixture(params=["networkx", "compact"])
+def graph(request):
+    graph = GraphService(backend=request.param)
+    graph.build_graph(*campus("old"))
+    return graph
+
+
+def test_reads_see_old_graph_until_swap(graph):
+    async def scenario():
+        release = asyncio.Event()
+
+        async def load(store):
+            store.load(*graph_records(*campus("new")))
+            await release.wait()
+            return {}
+
+        task = asyncio.create_task(graph.rebuild(load))
+        await asyncio.sleep(0)
+        # Mid-rebuild: the old snapshot is still served in full
+        assert graph.rebuilding
+        assert [m.user_id for m in graph.find_matches("seeker", "python")] == ["old"]
+
+        release.set()
+        result = await task
+        assert not graph.rebuilding
+        assert [m.user_id for m in graph.find_matches("seeker", "python")] == ["new"]
+        assert result["duration_s"] is not None and graph.last_rebuild is result
+
+    asyncio.run(scenario())
+
+
+def test_writes_during_rebuild_are_replayed(graph):
+    async def scenario():
+        release = asyncio.Event()
+
+        async def load(store):
+            store.load(*graph_records(*campus("new")))
+            await release.wait()
+            return {"new@x.edu": "new"}
+
+        task = asyncio.create_task(graph.rebuild(load))
+        await asyncio.sleep(0)
+        graph.register_user(User(id="late", name="Late", email="late@x.edu", year=3, branch="CSE", skills=[]))
+        graph.update_user_skills("late", "k1", "Python", 5, is_teaching=True)
+        release.set()
+        result = await task
+
+        assert result["replayed_writes"] > 0
+        assert [m.user_id for m in graph.find_matches("seeker", "python")] == ["new", "late"]
+        assert graph.find_user_by_email("late@x.edu") == "late"
+        assert graph.find_user_by_email("new@x.edu") == "new"
+
+    asyncio.run(scenario())
+
+
+def test_failed_rebuild_keeps_old_graph(graph):
+    async def load(store):
+        raise RuntimeError("mongo went away")
+
+    version = graph.version
+    with pytest.raises(RuntimeError):
+        asyncio.run(graph.rebuild(load))
+    assert not graph.rebuilding and graph.version == version
+    assert [m.user_id for m in graph.find_matches("seeker", "python")] == ["old"]
+
+
+def test_rebuild_graph_runs_off_loop(graph):
+    result = asyncio.run(graph.rebuild_graph(*campus("a", "b")))
+    assert result["nodes"] == 4 and result["edges"] == 2
+    assert graph.find_user_by_email("b@x.edu") == "b"
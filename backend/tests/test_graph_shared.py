@@ -0,0 +1,143 @@
+"""
+Shared multi-worker graph tests
+Two coordinators in one process stand in for two uvicorn workers
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import numpy as np
+import pytest
+from app.core.config import settings
+from app.models import User
+from app.services.graph_service import GraphService
+from app.services.graph_sync import GraphSyncService
+from app.services import graph_shared
+from app.services.graph_shared import SharedGraphCoordinator
+from benchmarks.synthetic import generate_campus
+
+
+def worker():
+    graph = GraphService(backend="compact")
+    return SharedGraphCoordinator(graph, GraphSyncService(graph))
+
+
+@pytest.fixture(autouse=True)
+def fast_publish(monkeypatch):
+    monkeypatch.setattr(settings, "GRAPH_SHARED_PUBLISH_INTERVAL", 0)
+
+
+def test_workers_converge(tmp_path):
+    users, skills = generate_campus(120, 20, skills_per_user=4, seed=9)
+    shared = str(tmp_path)
+
+    async def scenario():
+        leader, follower = worker(), worker()
+        await leader.start(shared, worker_id="w1")
+        leader.graph.build_graph(users, skills)
+        await leader.tick()
+
+        await follower.start(shared, worker_id="w2")
+        assert (leader.role, follower.role) == ("leader", "follower")
+        assert follower.graph.number_of_edges() == leader.graph.number_of_edges()
+        # The follower serves the published arrays straight from the mapped file
+        assert isinstance(follower.graph.store.edge_user.base, np.memmap)
+
+        # A write in the follower reaches the leader through the log...
+        follower.graph.register_user(User(id="late", name="Late", email="late@x.edu", year=3, branch="CSE", skills=[]))
+        follower.graph.update_user_skills("late", skills[0].id, skills[0].name, 5, is_teaching=True)
+        await leader.tick()
+        assert leader.graph.find_user_by_email("late@x.edu") == "late"
+
+        # ...and a write in the leader reaches the follower without waiting for a publish
+        leader.graph.update_user_profile(users[0].id, name="Renamed")
+        await follower.tick()
+        assert follower.graph.get_user(users[0].id)["name"] == "Renamed"
+        assert follower.generation == leader.generation
+
+        ranked = lambda g: [(m.user_id, m.match_score) for m in g.find_matches(users[1].id, skills[0].name, limit=50)]
+        assert ranked(follower.graph) == ranked(leader.graph)
+        assert follower.graph.leaderboard() == leader.graph.leaderboard()
+
+        # Failover: the follower takes over when the leader goes away
+        await leader.stop()
+        await follower.tick()
+        assert follower.role == "leader"
+        assert follower.graph.find_user_by_email("late@x.edu") == "late"
+        await follower.stop()
+
+    asyncio.run(scenario())
+
+
+def test_restart_adopts_published_snapshot_and_log(tmp_path):
+    users, skills = generate_campus(60, 10, skills_per_user=3, seed=2)
+    shared = str(tmp_path)
+
+    async def scenario():
+        first = worker()
+        await first.start(shared, worker_id="w1")
+        first.graph.build_graph(users, skills)
+        await first.tick()
+        # Logged after the last publish, so only the log carries it
+        first.graph.register_user(User(id="late", name="Late", email="late@x.edu", year=2, branch="ECE", skills=[]))
+        first._task.cancel()
+        first.role = "follower"  # crash: no final publish
+        os.close(first._lock_fd)
+        first._lock_fd = None
+
+        second = worker()
+        await second.start(shared, worker_id="w3")
+        assert second.role == "leader"
+        assert second.graph.user_count() == first.graph.user_count()
+        assert second.graph.find_user_by_email("late@x.edu") == "late"
+        await second.stop()
+
+    asyncio.run(scenario())
+
+
+def test_log_is_compacted_after_publish(tmp_path):
+    users, skills = generate_campus(60, 10, skills_per_user=3, seed=4)
+    shared = str(tmp_path)
+    log_size = lambda: os.path.getsize(os.path.join(shared, SharedGraphCoordinator.LOG))
+
+    async def scenario():
+        leader, follower = worker(), worker()
+        await leader.start(shared, worker_id="w1")
+        await follower.start(shared, worker_id="w2")
+        # Tick by hand only, so the follower really falls behind
+        for coordinator in (leader, follower):
+            coordinator._task.cancel()
+        # The rebuild entry carries every user and skill; publishing drops it from the log
+        await leader.graph.rebuild_graph(users, skills)
+        grown = log_size()
+        await leader.tick()
+        assert leader.log_base == leader.log_offset > 0 and log_size() < grown / 10
+        await follower.tick()
+        assert follower.graph.user_count() == leader.graph.user_count()
+
+        # The follower misses the next publishes, whose entries are dropped; it catches up through the snapshot
+        for i in range(3):
+            leader.graph.update_user_profile(users[i].id, name=f"Renamed {i}")
+            await leader.tick()
+        follower.graph.update_user_profile(users[5].id, name="From follower")
+        await follower._replay()
+        assert follower.generation == leader.generation and follower.log_offset >= follower.log_base
+        assert follower.graph.user_count() == leader.graph.user_count()
+        assert follower.graph.get_user(users[2].id)["name"] == "Renamed 2"
+        # Its own write, made before adopting the snapshot, is replayed onto it
+        assert follower.graph.get_user(users[5].id)["name"] == "From follower"
+        await leader.tick()
+        assert leader.graph.get_user(users[5].id)["name"] == "From follower"
+        await follower.stop()
+        await leader.stop()
+
+    asyncio.run(scenario())
+
+
+def test_start_without_flock_fails_clearly(tmp_path, monkeypatch):
+    monkeypatch.setattr(graph_shared, "fcntl", None)
+    with pytest.raises(RuntimeError, match="GRAPH_SHARED_DIR"):
+        asyncio.run(worker().start(str(tmp_path)))
+    assert not os.listdir(tmp_path)
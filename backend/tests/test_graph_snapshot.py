@@ -0,0 +1,92 @@
+"""
+Graph snapshot tests
+A snapshot written by either backend reloads into an identical graph
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import numpy as np
+import pytest
+from datetime import datetime
+from app.models import User
+from app.services.graph_service import GraphService
+from app.services.graph_sync import GraphSyncService
+from benchmarks.synthetic import generate_campus
+from test_graph_backends import assert_same_answers
+
+
+def campus_service(backend):
+    users, skills = generate_campus(150, 25, skills_per_user=4, seed=5)
+    service = GraphService(backend=backend)
+    service.build_graph(users, skills)
+    # Post-build writes (overlay, removals, re-registration) must survive too
+    service.remove_user(users[3].id)
+    service.register_user(User(id="late", name="Late", email="late@x.edu", year=2, branch="CSE", skills=[]))
+    service.update_user_skills("late", skills[0].id, skills[0].name, 5, is_teaching=True)
+    service.remove_skill(skills[-1].id)
+    service.set_relation("session:s1", users[0].id, users[1].id)
+    return service, users, skills
+
+
+@pytest.mark.parametrize("source", ["networkx", "compact"])
+@pytest.mark.parametrize("target", ["networkx", "compact"])
+def test_round_trip(tmp_path, source, target):
+    original, users, skills = campus_service(source)
+    path = str(tmp_path / "graph.snap")
+    info = asyncio.run(original.save_snapshot(path, meta={"note": "hi"}))
+    assert info["bytes"] == os.path.getsize(path)
+
+    restored = GraphService(backend=target)
+    assert restored.load_snapshot(path) == {"note": "hi"}
+    assert restored.version >= original.version
+    assert restored.find_user_by_email("late@x.edu") == "late"
+    assert restored.find_user_by_email(users[3].email) is None
+    assert restored.get_connection_degree(users[0].id, users[1].id)[0] == 1
+
+    pair = (original, restored) if source == "networkx" else (restored, original)
+    assert_same_answers(*pair, [u for u in users if u.id != users[3].id], skills[:-1])
+
+
+def test_compact_arrays_are_memory_mapped_and_writable(tmp_path):
+    original, users, skills = campus_service("compact")
+    path = str(tmp_path / "graph.snap")
+    asyncio.run(original.save_snapshot(path))
+
+    restored = GraphService(backend="compact")
+    restored.load_snapshot(path)
+    assert isinstance(restored.store.edge_user.base, np.memmap)
+
+    # Copy-on-write: mutating the restored graph never touches the file
+    before = open(path, "rb").read()
+    restored.update_user_profile(users[0].id, year=4)
+    restored.set_user_skill(users[0].id, skills[1].id, 3, is_teaching=True)
+    assert restored.get_user(users[0].id)["year"] == 4
+    assert open(path, "rb").read() == before
+
+
+def test_sync_state_round_trips(tmp_path):
+    path = str(tmp_path / "graph.snap")
+    sync = GraphSyncService(GraphService(backend="compact"))
+    sync._resume_token = {"_data": "8263"}
+    sync._watermark = datetime(2026, 1, 2, 3, 4, 5)
+    sync._userskill_keys = {"us1": ("a", "k1")}
+    asyncio.run(sync.save_snapshot(path))
+
+    warm = GraphSyncService(GraphService(backend="networkx"))
+    assert warm.load_snapshot(path)
+    assert warm.mode == "snapshot"
+    assert warm._resume_token == {"_data": "8263"}
+    assert warm._watermark == datetime(2026, 1, 2, 3, 4, 5)
+    assert warm._userskill_keys == {"us1": ("a", "k1")}
+
+
+def test_missing_or_corrupt_snapshot_is_ignored(tmp_path):
+    sync = GraphSyncService(GraphService(backend="compact"))
+    assert not sync.load_snapshot(str(tmp_path / "absent.snap"))
+    bad = tmp_path / "bad.snap"
+    bad.write_bytes(b"not a snapshot")
+    assert not sync.load_snapshot(str(bad))
+    assert sync.graph.version == 0
@@ -0,0 +1,166 @@
+"""
+Incremental graph sync tests
+Change events are applied as per-document deltas without rebuilding the graph
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import pytest
+from datetime import datetime
+from app.core import database
+from app.services.graph_service import GraphService
+from app.services.graph_sync import GraphSyncService
+
+
+def event(coll, op, doc_id, doc=None):
+    change = {"ns": {"db": "skillsync", "coll": coll}, "operationType": op, "documentKey": {"_id": doc_id}}
+    if doc is not None:
+        change["fullDocument"] = {"_id": doc_id, **doc}
+    return change
+
+
+@pytest.fixture(params=["networkx", "compact"])
+def sync(request):
+    return GraphSyncService(GraphService(backend=request.param))
+
+
+class TestIncrementalSync:
+    """Change stream events -> graph deltas"""
+
+    def seed(self, sync):
+        sync.apply_change(event("skills", "insert", "k1", {"name": "Python", "category": "Programming"}))
+        sync.apply_change(event("users", "insert", "a", {"name": "Asha", "year": 4, "branch": "CSE"}))
+        sync.apply_change(event("users", "insert", "b", {"name": "Bala", "year": 1, "branch": "CSE"}))
+        sync.apply_change(event("userskills", "insert", "us1",
+                                {"userId": "a", "skillId": "k1", "proficiency": 5, "isTeaching": True}))
+
+    def test_inserts_build_the_graph(self, sync):
+        self.seed(sync)
+        graph = sync.graph
+        assert graph.user_count() == 2 and graph.skill_count() == 1 and graph.number_of_edges() == 1
+        assert [m.user_id for m in graph.find_matches("b", "python")] == ["a"]
+        assert sync.events_applied == 4
+
+    def test_update_and_delete_userskill(self, sync):
+        self.seed(sync)
+        graph = sync.graph
+        version = graph.version
+
+        sync.apply_change(event("userskills", "update", "us1",
+                                {"userId": "a", "skillId": "k1", "proficiency": 2, "isLearning": True}))
+        assert graph.version > version
+        assert graph.find_matches("b", "python") == []
+        assert graph.get_user_connections("a")["learning"] == [{"skill": "Python"}]
+
+        sync.apply_change(event("userskills", "delete", "us1"))
+        assert graph.number_of_edges() == 0
+
+    def test_delete_user_and_skill(self, sync):
+        self.seed(sync)
+        graph = sync.graph
+
+        sync.apply_change(event("users", "delete", "a"))
+        assert not graph.has_user("a")
+        assert graph.find_matches("b", "python") == []
+
+        sync.apply_change(event("skills", "delete", "k1"))
+        assert graph.skill_count() == 0
+        assert graph.skill_categories() == {}
+
+    def test_profile_update_keeps_edges(self, sync):
+        self.seed(sync)
+        sync.apply_change(event("users", "replace", "a", {"name": "Asha R", "year": 4, "branch": "ECE"}))
+        match = sync.graph.find_matches("b", "python")[0]
+        assert (match.name, match.branch) == ("Asha R", "ECE")
+
+    def test_edge_for_unknown_user_is_skipped(self, sync):
+        self.seed(sync)
+        sync.apply_change(event("userskills", "insert", "us2",
+                                {"userId": "ghost", "skillId": "k1", "proficiency": 3, "isTeaching": True}))
+        assert not sync.graph.has_user("ghost")
+        assert sync.graph.number_of_edges() == 1
+
+    def test_session_and_connection_events_drive_degrees(self, sync):
+        self.seed(sync)
+        graph = sync.graph
+        sync.apply_change(event("sessions", "insert", "oid1",
+                                {"id": "s1", "mentor_id": "a", "learner_id": "b", "status": "Scheduled"}))
+        assert graph.get_connection_degree("b", "a") == (1, ["Bala", "Asha"])
+
+        sync.apply_change(event("sessions", "update", "oid1",
+                                {"id": "s1", "mentor_id": "a", "learner_id": "b", "status": "Cancelled"}))
+        assert graph.get_connection_degree("b", "a")[0] != 1
+
+        sync.apply_change(event("connection_requests", "insert", "oid2",
+                                {"id": "cr1", "from_user_id": "b", "to_user_id": "a", "status": "accepted"}))
+        assert graph.get_connection_degree("b", "a")[0] == 1
+        sync.apply_change(event("connection_requests", "delete", "oid2"))
+        assert graph.get_connection_degree("b", "a")[0] != 1
+
+
+class PolledCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, field, direction):
+        self.docs.sort(key=lambda doc: str(doc.get(field)))
+        return self
+
+    async def __aiter__(self):
+        for doc in self.docs:
+            yield doc
+
+
+class PolledCollection:
+    def __init__(self):
+        self.docs = []
+
+    def find(self, query):
+        # Lax about types, so the poller's own check is exercised
+        (field, bound), = query.items()
+        return PolledCursor([doc for doc in self.docs
+                             if not isinstance(doc.get(field), datetime) or doc[field] >= bound["$gte"]])
+
+
+class TestPolling:
+    """Watermark polling on a standalone mongod"""
+
+    T0, T1 = datetime(2026, 5, 1, 9), datetime(2026, 5, 1, 10)
+
+    @pytest.fixture
+    def mongo(self, monkeypatch):
+        collections = {name: PolledCollection() for name in
+                       ("skills", "users", "userskills", "sessions", "connection_requests")}
+        monkeypatch.setattr(database.db, "db", collections)
+        return collections
+
+    def user(self, doc_id, stamp, **doc):
+        return {"_id": doc_id, "name": doc_id.title(), "year": 2, "branch": "CSE", "updatedAt": stamp, **doc}
+
+    def test_documents_sharing_the_watermark_are_not_missed(self, sync, mongo):
+        sync._watermark = self.T0
+        mongo["users"].docs.append(self.user("a", self.T1))
+        asyncio.run(sync._poll_once("updatedAt"))
+        # Committed later with the same server timestamp
+        mongo["users"].docs.append(self.user("b", self.T1))
+        asyncio.run(sync._poll_once("updatedAt"))
+
+        assert sync.graph.has_user("a") and sync.graph.has_user("b")
+        assert sync.events_applied == 2 and sync._watermark == self.T1
+
+    def test_bad_documents_are_skipped(self, sync, mongo):
+        sync._watermark = self.T0
+        mongo["users"].docs += [self.user("a", "2026-05-01"), self.user("b", self.T1)]
+        mongo["userskills"].docs.append({"_id": "us1", "skillId": "k1", "updatedAt": self.T1})
+        mongo["skills"].docs.append({"_id": "k1", "name": "Python", "category": "Programming",
+                                     "updatedAt": self.T0})
+        # A string stamp and a userskill without its userId must not stop the poller
+        asyncio.run(sync._poll_once("updatedAt"))
+        mongo["users"].docs.append(self.user("c", datetime(2026, 5, 1, 11)))
+        asyncio.run(sync._poll_once("updatedAt"))
+
+        assert sync.graph.has_user("b") and sync.graph.has_user("c") and sync.graph.has_skill("k1")
+        assert not sync.graph.has_user("a")
@@ -0,0 +1,90 @@
+"""
+Analytics view tests
+Incrementally maintained aggregates must always equal a full recount of the graph
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+import pytest
+from app.models import User
+from app.services.graph_service import GraphService
+from benchmarks.synthetic import generate_campus
+
+
+def full_recount(store):
+    learners = {skill_id: count for skill_id, _, count in store.skill_learner_counts()}
+    mentors = {user_id: (total, count) for user_id, _, total, count in store.user_teaching_totals()}
+    categories = {}
+    for skill_id, attrs in store.iter_skills():
+        categories.setdefault(attrs.get("category", "General"), set()).add(attrs.get("name", "Unknown"))
+    return learners, mentors, categories
+
+
+def assert_views_current(service):
+    views = service.store.views
+    learners, mentors, categories = full_recount(service.store)
+    assert {k: v for k, v in views.learners.items() if v} == {k: v for k, v in learners.items() if v}
+    assert views.mentors == mentors
+    assert {c: set(names) for c, names in service.skill_categories().items()} == categories
+    if service.backend == "networkx":
+        assert service.number_of_edges() == service.G.number_of_edges()
+
+    # Ranked reads match a full sort with the documented tie-breaks
+    expected = sorted(mentors.items(), key=lambda item: (-item[1][0] * item[1][1], item[0]))[:10]
+    assert [(e["user_id"], e["score"]) for e in service.leaderboard()] == [
+        (user_id, total * count) for user_id, (total, count) in expected
+    ]
+    trending = service.trending_skills()
+    assert [t["learners"] for t in trending] == sorted((learners.get(s, 0) for s in views.skills), reverse=True)[:10]
+
+
+@pytest.fixture(params=["networkx", "compact"])
+def service(request):
+    users, skills = generate_campus(200, 30, skills_per_user=4, seed=3)
+    service = GraphService(backend=request.param)
+    service.build_graph(users, skills)
+    return service, users, skills
+
+
+class TestGraphViews:
+    """Aggregates kept current across mutations"""
+
+    def test_views_after_bulk_build(self, service):
+        assert_views_current(service[0])
+
+    def test_views_follow_random_mutations(self, service):
+        service, users, skills = service
+        rng = random.Random(11)
+        for step in range(600):
+            user = rng.choice(users).id
+            skill = rng.choice(skills)
+            op = rng.random()
+            if op < 0.5:
+                service.set_user_skill(user, skill.id, rng.randint(1, 5),
+                                       is_teaching=rng.random() < 0.5, is_learning=rng.random() < 0.5)
+            elif op < 0.8:
+                service.remove_user_skill(user, skill.id)
+            elif op < 0.9:
+                service.remove_user(user)
+                service.register_user(User(id=user, name="Back", email=f"{user}@x.edu", year=2, branch="CSE", skills=[]))
+            else:
+                service.upsert_skill(skill.model_copy(update={"category": rng.choice(["Design", "Programming"])}))
+            if step % 100 == 0:
+                assert_views_current(service)
+        assert_views_current(service)
+
+    def test_removing_skill_drops_its_edges(self, service):
+        service, users, skills = service
+        service.remove_skill(skills[0].id)
+        assert skills[0].name not in [t["skill"] for t in service.trending_skills(limit=100)]
+        assert_views_current(service)
+
+    def test_reads_are_memoized_until_a_write(self, service):
+        service, users, skills = service
+        first = service.store.views.top_mentors(10)
+        assert service.store.views.top_mentors(10) is first
+        service.set_user_skill(users[0].id, skills[0].id, 5, is_teaching=True)
+        assert service.store.views.top_mentors(10) is not first
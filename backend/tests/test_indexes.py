@@ -0,0 +1,68 @@
+"""
+MongoDB index tests
+Declared indexes are created on connect and explain output is checked for COLLSCANs
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+from pymongo.errors import OperationFailure
+from app.core import indexes
+
+
+class FakeCollection:
+    def __init__(self, name, fail=False):
+        self.name = name
+        self.fail = fail
+        self.created = []
+
+    async def create_indexes(self, models):
+        if self.fail:
+            raise OperationFailure("E11000 duplicate key")
+        self.created += [m.document["name"] for m in models]
+        return self.created
+
+
+class FakeDatabase:
+    def __init__(self, failing=()):
+        self.collections = {}
+        self.failing = failing
+        self.explained = []
+
+    def __getitem__(self, name):
+        return self.collections.setdefault(name, FakeCollection(name, name in self.failing))
+
+    async def command(self, name, command, verbosity=None):
+        self.explained.append(command)
+        indexed = command["find"] != "events"
+        stage = {"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}} if indexed else {"stage": "COLLSCAN"}
+        return {"queryPlanner": {"winningPlan": {"queryPlan": stage}}}
+
+
+def test_ensure_creates_declared_indexes():
+    database = FakeDatabase()
+    created = asyncio.run(indexes.ensure_indexes(database))
+    assert "id_unique" in created["events"]
+    assert {"to_user_created", "from_user_created"} <= set(created["connection_requests"])
+    assert "userId_skillId" in created["userskills"]
+
+
+def test_failing_collection_is_skipped():
+    created = asyncio.run(indexes.ensure_indexes(FakeDatabase(failing=("events",))))
+    assert "events" not in created and "sessions" in created
+
+
+def test_explain_flags_collscans():
+    database = FakeDatabase()
+    report = asyncio.run(indexes.explain_queries(database))
+    flagged = {entry["query"] for entry in report if entry["collscan"]}
+    assert flagged == {"EventService.get_by_id", "EventService.get_page"}
+    paged = next(c for c in database.explained if c["find"] == "connection_requests" and "$or" in c["filter"])
+    assert list(paged["sort"]) == ["created_at", "id"]
+
+
+def test_plan_stages_walks_nested_plans():
+    plan = {"stage": "LIMIT", "inputStage": {"stage": "OR", "inputStages": [{"stage": "IXSCAN"}, {"stage": "COLLSCAN"}]}}
+    assert indexes.plan_stages(plan) == ["LIMIT", "OR", "IXSCAN", "COLLSCAN"]
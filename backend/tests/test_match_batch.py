@@ -0,0 +1,92 @@
+"""
+Batched match API tests
+/match/batch must agree with /match/find for every query, whatever the grouping
+"""
+
+import sys
+import os
+import json
+import asyncio
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core.config import settings
+from app.models import MatchRequest
+from app.services.graph_service import graph_service
+
+client = TestClient(app)
+
+QUERIES = [
+    {"user_id": "u3", "skill_name": "Machine Learning", "limit": 5},
+    {"user_id": "u1", "skill_name": "React", "limit": 2},
+    {"user_id": "u2", "skill_name": "machine learning", "limit": 1},
+    {"user_id": "u6", "skill_name": "Machine Learning", "limit": 5},
+    {"user_id": "u3", "skill_name": "DSA", "limit": 5},
+    {"user_id": "u3", "skill_name": "Basket Weaving", "limit": 5},
+    {"user_id": "nobody", "skill_name": "Python", "limit": 3},
+]
+
+
+class TestMatchBatch:
+    """NDJSON output of the batched match endpoint"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, monkeypatch):
+        client.post("/demo/seed")
+        graph_service.match_cache.clear()
+        # Small chunks so one skill group spans several executor jobs
+        monkeypatch.setattr(settings, "MATCH_BATCH_CHUNK_SIZE", 1)
+
+    def batch(self, queries):
+        response = client.post("/match/batch", json={"queries": queries})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        return [json.loads(line) for line in response.text.splitlines()]
+
+    def test_matches_single_queries(self):
+        rows = self.batch(QUERIES)
+        assert sorted(row["index"] for row in rows) == list(range(len(QUERIES)))
+        for row in rows:
+            query = QUERIES[row["index"]]
+            assert row["user_id"] == query["user_id"]
+            assert row["skill_name"] == query["skill_name"]
+            assert row["matches"] == client.post("/match/find", json=query).json()
+
+    def test_grouped_by_skill(self):
+        rows = self.batch(QUERIES)
+        skills = [QUERIES[row["index"]]["skill_name"].lower() for row in rows]
+        # Each skill's rows are contiguous in the stream
+        seen = []
+        for skill in skills:
+            if not seen or seen[-1] != skill:
+                assert skill not in seen
+                seen.append(skill)
+
+    def test_unknown_skill_is_empty(self):
+        rows = self.batch([{"user_id": "u1", "skill_name": "Basket Weaving"}])
+        assert rows == [{"index": 0, "user_id": "u1", "skill_name": "Basket Weaving", "matches": []}]
+
+    def test_does_not_fill_match_cache(self):
+        self.batch(QUERIES)
+        assert graph_service.match_cache.stats()["size"] == 0
+
+    def test_mutation_between_chunks(self):
+        """Mentor columns are rebuilt when the graph changes mid-group"""
+        async def run():
+            queries = [MatchRequest(**q) for q in QUERIES[:1] * 2]
+            chunks = []
+            async for rows in graph_service.find_matches_batch(queries):
+                chunks.append(rows)
+                graph_service.update_user_skills("u5", skill_id="4", skill_name="Machine Learning",
+                                                 proficiency=5, is_teaching=True, is_learning=False)
+            return chunks
+
+        first, second = asyncio.run(run())
+        assert "u5" not in [m["user_id"] for m in first[0]["matches"]]
+        assert "u5" in [m["user_id"] for m in second[0]["matches"]]
+
+    def test_empty_batch(self):
+        assert self.batch([]) == []
+
@@ -0,0 +1,65 @@
+"""
+Match result cache tests
+Repeated /match/find calls are served from cache until the graph version changes
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core.cache import TTLCache
+from app.services.graph_service import graph_service
+
+client = TestClient(app)
+
+
+class TestMatchCache:
+    """Graph-version invalidation of cached matches"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        client.post("/demo/seed")
+        graph_service.match_cache.clear()
+
+    def find(self, user_id="u3", skill="Machine Learning"):
+        return client.post("/match/find", json={"user_id": user_id, "skill_name": skill, "limit": 5}).json()
+
+    def test_repeat_query_is_a_hit(self):
+        before = graph_service.match_cache.stats()["hits"]
+        first = self.find()
+        second = self.find()
+        assert first == second
+        assert graph_service.match_cache.stats()["hits"] == before + 1
+
+    def test_mutation_invalidates(self):
+        version = graph_service.version
+        assert "u5" not in [m["user_id"] for m in self.find()]
+
+        client.post("/user/u5/skills", json={
+            "skill_id": "4", "skill_name": "Machine Learning", "proficiency": 5, "is_teaching": True
+        })
+
+        assert graph_service.version > version
+        assert "u5" in [m["user_id"] for m in self.find()]
+
+    def test_stats_exposes_counters(self):
+        self.find()
+        data = client.get("/stats").json()
+        assert data["graph_version"] == graph_service.version
+        assert {"hits", "misses", "evictions"} <= set(data["match_cache"])
+
+    def test_lru_eviction_and_ttl(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is None and cache.get("a") == 1
+        assert cache.evictions == 1
+
+        expired = TTLCache(maxsize=2, ttl=-1)
+        expired.set("a", 1)
+        assert expired.get("a") is None and expired.expirations == 1
@@ -0,0 +1,80 @@
+"""
+Metrics endpoint tests
+/metrics exposes per-route latency histograms, graph size and process gauges
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core import metrics as metrics_module
+from app.core.metrics import Histogram, MetricsRegistry, http_latency, http_requests
+
+client = TestClient(app)
+
+
+def no_proc(path, *args, **kwargs):
+    raise FileNotFoundError(path)
+
+
+class TestMetricsEndpoint:
+    """Scrapes after real requests"""
+
+    def test_route_template_labels(self):
+        client.post("/demo/seed")
+        before = http_requests.value(method="GET", route="/user/{user_id}", status=200)
+        client.get("/user/u1")
+        client.get("/user/u2")
+        assert http_requests.value(method="GET", route="/user/{user_id}", status=200) == before + 2
+        assert http_latency.count(method="GET", route="/user/{user_id}") >= 2
+
+    def test_exposition(self):
+        client.get("/health")
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        body = response.text
+        assert '# TYPE http_request_duration_seconds histogram' in body
+        assert 'http_request_duration_seconds_bucket{method="GET",route="/health",le="+Inf"}' in body
+        for name in ("http_requests_in_flight", "graph_nodes", "graph_edges", "process_resident_memory_bytes"):
+            assert f"\n{name}" in body
+
+    def test_unmatched_routes_share_a_label(self):
+        client.get("/no/such/path/1")
+        client.get("/no/such/path/2")
+        assert http_requests.value(method="GET", route="unmatched", status=404) >= 2
+
+    def test_health_reports_rss(self):
+        assert client.get("/health").json()["memory_usage_mb"] > 0
+
+    def test_rss_is_optional(self, monkeypatch):
+        # Windows has neither /proc nor the resource module
+        monkeypatch.setattr(metrics_module, "resource", None)
+        monkeypatch.setattr(metrics_module, "open", no_proc, raising=False)
+        assert metrics_module.peak_rss_bytes() is None and metrics_module.process_rss_bytes() is None
+        assert client.get("/health").json()["memory_usage_mb"] is None
+        response = client.get("/metrics")
+        assert response.status_code == 200 and "process_resident_memory_bytes" not in response.text
+
+
+def test_histogram_buckets_and_quantile():
+    hist = Histogram("t_seconds", "test", buckets=(0.1, 1.0))
+    for value in (0.05, 0.05, 0.5, 5.0):
+        hist.observe(value, route="/x")
+    assert hist.count(route="/x") == 4
+    assert hist.quantile(0.5, route="/x") == 0.1
+    assert hist.quantile(0.99, route="/x") == float("inf")
+    lines = hist.render()
+    assert 't_seconds_bucket{route="/x",le="1"} 3' in lines
+    assert 't_seconds_count{route="/x"} 4' in lines
+
+
+def test_collectors_run_at_scrape_time():
+    registry = MetricsRegistry()
+    size = [1]
+    registry.collect(lambda: [("queue", "q", {"pool": "read"}, size[0])])
+    assert 'queue{pool="read"} 1' in registry.render()
+    size[0] = 7
+    assert 'queue{pool="read"} 7' in registry.render()
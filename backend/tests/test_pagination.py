@@ -0,0 +1,98 @@
+"""
+Pagination tests
+Keyset cursors on /events, /sessions and /match/requests, plus NDJSON exports
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app, event_service, session_service, connection_service
+from app.core.pagination import Keyset, decode_cursor, encode_cursor, InvalidCursor, projection
+from app.models import Event, Session, ConnectionRequestStatus
+
+client = TestClient(app)
+
+
+def event(i):
+    return Event(id=f"e{i:03d}", title=f"Event {i}", description="", time="Today", location="Lab",
+                 type="Workshop", participants=0, max_participants=10, host="Host", tags=[])
+
+
+def request(i, to_user="u1", from_user="u2"):
+    return ConnectionRequestStatus(id=f"r{i:03d}", from_user_id=from_user, from_user_name="X", to_user_id=to_user,
+                                   skill_name="Python", status="pending", created_at=f"2026-01-{i % 28 + 1:02d}T00:00:00")
+
+
+class TestPagedEndpoints:
+    """In-memory (demo mode) paging through the API"""
+
+    def setup_method(self):
+        event_service.events = [event(i) for i in reversed(range(25))]
+        session_service.sessions = [
+            Session(id=f"s{i:02d}", mentor_name="M", topic="T", date="d", time="t", status="Scheduled", duration="1 hr")
+            for i in range(3)
+        ]
+        connection_service.requests = [request(i) for i in range(30)] + [request(99, to_user="u2", from_user="u1")]
+
+    def test_walk_events(self):
+        seen, cursor = [], None
+        while True:
+            res = client.get("/events", params={"limit": 10, **({"cursor": cursor} if cursor else {})})
+            assert res.status_code == 200
+            seen += [e["id"] for e in res.json()]
+            cursor = res.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+        assert seen == [f"e{i:03d}" for i in range(25)]
+
+    def test_last_full_page_has_no_cursor(self):
+        res = client.get("/sessions", params={"limit": 3})
+        assert len(res.json()) == 3 and "X-Next-Cursor" not in res.headers
+
+    def test_bad_cursor_and_limit(self):
+        assert client.get("/events", params={"cursor": "not-a-cursor"}).status_code == 400
+        assert client.get("/events", params={"limit": 0}).status_code == 422
+
+    def test_ndjson_export(self):
+        res = client.get("/events", params={"format": "ndjson"})
+        assert res.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in res.text.splitlines()]
+        assert len(rows) == 25 and rows[0]["id"] == "e000"
+
+    def test_connection_requests_newest_first(self):
+        first = client.get("/match/requests/u1", params={"limit": 20}).json()
+        assert len(first["incoming"]) == 20 and [r["id"] for r in first["outgoing"]] == ["r099"]
+        assert first["next_cursor"]["outgoing"] is None
+        dates = [r["created_at"] for r in first["incoming"]]
+        assert dates == sorted(dates, reverse=True)
+
+        rest = client.get("/match/requests/u1", params={
+            "limit": 20, "incoming_cursor": first["next_cursor"]["incoming"]
+        }).json()
+        ids = [r["id"] for r in first["incoming"] + rest["incoming"]]
+        assert len(ids) == len(set(ids)) == 30
+        assert rest["next_cursor"]["incoming"] is None
+
+
+def test_cursor_roundtrip():
+    assert decode_cursor(encode_cursor(["2026-01-01", "r1"]), 2) == ["2026-01-01", "r1"]
+    with pytest.raises(InvalidCursor):
+        decode_cursor(encode_cursor(["r1"]), 2)
+
+
+def test_keyset_filter_breaks_ties():
+    pages = Keyset(("created_at", "id"), descending=True)
+    assert pages.after(encode_cursor(["t", "r5"])) == {"$or": [
+        {"created_at": {"$lt": "t"}},
+        {"created_at": "t", "id": {"$lt": "r5"}},
+    ]}
+    assert pages.sort() == [("created_at", -1), ("id", -1)]
+    assert Keyset(("id",)).after(None) == {}
+
+
+def test_projection_drops_id():
+    assert projection(Session)["_id"] == 0 and set(projection(Session)) - {"_id"} == set(Session.model_fields)
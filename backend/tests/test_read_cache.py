@@ -0,0 +1,151 @@
+"""
+Read cache tests
+/events and /sessions pages are served pre-encoded until a write drops them
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+from datetime import datetime
+import pytest
+from types import SimpleNamespace
+from fastapi.testclient import TestClient
+from app.core import database
+from app.core.cache import ResponseCache
+from app.main import app, event_service, session_service
+
+client = TestClient(app)
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, keys):
+        field, direction = keys[0]
+        self.docs = sorted(self.docs, key=lambda d: d[field], reverse=direction < 0)
+        return self
+
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        return self
+
+    async def to_list(self, length):
+        return self.docs[:length]
+
+
+class FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+        self.finds = 0
+
+    def find(self, query, projection=None):
+        self.finds += 1
+        docs = [d for d in self.docs if all(d.get(k) > v["$gt"] if isinstance(v, dict) else d.get(k) == v
+                                            for k, v in query.items())]
+        return FakeCursor([{k: v for k, v in d.items() if k != "_id"} for d in docs])
+
+    async def find_one(self, query):
+        return next((dict(d) for d in self.docs if d["id"] == query["id"]), None)
+
+    async def update_one(self, query, update, upsert=False):
+        doc = next((d for d in self.docs if d["id"] == query["id"]), None)
+        if doc is None and upsert:
+            doc = dict(update["$setOnInsert"])
+            self.docs.append(doc)
+        if doc is None:
+            return SimpleNamespace(modified_count=0)
+        for field in update.get("$currentDate", {}):
+            doc[field] = datetime.utcnow()
+        if "$set" in update:
+            doc.update(update["$set"])
+        for field, amount in update.get("$inc", {}).items():
+            doc[field] += amount
+        return SimpleNamespace(modified_count=1)
+
+    async def delete_one(self, query):
+        before = len(self.docs)
+        self.docs = [d for d in self.docs if d["id"] != query["id"]]
+        return SimpleNamespace(deleted_count=before - len(self.docs))
+
+
+def event_doc(i):
+    return {"_id": i, "id": f"e{i}", "title": "T", "description": "", "time": "now", "location": "Lab",
+            "type": "Workshop", "participants": 0, "max_participants": 5, "host": "H", "tags": []}
+
+
+def session_doc(i):
+    return {"_id": i, "id": f"s{i}", "mentor_name": "M", "topic": "T", "date": "d", "time": "t",
+            "status": "Scheduled", "duration": "1 hr"}
+
+
+@pytest.fixture
+def mongo(monkeypatch):
+    collections = {
+        "events": FakeCollection([event_doc(i) for i in range(3)]),
+        "sessions": FakeCollection([session_doc(i) for i in range(3)]),
+    }
+    monkeypatch.setattr(database.db, "db", collections)
+    event_service.cache.invalidate()
+    session_service.cache.invalidate()
+    return collections
+
+
+def test_repeat_reads_hit_the_cache(mongo):
+    first = client.get("/events")
+    second = client.get("/events")
+    assert first.json() == second.json() and len(first.json()) == 3
+    assert mongo["events"].finds == 1
+    assert event_service.cache.stats()["hits"] >= 1
+
+    # Different page parameters are separate entries
+    client.get("/events", params={"limit": 2})
+    assert mongo["events"].finds == 2
+
+
+def test_event_writes_invalidate(mongo):
+    client.get("/events")
+    client.post("/events/e1/register", params={"user_id": "u1"})
+    data = client.get("/events").json()
+    assert next(e for e in data if e["id"] == "e1")["participants"] == 1
+    assert mongo["events"].finds == 2
+
+
+@pytest.mark.parametrize("write", [
+    lambda: client.put("/sessions/s1", params={"status": "Completed"}),
+    lambda: client.delete("/sessions/s1"),
+])
+def test_session_writes_invalidate(mongo, write):
+    before = client.get("/sessions").json()
+    write()
+    after = client.get("/sessions").json()
+    assert before != after and mongo["sessions"].finds == 2
+
+
+def test_cached_body_matches_model_encoding(mongo):
+    body = client.get("/sessions").content
+    assert json.loads(body)[0] == {k: v for k, v in session_doc(0).items() if k != "_id"} | {
+        "mentor_id": None, "learner_id": None, "starts_at": None, "ends_at": None}
+
+
+def test_load_racing_a_write_is_not_served():
+    import asyncio
+    cache = ResponseCache(maxsize=4, ttl=60)
+    loads = []
+
+    async def scenario():
+        async def stale_load():
+            loads.append("stale")
+            cache.invalidate()  # a write lands while this load is in flight
+            return "stale"
+
+        async def fresh_load():
+            loads.append("fresh")
+            return "fresh"
+
+        assert await cache.get_or_load("k", stale_load) == "stale"
+        return await cache.get_or_load("k", fresh_load)
+
+    assert asyncio.run(scenario()) == "fresh" and loads == ["stale", "fresh"]
@@ -0,0 +1,67 @@
+"""
+Request middleware tests
+Pure ASGI request-id/timing middleware and sampled request logging
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import logging
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from app.middleware.request_id import RequestIDMiddleware
+from app.main import app
+
+
+def make_app(sample_rate):
+    test_app = FastAPI()
+    test_app.add_middleware(RequestIDMiddleware, sample_rate=sample_rate)
+
+    @test_app.get("/echo")
+    async def echo(request: Request):
+        return {"request_id": request.state.request_id}
+
+    @test_app.get("/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    return test_app
+
+
+def finished(caplog):
+    return [r for r in caplog.records if r.name == "middleware" and r.getMessage() == "Request finished"]
+
+
+def test_request_id_header_matches_state():
+    res = TestClient(app).get("/health")
+    assert len(res.headers["X-Request-ID"]) == 36
+
+    res = TestClient(make_app(1.0)).get("/echo")
+    assert res.json()["request_id"] == res.headers["X-Request-ID"]
+
+
+def test_full_sampling_logs_every_request(caplog):
+    client = TestClient(make_app(1.0))
+    with caplog.at_level(logging.INFO, logger="middleware"):
+        for _ in range(3):
+            client.get("/echo")
+    records = finished(caplog)
+    assert len(records) == 3
+    assert records[0].status_code == 200 and records[0].duration.endswith("s")
+
+
+def test_unsampled_requests_still_log_errors(caplog):
+    client = TestClient(make_app(0.0), raise_server_exceptions=False)
+    with caplog.at_level(logging.INFO, logger="middleware"):
+        client.get("/echo")
+        assert client.get("/boom").status_code == 500
+    records = finished(caplog)
+    assert [r.status_code for r in records] == [500]
+
+
+@pytest.mark.parametrize("rate", [0.0, 1.0])
+def test_sampling_does_not_affect_headers(rate):
+    res = TestClient(make_app(rate)).get("/echo")
+    assert res.status_code == 200 and "X-Request-ID" in res.headers
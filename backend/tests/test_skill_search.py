@@ -0,0 +1,102 @@
+"""
+Skill search tests
+Prefix autocomplete, acronyms and typo-tolerant skill resolution
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.models import MatchRequest
+from app.services.graph_service import GraphService
+from app.services.skill_search import SkillSearchIndex, normalize, trigrams
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def index():
+    index = SkillSearchIndex()
+    for i, name in enumerate(["Python", "Machine Learning", "Deep Learning", "Java", "JavaScript", "Node.js"]):
+        index.add(f"k{i}", name)
+    return index
+
+
+def test_normalize_and_trigrams():
+    assert normalize("Machine-Learning") == "machine learning"
+    assert normalize("  Node.js ") == "node js"
+    assert trigrams("py") == {"  p", " py", "py "}
+
+
+def test_exact_prefix_and_acronym(index):
+    assert index.search("ML")[0][:2] == ("k1", "exact")
+    assert index.search("machine-learning")[0] == ("k1", "exact", 1.0)
+    assert [hit[0] for hit in index.search("jav")[:2]] == ["k3", "k4"]
+    assert {hit[0] for hit in index.search("learn") if hit[1] == "prefix"} == {"k1", "k2"}
+
+
+def test_typos_resolve(index):
+    assert index.resolve("Pyhton") == "k0"
+    assert index.resolve("Javascrpt") == "k4"
+    assert index.resolve("zzzz") is None
+    assert index.search("Pyhton")[0][1] == "fuzzy"
+
+
+def test_popularity_breaks_ties(index):
+    index.add("k9", "Learning Theory")
+    assert index.resolve("learning", popularity={"k2": 5}) == "k2"
+
+
+def test_rename_and_remove(index):
+    index.add("k0", "Rust")
+    assert index.resolve("python") is None and index.resolve("rust") == "k0"
+    index.remove("k1")
+    assert index.search("ml") == [] and index.prefix("mach") == set()
+    index.remove("k0")
+    assert len(index) == 4
+
+
+@pytest.mark.parametrize("backend", ["networkx", "compact"])
+def test_find_matches_fuzzy_fallback(backend):
+    from test_graph_rebuild import campus
+    service = GraphService(backend=backend)
+    service.build_graph(*campus("ada", "bob"))
+    exact = [m.user_id for m in service.find_matches("seeker", "Python")]
+    assert exact and all(m.via_skill is None for m in service.find_matches("seeker", "Python"))
+    fuzzy = service.find_matches("seeker", "pyhton")
+    assert [m.user_id for m in fuzzy] == exact and {m.via_skill for m in fuzzy} == {"Python"}
+    assert service.find_matches("seeker", "Haskell") == []
+
+    async def batch():
+        queries = [MatchRequest(user_id="seeker", skill_name="pyhton"),
+                   MatchRequest(user_id="seeker", skill_name="Python")]
+        return [row async for rows in service.find_matches_batch(queries) for row in rows]
+
+    fuzzy, plain = sorted(asyncio.run(batch()), key=lambda row: row["index"])
+    assert {m["via_skill"] for m in fuzzy["matches"]} == {"Python"}
+    assert all(m["via_skill"] is None for m in plain["matches"])
+
+
+@pytest.mark.parametrize("backend", ["networkx", "compact"])
+def test_index_follows_skill_writes(backend):
+    from test_graph_rebuild import campus
+    service = GraphService(backend=backend)
+    service.build_graph(*campus("ada"))
+    service.update_user_skills("ada", "k2", "Machine Learning", 4, is_teaching=True)
+    assert service.search_skills("ML")[0]["skill_id"] == "k2"
+    service.remove_skill("k2")
+    assert service.search_skills("ML") == []
+
+
+def test_search_endpoint():
+    client.post("/demo/seed")
+    res = client.get("/skills/search", params={"q": "ml"})
+    assert res.status_code == 200
+    top = res.json()["skills"][0]
+    assert top["name"] == "Machine Learning" and top["match"] == "exact"
+    assert client.get("/skills/search", params={"q": "Pyhton"}).json()["skills"][0]["name"] == "Python"
+    assert client.get("/skills/search").status_code == 422
@@ -0,0 +1,122 @@
+"""
+Skill similarity tests
+Sparse co-occurrence, per-version caching, /skills/{id}/related and related-skill match expansion
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.models import MatchRequest, Skill, User, UserSkill
+from app.services import skill_similarity
+from app.services.graph_service import GraphService
+from app.services.skill_similarity import cooccurrence, related_table
+
+client = TestClient(app)
+
+
+def holder(uid, teaches=(), learns=(), year=4):
+    skills = [UserSkill(user_id=uid, skill_id=k, skill_name=k, proficiency=4, is_teaching=True) for k in teaches]
+    skills += [UserSkill(user_id=uid, skill_id=k, skill_name=k, proficiency=1, is_learning=True) for k in learns]
+    return User(id=uid, name=uid.title(), email=f"{uid}@x.edu", year=year, branch="CSE", skills=skills)
+
+
+def flask_campus():
+    """Nobody teaches Flask, but the people learning it also know Python"""
+    skills = [Skill(id="py", name="Python", category="Programming"), Skill(id="fl", name="Flask", category="Backend"),
+              Skill(id="rs", name="Rust", category="Programming")]
+    users = [
+        User(id="seeker", name="Seeker", email="s@x.edu", year=1, branch="CSE", skills=[]),
+        holder("ada", teaches=["py"], learns=["fl"]),
+        holder("bob", learns=["py", "fl"]),
+        holder("cy", teaches=["py"]),
+        holder("dan", teaches=["rs"]),
+    ]
+    return users, skills
+
+
+def test_cooccurrence_is_AtA(monkeypatch):
+    monkeypatch.setattr(skill_similarity, "PAIR_CHUNK", 50)
+    rng = np.random.default_rng(7)
+    keys = np.unique(rng.integers(0, 300, 1500) * 40 + rng.integers(0, 40, 1500))
+    users, skills = (keys // 40).astype(np.int32), (keys % 40).astype(np.int32)
+    dense = np.zeros((300, 40), dtype=np.int64)
+    dense[users, skills] = 1
+    expected = dense.T @ dense
+
+    rows, cols, shared, degree = cooccurrence(users, skills, 40)
+    product = np.diag(degree)
+    product[rows, cols] = shared
+    assert (product == expected).all()
+
+
+def test_related_table_keeps_top_n():
+    # Skill 0 is held with 1 by three users and with 2 by one
+    users = np.array([0, 0, 1, 1, 2, 2, 2, 3], dtype=np.int32)
+    skills = np.array([0, 1, 0, 1, 0, 1, 2, 3], dtype=np.int32)
+    table = related_table(users, skills, 4, top_n=1)
+    assert table.indptr.tolist() == [0, 1, 2, 3, 3]
+    assert table.neighbors.tolist() == [1, 0, 0] and table.shared.tolist() == [3, 3, 1]
+    assert table.scores[0] == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize("backend", ["networkx", "compact"])
+def test_related_skills_cached_per_version(backend):
+    service = GraphService(backend=backend)
+    service.build_graph(*flask_campus())
+
+    async def scenario():
+        first = await service.skill_similarity()
+        assert await service.skill_similarity() is first
+        related = await service.related_skills("fl")
+        assert [r["skill_id"] for r in related] == ["py"] and related[0]["shared_users"] == 2
+        assert await service.related_skills("rs") == []
+
+        service.update_user_skills("dan", "fl", "Flask", 1, is_learning=True)
+        assert (await service.skill_similarity()).version == service.version != first.version
+        assert {r["skill_id"] for r in await service.related_skills("fl")} == {"py", "rs"}
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("backend", ["networkx", "compact"])
+def test_find_matches_expands_to_related_skills(backend):
+    service = GraphService(backend=backend)
+    service.build_graph(*flask_campus())
+    assert service.find_matches("seeker", "Flask", include_related=True) == []
+
+    asyncio.run(service.skill_similarity())
+    matches = service.find_matches("seeker", "Flask", include_related=True)
+    assert {m.user_id for m in matches} == {"ada", "cy"}
+    assert {m.via_skill for m in matches} == {"Python"}
+    assert service.find_matches("seeker", "Flask") == []
+    # Direct mentors are never tagged
+    assert all(m.via_skill is None for m in service.find_matches("seeker", "Python", include_related=True))
+
+    async def batch():
+        queries = [MatchRequest(user_id="seeker", skill_name="Flask", include_related=True),
+                   MatchRequest(user_id="seeker", skill_name="Flask")]
+        return [row async for rows in service.find_matches_batch(queries) for row in rows]
+
+    related, plain = asyncio.run(batch())
+    assert {m["user_id"] for m in related["matches"]} == {"ada", "cy"} and plain["matches"] == []
+
+
+def test_related_endpoint():
+    client.post("/demo/seed")
+    res = client.get("/skills/4/related")
+    assert res.status_code == 200
+    related = res.json()["related"]
+    # Machine Learning holders: u1, u2, u3, u6; React: u1, u2, u6; Python: u1, u3, u4, u6
+    assert [r["name"] for r in related[:2]] == ["React", "Python"]
+    assert [r["shared_users"] for r in related[:2]] == [3, 3] and related[0]["score"] > related[1]["score"]
+    assert client.get("/skills/nope/related").status_code == 404
+
+    matches = client.post("/match/find", json={"user_id": "u5", "skill_name": "UI/UX Design",
+                                               "include_related": True}).json()
+    assert matches and all(m["via_skill"] for m in matches)
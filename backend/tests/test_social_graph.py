@@ -0,0 +1,121 @@
+"""
+Connection degree tests
+Degrees come from sessions and accepted connections, found by a bounded BFS
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.graph_service import GraphService
+from app.services.social_graph import SocialGraph
+from benchmarks.synthetic import generate_campus
+
+client = TestClient(app)
+
+
+def chain(*users):
+    """a - b - c - ... as consecutive relations"""
+    social = SocialGraph()
+    social.load((f"r{i}", a, b) for i, (a, b) in enumerate(zip(users, users[1:])))
+    return social
+
+
+class TestSocialGraph:
+    """Bounded multi-target search"""
+
+    def test_degrees_up_to_three_hops(self):
+        social = chain("a", "b", "c", "d", "e")
+        found = social.degrees("a", ["b", "c", "d", "e", "zz"])
+        assert found == {"b": ["a", "b"], "c": ["a", "b", "c"], "d": ["a", "b", "c", "d"]}
+
+    def test_shortest_path_wins(self):
+        social = chain("a", "b", "c", "d")
+        social.set_relation("shortcut", "a", "d")
+        assert social.degrees("a", ["d"]) == {"d": ["a", "d"]}
+        social.remove_relation("shortcut")
+        assert social.degrees("a", ["d"]) == {"d": ["a", "b", "c", "d"]}
+
+    def test_relations_are_idempotent(self):
+        social = chain("a", "b")
+        assert not social.set_relation("r0", "a", "b")
+        social.set_relation("r1", "a", "b")       # second session, same pair
+        social.remove_relation("r0")
+        assert social.degrees("a", ["b"]) == {"b": ["a", "b"]}
+        social.remove_relation("r1")
+        assert social.degrees("a", ["b"]) == {} and social.adj == {}
+
+    def test_seeker_ball_is_cached_until_a_change(self):
+        social = chain("a", "b", "c")
+        social.degrees("a", ["c"])
+        social.degrees("a", ["b"])
+        assert social.cache_stats()["hits"] == 1
+        social.set_relation("new", "c", "d")
+        assert social.degrees("a", ["d"]) == {"d": ["a", "b", "c", "d"]}
+
+
+class TestMatchDegrees:
+    """find_matches reports real degrees and name paths"""
+
+    @pytest.mark.parametrize("backend", ["networkx", "compact"])
+    def test_match_results_use_social_paths(self, backend):
+        users, skills = generate_campus(80, 6, skills_per_user=3, seed=4)
+        graph = GraphService(backend=backend)
+        graph.build_graph(users, skills)
+        seeker = users[0].id
+        mentors = [m.user_id for m in graph.find_matches(seeker, skills[0].name, limit=3)]
+        assert len(mentors) == 3
+
+        graph.set_relation("s1", seeker, mentors[0])
+        graph.set_relation("c1", seeker, "hub")
+        graph.set_relation("c2", "hub", mentors[1])
+        matches = {m.user_id: m for m in graph.find_matches(seeker, skills[0].name, limit=3)}
+        assert matches[mentors[0]].connection_degree == 1
+        assert matches[mentors[1]].connection_degree == 2
+        # Middle of the path is the mutual connection the frontend shows
+        assert matches[mentors[1]].connection_path[1] == "Unknown"
+        assert graph.get_connection_degree(seeker, mentors[1]) == (2, matches[mentors[1]].connection_path)
+
+        # Out of network: no path, ranked after every real degree
+        assert matches[mentors[2]].connection_degree == SocialGraph.OUT_OF_NETWORK > SocialGraph.MAX_DEGREE
+        assert matches[mentors[2]].connection_path == []
+        assert graph.get_connection_degree(seeker, mentors[2]) == (SocialGraph.OUT_OF_NETWORK, [])
+
+
+class TestRelationEndpoints:
+    """Sessions and accepted connections feed the degree layer"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        client.post("/demo/seed")
+
+    def test_booked_session_makes_first_degree(self):
+        res = client.post("/sessions/book", json={
+            "mentor_id": "u1", "learner_id": "u2", "topic": "ML", "date": "2026-01-10", "time": "10:00"
+        })
+        session_id = res.json()["session_id"]
+        matches = client.post("/match/find", json={"user_id": "u2", "skill_name": "Machine Learning", "limit": 5}).json()
+        rahul = next(m for m in matches if m["user_id"] == "u1")
+        assert rahul["connection_degree"] == 1
+
+        client.delete(f"/sessions/{session_id}")
+        matches = client.post("/match/find", json={"user_id": "u2", "skill_name": "Machine Learning", "limit": 5}).json()
+        assert next(m for m in matches if m["user_id"] == "u1")["connection_degree"] != 1
+
+    def test_accepted_connection_links_users(self):
+        request_id = client.post("/match/connect", json={
+            "from_user_id": "u3", "to_user_id": "u1", "skill_name": "Machine Learning"
+        }).json()["request_id"]
+        res = client.put(f"/match/requests/{request_id}", params={"status": "accepted"})
+        assert res.status_code == 200
+        from app.services.graph_service import graph_service
+        assert graph_service.get_connection_degree("u3", "u1")[0] == 1
+
+        client.put(f"/match/requests/{request_id}", params={"status": "rejected"})
+        assert graph_service.get_connection_degree("u3", "u1")[0] != 1
+
+    def test_unknown_request_is_404(self):
+        assert client.put("/match/requests/nope", params={"status": "accepted"}).status_code == 404
@@ -378,7 +378,7 @@ export default function MatchesPage() {
                                         <div className="flex items-center gap-2 mb-4 text-sm text-muted-foreground">
                                             <Network className="w-4 h-4 text-primary" />
                                             <span>
-                                                {match.connectionDegree === 1 ? "1st" : match.connectionDegree === 2 ? "2nd" : "3rd"} degree
+                                                {match.connectionDegree === 1 ? "1st degree" : match.connectionDegree === 2 ? "2nd degree" : match.connectionDegree === 3 ? "3rd degree" : "Out of network"}
                                                 {match.mutualConnection && ` via ${match.mutualConnection}`}
                                             </span>
                                         </div>
@@ -111,10 +111,10 @@ export class ApiError extends Error {
 // Generic fetch wrapper with error handling
 let authToken: string | null = null;
 
-async function fetchAPI<T>(
+async function fetchResponse(
     endpoint: string,
     options: RequestInit = {}
-): Promise<T> {
+): Promise<Response> {
     const url = `${BACKEND_URL}${endpoint}`;
 
     const headers: Record<string, string> = {
@@ -142,7 +142,7 @@ async function fetchAPI<T>(
             );
         }
 
-        return response.json();
+        return response;
     } catch (error) {
         if (error instanceof ApiError) throw error;
 
@@ -154,6 +154,33 @@ async function fetchAPI<T>(
     }
 }
 
+async function fetchAPI<T>(
+    endpoint: string,
+    options: RequestInit = {}
+): Promise<T> {
+    const response = await fetchResponse(endpoint, options);
+    return response.json();
+}
+
+// Largest page the backend serves (MAX_PAGE_SIZE)
+const PAGE_SIZE = 1000;
+
+/**
+ * Every item of a cursor-paged list endpoint (/events, /sessions):
+ * follows X-Next-Cursor until the last page.
+ */
+async function fetchAllPages<T>(endpoint: string): Promise<T[]> {
+    const items: T[] = [];
+    let cursor: string | null = null;
+    do {
+        const query = `limit=${PAGE_SIZE}` + (cursor ? `&cursor=${encodeURIComponent(cursor)}` : '');
+        const response = await fetchResponse(`${endpoint}?${query}`);
+        items.push(...(await response.json() as T[]));
+        cursor = response.headers.get('X-Next-Cursor');
+    } while (cursor);
+    return items;
+}
+
 export const setApiToken = (token: string | null) => {
     authToken = token;
 };
@@ -221,7 +248,7 @@ export const api = {
         }),
 
     // Events
-    getEvents: () => fetchAPI<Event[]>('/events'),
+    getEvents: () => fetchAllPages<Event>('/events'),
     getEvent: (eventId: string) => fetchAPI<Event>(`/events/${eventId}`),
     createEvent: (event: Event) => fetchAPI<{ message: string; event_id: string }>('/events', {
         method: 'POST',
@@ -231,7 +258,7 @@ export const api = {
         fetchAPI<{ message: string }>(`/events/${eventId}/register?user_id=${userId}`, { method: 'POST' }),
 
     // Sessions
-    getSessions: () => fetchAPI<Session[]>('/sessions'),
+    getSessions: () => fetchAllPages<Session>('/sessions'),
     bookSession: (data: {
         mentor_id: string;
         topic: string;